@@ -0,0 +1,161 @@
+# digital_library/benchmarks/bench_models.py
+import gc
+import os
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from models.generator import DatasetGenerator
+from models.models import Book
+
+def write_batches(path, count, seed=42, batch_size=1000):
+    """
+    Write generated book documents as raw BSON batches
+
+    Each batch is prefixed with its length, so the file can be read back
+    batch by batch like a find_raw_batches cursor.
+
+    Args:
+        path (str): Output file
+        count (int): Number of books
+        seed (int): Random seed
+        batch_size (int): Documents per batch
+
+    Returns:
+        int: Bytes of BSON written
+    """
+    written = 0
+    batch = []
+    with open(path, 'wb') as output:
+        def flush():
+            nonlocal written
+            data = b''.join(batch)
+            output.write(len(data).to_bytes(8, 'little'))
+            output.write(data)
+            written += len(data)
+            batch.clear()
+
+        for collection, document in DatasetGenerator(count, seed=seed).documents():
+            if collection == 'orders':
+                break
+            if collection == 'books':
+                batch.append(bson.encode(document))
+                if len(batch) == batch_size:
+                    flush()
+        if batch:
+            flush()
+    return written
+
+def read_batches(path):
+    """Yield the raw batches written by write_batches"""
+    with open(path, 'rb') as source:
+        while True:
+            header = source.read(8)
+            if not header:
+                return
+            yield source.read(int.from_bytes(header, 'little'))
+
+def cache_of_dicts(path):
+    """Decoded documents by _id, as the catalog cache used to hold them"""
+    return {document['_id']: document for batch in read_batches(path) for document in bson.decode_all(batch)}
+
+def cache_of_models(path):
+    """Book models by _id, built in bulk from the raw batches"""
+    return {book.id: book for book in Book.from_raw_batches(read_batches(path))}
+
+def cache_of_raw_models(path):
+    """Book models holding their raw BSON, decoded on first access"""
+    raw = CodecOptions(document_class=RawBSONDocument)
+    cache = {}
+    for batch in read_batches(path):
+        # Read the _ids without decoding the models (book.id would)
+        ids = [document['_id'] for document in bson.decode_all(batch, raw)]
+        cache.update(zip(ids, Book.from_raw_batches([batch], lazy=True)))
+    return cache
+
+def measure(build, path):
+    """
+    Memory held by a cache, measured with tracemalloc
+
+    Returns:
+        (bytes held by the cache, peak bytes while building it)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        cache = build(path)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del cache
+    return current, peak
+
+def timed(build, path, sample, repeat):
+    """Time building a cache and reading a sample of it as dicts"""
+    started = time.perf_counter()
+    cache = build(path)
+    build_s = time.perf_counter() - started
+
+    ids = random.Random(0).sample(list(cache), min(sample, len(cache)))
+    to_dict = (lambda entry: entry) if build is cache_of_dicts else (lambda entry: entry.to_dict())
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for book_id in ids:
+            to_dict(cache[book_id])
+        best = min(best, time.perf_counter() - started)
+    del cache
+    return build_s, best / len(ids) if ids else 0.0
+
+def main(argv=None):
+    """
+    Compare the memory of a book cache holding dicts or compact models
+
+    Books come from models.generator and are stored as raw BSON batches
+    in a temporary file, so every variant is built from the same bytes
+    without a server. Memory is what tracemalloc sees held by the cache
+    (keys included) once built.
+
+    Usage:
+        python -m benchmarks.bench_models --docs 1000000
+    """
+    parser = argparse.ArgumentParser(description="Book model memory benchmark")
+    parser.add_argument('--docs', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sample', type=int, default=100000, help="Entries read back as dicts")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    variants = [
+        ("dict per document", cache_of_dicts),
+        ("Book models (slots)", cache_of_models),
+        ("Book models (raw BSON, lazy)", cache_of_raw_models)
+    ]
+
+    handle, path = tempfile.mkstemp(suffix='.bson')
+    os.close(handle)
+    try:
+        started = time.perf_counter()
+        size = write_batches(path, args.docs, args.seed)
+        print(f"{args.docs} books generated in {time.perf_counter() - started:.1f}s, "
+              f"{size / args.docs:.0f} bytes of BSON each, C extension: {bson.has_c()}")
+
+        baseline = None
+        print(f"{'cache holding':<30} {'bytes/book':>10} {'total MB':>9} {'peak MB':>8} "
+              f"{'build s':>8} {'read us':>8} {'vs dict':>8}")
+        for label, build in variants:
+            build_s, per_dict = timed(build, path, args.sample, args.repeat)
+            current, peak = measure(build, path)
+            baseline = baseline or current
+            print(f"{label:<30} {current / args.docs:10.0f} {current / 2 ** 20:9.1f} {peak / 2 ** 20:8.1f} "
+                  f"{build_s:8.2f} {per_dict * 1e6:8.2f} {baseline / current:7.1f}x")
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
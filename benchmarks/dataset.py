@@ -0,0 +1,72 @@
+# digital_library/benchmarks/dataset.py
+from models.generator import DatasetGenerator, MongoSink, generate
+
+# Dataset layout written by seed(); bump when the shape of the data changes
+DATASET_VERSION = 3
+
+# Generated collections and the ones derived from them
+COLLECTIONS = ['categories', 'users', 'books', 'reviews', 'orders', 'order_summaries', 'bench_meta']
+
+def dataset_counts(scale: int) -> dict:
+    """
+    Number of documents seeded per collection for a number of books
+
+    Args:
+        scale (int): Number of books
+
+    Returns:
+        dict: Counts per collection
+    """
+    return DatasetGenerator(scale).counts
+
+def is_seeded(db_connection, scale: int, seed: int) -> bool:
+    """
+    Whether the database holds the dataset of this scale and seed
+
+    The document counts are compared with the ones recorded when seeding,
+    so a dataset changed since (e.g. by an interrupted run) is seeded again.
+    """
+    meta = db_connection.db['bench_meta'].find_one({'_id': 'dataset'})
+    if not meta or (meta.get('scale'), meta.get('seed'), meta.get('version')) != (scale, seed, DATASET_VERSION):
+        return False
+    return all(
+        db_connection.db[name].estimated_document_count() == count
+        for name, count in (meta.get('counts') or {}).items()
+    )
+
+def seed(controller, scale: int, seed: int = 42, batch_size: int = 10000) -> dict:
+    """
+    Replace the database content with a generated dataset
+
+    Documents come from models.generator (Zipf-distributed popularity,
+    rating aggregates included); order summaries are recorded batch by
+    batch as the orders are inserted.
+
+    Args:
+        controller (LibraryController): Controller of the benchmark database
+        scale (int): Number of books
+        seed (int): Random seed
+        batch_size (int): Documents per bulk insert
+
+    Returns:
+        dict: Counts of the seeded documents
+    """
+    db = controller.db
+    for name in COLLECTIONS:
+        db.db[name].drop()
+    db.ensure_indexes()
+    controller.cache.clear()
+
+    def on_flush(collection, documents):
+        if collection == 'orders':
+            controller.order_summaries.record(documents)
+
+    generator = DatasetGenerator(scale, seed=seed)
+    result = generate(generator, MongoSink(db, batch_size, on_flush))
+
+    db.db['bench_meta'].replace_one(
+        {'_id': 'dataset'},
+        {'_id': 'dataset', 'scale': scale, 'seed': seed, 'version': DATASET_VERSION, 'counts': result['written']},
+        upsert=True
+    )
+    return result['written']
@@ -0,0 +1,390 @@
+# digital_library/benchmarks/suite.py
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+from datetime import datetime
+import pymongo
+from bson import ObjectId
+from config.database import DatabaseConnection
+from controllers.controller import LibraryController
+from benchmarks import dataset
+from models.generator import WORDS, isbn13, username
+
+# Scales run when --scales is not given (number of books)
+DEFAULT_SCALES = '1k,100k,1m'
+
+# Relative slowdown of a median reported as a regression
+DEFAULT_THRESHOLD = 0.2
+
+def parse_scale(text: str) -> int:
+    """Parse '1000', '100k' or '1m'"""
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+def headless_view(view_class, controller):
+    """
+    Create a view without building its widgets
+
+    The fetch_* and *_row methods of the views only use the controller,
+    so their data paths can be timed without a display.
+    """
+    view = view_class.__new__(view_class)
+    view.controller = controller
+    return view
+
+class BenchContext:
+    """Controller, headless views and sampled keys of one benchmark database"""
+
+    def __init__(self, controller, scale: int, seed: int):
+        from views.book_view import BookView
+        from views.order_view import OrderView
+        from views.review_view import ReviewView
+        from views.user_view import UserView
+
+        self.controller = controller
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.counts = dataset.dataset_counts(scale)
+
+        self.book_view = headless_view(BookView, controller)
+        self.order_view = headless_view(OrderView, controller)
+        self.review_view = headless_view(ReviewView, controller)
+        self.user_view = headless_view(UserView, controller)
+
+        # Books and users addressed by the write and lookup cases
+        isbns = [isbn13(self.rng.randrange(scale)) for _ in range(200)]
+        self.books = list(controller.db.books.find({'isbn': {'$in': isbns}}, {'isbn': 1}))
+        self.user_ids = [user['_id'] for user in controller.db.users.find({}, {'_id': 1}).limit(200)]
+        self.extra_isbn = scale
+        # Callbacks undoing the writes of the current iteration
+        self.undo_callbacks = []
+
+    def on_undo(self, callback):
+        """Register a callback restoring the seeded data after the iteration"""
+        self.undo_callbacks.append(callback)
+
+    def undo(self):
+        """Run the undo callbacks, latest first"""
+        while self.undo_callbacks:
+            self.undo_callbacks.pop()()
+
+    def book(self):
+        return self.rng.choice(self.books)
+
+    def username(self):
+        return username(self.rng.randrange(self.counts['users']))
+
+    def new_isbn(self):
+        """ISBN outside the seeded range, for books created by a case"""
+        self.extra_isbn += 1
+        return isbn13(self.extra_isbn)
+
+# Benchmark cases: prepare(ctx) does the untimed setup of one iteration and
+# returns the timed call
+
+def search_books(ctx):
+    term = ctx.rng.choice(WORDS)
+    return lambda: ctx.controller.search_books(term)
+
+def books_page(ctx):
+    ctx.controller.cache.clear()
+    return lambda: ctx.controller.get_books_page(fields=LibraryController.BOOK_LIST_FIELDS)
+
+def books_page_deep(ctx):
+    ctx.controller.cache.clear()
+    book_id = ctx.book()['_id']
+    return lambda: ctx.controller.get_books_page(after=(book_id, book_id), fields=LibraryController.BOOK_LIST_FIELDS)
+
+def books_page_cached(ctx):
+    ctx.controller.get_books_page(fields=LibraryController.BOOK_LIST_FIELDS)
+    return lambda: ctx.controller.get_books_page(fields=LibraryController.BOOK_LIST_FIELDS)
+
+def books_top_rated(ctx):
+    ctx.controller.cache.clear()
+    return lambda: ctx.controller.get_books_page(sort_field='ratingAvg', descending=True,
+                                                 fields=LibraryController.BOOK_LIST_FIELDS)
+
+def create_order(ctx):
+    db = ctx.controller.db
+    user_id = ctx.rng.choice(ctx.user_ids)
+    user = db.users.find_one({'_id': user_id})
+    # Generated wallets are small; keep the order payable
+    db.users.update_one({'_id': user_id}, {'$set': {'wallet': 1000000.0}})
+    book_ids = [ctx.book()['_id'] for _ in range(2)]
+    # Orders created by this iteration get larger _ids
+    marker = ObjectId()
+
+    def undo():
+        created = {'user_id': user_id, '_id': {'$gt': marker}}
+        db.orders.delete_many(created)
+        db.order_summaries.delete_many(created)
+        # Restores the wallet and drops the emptied checkout markers
+        db.users.replace_one({'_id': user_id}, user)
+
+    ctx.on_undo(undo)
+    return lambda: ctx.controller.create_order(user_id, book_ids, debit_wallet=True)
+
+def edit_book(ctx):
+    book = ctx.controller.find_book_by_isbn(ctx.book()['isbn'])
+    original = dict(book)
+    book_data = {
+        'title': book['title'],
+        'author': book['author'],
+        'isbn': book['isbn'],
+        'published_year': book['publishedYear'],
+        'price': round(ctx.rng.uniform(5, 60), 2)
+    }
+
+    def undo():
+        ctx.controller.db.books.replace_one({'_id': original['_id']}, original)
+        ctx.controller.cache.book_changed(original['_id'])
+
+    ctx.on_undo(undo)
+    return lambda: ctx.controller.edit_book(book['isbn'], book_data)
+
+def delete_book(ctx):
+    isbn = ctx.new_isbn()
+    ctx.controller.db.books.insert_one({'title': 'Benchmark', 'author': 'Benchmark', 'isbn': isbn, 'isbn13': isbn})
+    # Removes the book if the timed delete failed
+    ctx.on_undo(lambda: ctx.controller.db.books.delete_many({'isbn': isbn}))
+    return lambda: ctx.controller.delete_book(isbn)
+
+def search_reviews(ctx):
+    username = ctx.username()
+    return lambda: ctx.controller.search_reviews(username)
+
+def search_users(ctx):
+    username = ctx.username()
+    return lambda: ctx.controller.search_users(username)
+
+def book_view_first_page(ctx):
+    ctx.controller.cache.clear()
+    fetch_page = ctx.book_view.book_page_fetcher()
+    return lambda: [ctx.book_view.book_row(book) for book in fetch_page(page_size=100)['items']]
+
+def order_view_load(ctx):
+    return lambda: [ctx.order_view.order_row(order) for order in ctx.controller.get_orders_page(page_size=100)['items']]
+
+def order_view_search(ctx):
+    username = ctx.username()
+    return lambda: [ctx.order_view.order_row(order) for order in ctx.controller.list_orders(username)]
+
+def review_view_load(ctx):
+    return lambda: ctx.review_view.fetch_all_review_rows()
+
+def review_view_search(ctx):
+    username = ctx.username()
+    return lambda: ctx.review_view.fetch_review_rows(username)
+
+def user_view_load(ctx):
+    return lambda: ctx.user_view.fetch_user_rows()
+
+def user_view_search(ctx):
+    username = ctx.username()
+    return lambda: ctx.user_view.fetch_user_rows(username)
+
+CASES = {
+    'controller.search_books': search_books,
+    'controller.get_books_page': books_page,
+    'controller.get_books_page.deep': books_page_deep,
+    'controller.get_books_page.cached': books_page_cached,
+    'controller.get_books_page.top_rated': books_top_rated,
+    'controller.create_order': create_order,
+    'controller.edit_book': edit_book,
+    'controller.delete_book': delete_book,
+    'controller.search_reviews': search_reviews,
+    'controller.search_users': search_users,
+    'BookView.first_page': book_view_first_page,
+    'OrderView.load': order_view_load,
+    'OrderView.search': order_view_search,
+    'ReviewView.load': review_view_load,
+    'ReviewView.search': review_view_search,
+    'UserView.load': user_view_load,
+    'UserView.search': user_view_search
+}
+
+def run_case(ctx, prepare, repeat: int, warmup: int) -> dict:
+    """
+    Time one case
+
+    Args:
+        ctx (BenchContext): Benchmark context
+        prepare (callable): Case function
+        repeat (int): Timed iterations
+        warmup (int): Untimed iterations run first
+
+    Returns:
+        dict: Timings in milliseconds and the number of rows returned
+    """
+    timings = []
+    rows = None
+    for iteration in range(warmup + repeat):
+        call = prepare(ctx)
+        try:
+            started = time.perf_counter()
+            result = call()
+            elapsed = time.perf_counter() - started
+        finally:
+            ctx.undo()
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+        if isinstance(result, list):
+            rows = len(result)
+        elif isinstance(result, dict) and result.get('success') is False:
+            raise RuntimeError(result.get('message'))
+
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'repeat': repeat,
+        'rows': rows
+    }
+
+def connect(args, scale: int) -> DatabaseConnection:
+    """Connection to the benchmark database of a scale"""
+    database = f"{args.db_prefix}{scale}"
+    if args.mongomock:
+        # In-process stand-in: no server needed, but aggregation support and
+        # timings differ from mongod
+        import mongomock
+        db_connection = DatabaseConnection(database=database)
+        db_connection._client = mongomock.MongoClient()
+        db_connection.ensure_indexes()
+        return db_connection
+    return DatabaseConnection(uri=args.uri, database=database)
+
+def run_scale(args, scale: int, case_names) -> dict:
+    """Seed (if needed) and benchmark one scale"""
+    db_connection = connect(args, scale)
+    try:
+        controller = LibraryController(db_connection)
+        if args.mongomock:
+            # mongomock has no sessions, type registries, $text or $lookup
+            # sub-pipelines
+            controller.checkout_engine.transactions_supported = False
+            controller.text_search_supported = False
+            controller.display_codecs_supported = False
+            controller.lookup_pipelines_supported = False
+        if args.reseed or not dataset.is_seeded(db_connection, scale, args.seed):
+            started = time.perf_counter()
+            counts = dataset.seed(controller, scale, args.seed)
+            print(f"Seeded {counts} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        ctx = BenchContext(controller, scale, args.seed)
+        results = {}
+        for name in case_names:
+            try:
+                results[name] = run_case(ctx, CASES[name], args.repeat, args.warmup)
+                print(f"{scale:>9} {name:<40} {results[name]['median_ms']:10.2f} ms", file=sys.stderr)
+            except Exception as e:
+                results[name] = {'error': str(e)}
+                print(f"{scale:>9} {name:<40} failed: {e}", file=sys.stderr)
+        return results
+    finally:
+        db_connection.close_connection()
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare median timings with a baseline result file
+
+    Args:
+        results (dict): Current result file content
+        baseline (dict): Baseline result file content
+        threshold (float): Relative slowdown reported as a regression
+
+    Returns:
+        list: One dict per case present in both, with the 'ratio' of the
+        medians and a 'status' of 'regression', 'improvement' or 'ok'
+    """
+    comparison = []
+    for scale, cases in results['results'].items():
+        for name, timing in cases.items():
+            previous = baseline.get('results', {}).get(scale, {}).get(name)
+            if not previous or 'median_ms' not in previous or 'median_ms' not in timing:
+                continue
+            ratio = timing['median_ms'] / previous['median_ms'] if previous['median_ms'] else 1.0
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 - threshold:
+                status = 'improvement'
+            else:
+                status = 'ok'
+            comparison.append({'scale': scale, 'case': name, 'baseline_ms': previous['median_ms'],
+                               'median_ms': timing['median_ms'], 'ratio': round(ratio, 3), 'status': status})
+    return comparison
+
+def main(argv=None):
+    """
+    Benchmark the controller operations and the data paths of each tab
+
+    Every scale uses its own database (bench_<books>), seeded once and
+    reused while the dataset parameters are unchanged. Results are written
+    as JSON; with --baseline the medians are compared to an earlier
+    result file and the exit status is 1 if any case regressed.
+
+    Usage:
+        python -m benchmarks.suite --scales 1k,100k --output results.json
+        python -m benchmarks.suite --baseline benchmarks/baseline.json
+        python -m benchmarks.suite --mongomock --scales 1k
+    """
+    parser = argparse.ArgumentParser(description="BookStore benchmark suite")
+    parser.add_argument('--scales', default=DEFAULT_SCALES, help="Numbers of books, e.g. 1k,100k,1m")
+    parser.add_argument('--cases', help="Comma-separated case names (all by default)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--uri', help="MongoDB connection string (default: MONGO_URI or MONGO_HOST/PORT)")
+    parser.add_argument('--db-prefix', default='bench_')
+    parser.add_argument('--mongomock', action='store_true', help="Use the in-process mongomock stand-in")
+    parser.add_argument('--reseed', action='store_true', help="Seed even if the dataset exists")
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help="Result file to compare with")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--list', action='store_true', help="List the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(CASES))
+        return 0
+
+    case_names = args.cases.split(',') if args.cases else list(CASES)
+    unknown = [name for name in case_names if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+
+    results = {
+        'created': datetime.utcnow().isoformat(),
+        'backend': 'mongomock' if args.mongomock else 'mongod',
+        'python': platform.python_version(),
+        'pymongo': pymongo.version,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': {}
+    }
+    for scale in (parse_scale(text) for text in args.scales.split(',')):
+        results['results'][str(scale)] = run_scale(args, scale, case_names)
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as baseline_file:
+        comparison = compare(results, json.load(baseline_file), args.threshold)
+    for entry in comparison:
+        print(f"{entry['scale']:>9} {entry['case']:<40} {entry['baseline_ms']:10.2f} -> "
+              f"{entry['median_ms']:10.2f} ms  x{entry['ratio']:.2f}  {entry['status'].upper()}")
+    regressions = [entry for entry in comparison if entry['status'] == 'regression']
+    print(f"{len(regressions)} regressions (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
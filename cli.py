@@ -0,0 +1,286 @@
+# digital_library/cli.py
+import sys
+import argparse
+from contextlib import redirect_stdout
+from bson import ObjectId, json_util
+
+# Book options shared by add-book and edit-book, mapped to add_book field names
+BOOK_OPTIONS = {
+    'title': 'title',
+    'author': 'author',
+    'isbn': 'isbn',
+    'published_year': 'published-year',
+    'price': 'price',
+    'categories': 'categories',
+    'description': 'description',
+    'imprint': 'imprint'
+}
+
+def book_data_from_args(args):
+    """
+    Collect the book fields given on the command line
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+
+    Returns:
+        dict: Book information (only the options that were given)
+    """
+    book_data = json_util.loads(args.json) if args.json else {}
+    for field in BOOK_OPTIONS:
+        value = getattr(args, field)
+        if value is not None:
+            book_data[field] = value
+    return book_data
+
+def book_data_from_document(book):
+    """
+    Convert a stored book document to add_book field names
+
+    Args:
+        book (dict): Book document
+
+    Returns:
+        dict: Book information
+    """
+    return {
+        'title': book.get('title'),
+        'author': book.get('author'),
+        'isbn': book.get('isbn'),
+        'published_year': book.get('publishedYear'),
+        'price': book.get('price'),
+        'categories': book.get('categories', []),
+        'description': book.get('description', ''),
+        'imprint': book.get('imprint', '')
+    }
+
+def resolve_user_id(controller, user):
+    """
+    Accept a user _id or a username
+
+    Args:
+        controller (LibraryController): Controller
+        user (str): User _id or username
+
+    Returns:
+        str: User _id, None if no such user exists
+    """
+    if ObjectId.is_valid(user):
+        return user
+    document = controller.db.users.find_one({'username': user}, {'_id': 1})
+    return str(document['_id']) if document else None
+
+# Command handlers: (controller, args) -> JSON-serializable result
+
+def cmd_search(controller, args):
+    books = controller.search_books(args.term, limit=args.limit)
+    return {"success": True, "count": len(books), "books": books}
+
+def cmd_add_book(controller, args):
+    return controller.add_book(book_data_from_args(args))
+
+def cmd_edit_book(controller, args):
+    # Options that are not given keep their stored value
+    book = controller.find_book_by_isbn(args.original_isbn)
+    if not book:
+        return {"success": False, "message": "Book not found"}
+    book_data = book_data_from_document(book)
+    book_data.update(book_data_from_args(args))
+    return controller.edit_book(args.original_isbn, book_data)
+
+def cmd_delete_book(controller, args):
+    return controller.delete_book(args.isbn)
+
+def cmd_create_order(controller, args):
+    user_id = resolve_user_id(controller, args.user)
+    if user_id is None:
+        return {"success": False, "message": f"User not found: {args.user}"}
+    return controller.create_order(user_id, args.book_ids, args.debit_wallet)
+
+def cmd_checkout(controller, args):
+    from controllers.book_import import open_text
+
+    def orders():
+        with open_text(args.path) as handle:
+            for line in handle:
+                if line.strip():
+                    yield json_util.loads(line)
+
+    use_transaction = {'auto': None, 'require': True, 'off': False}[args.transactions]
+    result = controller.checkout_orders(orders(), not args.no_debit, use_transaction)
+    if not args.list_orders:
+        del result['orders']
+    return result
+
+def cmd_recover_checkouts(controller, args):
+    return controller.recover_checkouts(args.older_than)
+
+def cmd_import(controller, args):
+    from controllers.book_import import import_books
+    return import_books(controller, args.path, args.format, args.batch_size, verbose=True)
+
+def cmd_export(controller, args):
+    from controllers.exporter import export
+    query = json_util.loads(args.query) if args.query else None
+    if args.path == '-':
+        # Connect first so connection messages stay off the exported data
+        controller.db.client
+        with redirect_stdout(args.stdout):
+            return export(controller, args.name, args.path, args.format, query, args.gzip, args.batch_size)
+    return export(controller, args.name, args.path, args.format, query, args.gzip, args.batch_size)
+
+def cmd_ensure_indexes(controller, args):
+    result = controller.db.ensure_indexes()
+    return {"success": not result['errors'], **result}
+
+def cmd_migrate_isbn(controller, args):
+    return controller.migrate_isbn_keys(args.batch_size)
+
+def cmd_migrate_search_keys(controller, args):
+    return controller.migrate_search_keys()
+
+def cmd_rebuild_ratings(controller, args):
+    return controller.rebuild_rating_aggregates(args.batch_size)
+
+def cmd_refresh_order_summaries(controller, args):
+    return controller.refresh_order_summaries()
+
+def cmd_explain_search(controller, args):
+    return controller.explain_searches(args.term)
+
+def cmd_audit_indexes(controller, args):
+    return {"success": True, "collections": controller.db.audit_indexes()}
+
+def add_book_options(parser):
+    """Add the --title, --author, ... options of add-book and edit-book"""
+    for field, option in BOOK_OPTIONS.items():
+        parser.add_argument(f'--{option}', dest=field)
+    parser.add_argument('--json', help="Book fields as a JSON object")
+
+def build_parser():
+    """
+    Build the command-line parser
+
+    Returns:
+        argparse.ArgumentParser: Parser with one sub-command per operation
+    """
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description="Headless BookStore operations with JSON output"
+    )
+    parser.add_argument('--compact', action='store_true', help="Print JSON on a single line")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help="Search the catalog")
+    search.add_argument('term')
+    search.add_argument('--limit', type=int, default=50)
+    search.set_defaults(handler=cmd_search)
+
+    add_book = commands.add_parser('add-book', help="Add a book")
+    add_book_options(add_book)
+    add_book.set_defaults(handler=cmd_add_book)
+
+    edit_book = commands.add_parser('edit-book', help="Edit the book with the given ISBN")
+    edit_book.add_argument('original_isbn', metavar='ISBN')
+    add_book_options(edit_book)
+    edit_book.set_defaults(handler=cmd_edit_book)
+
+    delete_book = commands.add_parser('delete-book', help="Delete the book with the given ISBN")
+    delete_book.add_argument('isbn')
+    delete_book.set_defaults(handler=cmd_delete_book)
+
+    create_order = commands.add_parser('create-order', help="Create an order")
+    create_order.add_argument('user', help="User _id or username")
+    create_order.add_argument('book_ids', nargs='+', metavar='BOOK_ID')
+    create_order.add_argument('--debit-wallet', action='store_true',
+                              help="Pay from the user's wallet, rejecting the order if it cannot cover it")
+    create_order.set_defaults(handler=cmd_create_order)
+
+    checkout = commands.add_parser('checkout', help="Create the orders of a JSONL file in batches")
+    checkout.add_argument('path', help='JSONL file of {"user_id": ..., "book_ids": [...]} lines')
+    checkout.add_argument('--no-debit', action='store_true', help="Do not charge the users' wallets")
+    checkout.add_argument('--transactions', choices=['auto', 'require', 'off'], default='auto')
+    checkout.add_argument('--list-orders', action='store_true', help="Include every created order in the output")
+    checkout.set_defaults(handler=cmd_checkout)
+
+    recover = commands.add_parser('recover-checkouts', help="Refund checkouts interrupted before their orders were written")
+    recover.add_argument('--older-than', type=float, metavar='MINUTES', help="Minimum age of a checkout (default: 10)")
+    recover.set_defaults(handler=cmd_recover_checkouts)
+
+    import_ = commands.add_parser('import', help="Bulk import books from CSV or JSONL")
+    import_.add_argument('path')
+    import_.add_argument('--format', choices=['csv', 'jsonl'])
+    import_.add_argument('--batch-size', type=int, default=1000)
+    import_.set_defaults(handler=cmd_import)
+
+    export = commands.add_parser('export', help="Export a collection to CSV or JSONL")
+    export.add_argument('name', help="books, orders, reviews, users or any collection name")
+    export.add_argument('path', help="Destination file ('-' for stdout, .gz to compress)")
+    export.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    export.add_argument('--query', help="MongoDB filter as (extended) JSON")
+    export.add_argument('--gzip', action='store_true', default=None)
+    export.add_argument('--batch-size', type=int, default=1000)
+    export.set_defaults(handler=cmd_export)
+
+    ensure = commands.add_parser('ensure-indexes', help="Create the declared indexes")
+    ensure.set_defaults(handler=cmd_ensure_indexes)
+
+    migrate_isbn = commands.add_parser('migrate-isbn', help="Compute the canonical ISBN-13 key of existing books")
+    migrate_isbn.add_argument('--batch-size', type=int, default=1000)
+    migrate_isbn.set_defaults(handler=cmd_migrate_isbn)
+
+    migrate_search = commands.add_parser('migrate-search-keys',
+                                         help="Compute the lowercase title, username and email search keys")
+    migrate_search.set_defaults(handler=cmd_migrate_search_keys)
+
+    rebuild_ratings = commands.add_parser('rebuild-ratings', help="Recompute the rating aggregates of every book")
+    rebuild_ratings.add_argument('--batch-size', type=int, default=1000)
+    rebuild_ratings.set_defaults(handler=cmd_rebuild_ratings)
+
+    refresh_summaries = commands.add_parser('refresh-order-summaries', help="Rebuild the Orders tab summaries")
+    refresh_summaries.set_defaults(handler=cmd_refresh_order_summaries)
+
+    explain = commands.add_parser('explain-search', help="Check that the review and user searches use indexes")
+    explain.add_argument('term')
+    explain.set_defaults(handler=cmd_explain_search)
+
+    audit = commands.add_parser('audit-indexes', help="Report missing, undeclared and unused indexes")
+    audit.set_defaults(handler=cmd_audit_indexes)
+
+    return parser
+
+def main(argv=None):
+    """
+    Headless entry point: runs one operation and prints its result as JSON
+
+    Diagnostic messages go to stderr so stdout carries only the result.
+    The exit status is 0 when the result reports success.
+
+    Usage:
+        python cli.py search "tolkien" --limit 10
+        python cli.py add-book --title Dune --author Herbert --isbn 9780441013593 --published-year 1965 --price 9.99
+        python cli.py export orders orders.csv.gz --format csv
+    """
+    args = build_parser().parse_args(argv)
+    args.stdout = sys.stdout
+
+    from config.database import db_connection
+    from config.instrumentation import query_tag
+    from controllers.controller import LibraryController
+
+    with redirect_stdout(sys.stderr):
+        try:
+            with query_tag(f"cli:{args.command}"):
+                result = args.handler(LibraryController(db_connection), args)
+        except Exception as e:
+            result = {"success": False, "message": str(e)}
+        finally:
+            db_connection.close_connection()
+
+    output = sys.stderr if args.command == 'export' and args.path == '-' else sys.stdout
+    indent = None if args.compact else 2
+    print(json_util.dumps(result, indent=indent, json_options=json_util.RELAXED_JSON_OPTIONS), file=output)
+    return 0 if result.get('success', True) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,46 +1,195 @@
 # digital_library/config/database.py
 import os
+import threading
 from pymongo import MongoClient
+from pymongo.errors import ConfigurationError, PyMongoError
 from dotenv import load_dotenv
+from config.indexes import ensure_indexes, ensure_search_keys, audit_indexes
+from config.instrumentation import QueryInstrumentation
 
 # Load environment variables
 load_dotenv()
 
+# Environment variables mapped to MongoClient options and their type
+CLIENT_OPTIONS_FROM_ENV = {
+    'MONGO_MAX_POOL_SIZE': ('maxPoolSize', int),
+    'MONGO_MIN_POOL_SIZE': ('minPoolSize', int),
+    'MONGO_MAX_IDLE_TIME_MS': ('maxIdleTimeMS', int),
+    'MONGO_CONNECT_TIMEOUT_MS': ('connectTimeoutMS', int),
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS': ('serverSelectionTimeoutMS', int),
+    'MONGO_SOCKET_TIMEOUT_MS': ('socketTimeoutMS', int),
+    'MONGO_COMPRESSORS': ('compressors', str),
+    'MONGO_APP_NAME': ('appname', str)
+}
+
+def client_options_from_env() -> dict:
+    """
+    Read MongoClient options from the environment (or .env file)
+    
+    Returns:
+        dict: Keyword arguments for MongoClient
+    """
+    options = {'appname': 'BookStore'}
+    for variable, (option, cast) in CLIENT_OPTIONS_FROM_ENV.items():
+        value = os.getenv(variable)
+        if value:
+            options[option] = cast(value)
+    return options
+
 class DatabaseConnection:
-    def __init__(self, 
-                 host='localhost', 
-                 port=27017, 
-                 database='db'):  # Changed default database name to 'db'
+    def __init__(self,
+                 host=None,
+                 port=None,
+                 database=None,
+                 uri=None,
+                 **client_options):
         """
-        Initialize MongoDB connection
+        Initialize MongoDB connection settings
+        
+        No connection is made here: the client and its pool are created on
+        first use, so importing this module never blocks on the network.
+        Unset arguments fall back to MONGO_URI, MONGO_HOST, MONGO_PORT and
+        MONGO_DB; pool and timeout options come from the environment
+        (see CLIENT_OPTIONS_FROM_ENV) and can be overridden by keyword.
+        Commands are recorded by a QueryInstrumentation listener when
+        MONGO_INSTRUMENTATION is 1.
         
         Args:
-            host (str): MongoDB host
-            port (int): MongoDB port
-            database (str): Database name
+            host (str, optional): MongoDB host
+            port (int, optional): MongoDB port
+            database (str, optional): Database name
+            uri (str, optional): MongoDB connection string, takes precedence
+                over host and port
+            **client_options: Additional MongoClient options
+        """
+        self.uri = uri or os.getenv('MONGO_URI')
+        self.host = host or os.getenv('MONGO_HOST', 'localhost')
+        self.port = int(port or os.getenv('MONGO_PORT', 27017))
+        self.database_name = database or os.getenv('MONGO_DB', 'db')
+        
+        self.client_options = client_options_from_env()
+        self.client_options.update(client_options)
+        
+        # Per-command latency statistics and slow-query log
+        self.instrumentation = QueryInstrumentation.from_env()
+        if self.instrumentation is not None:
+            listeners = list(self.client_options.get('event_listeners', []))
+            self.client_options['event_listeners'] = listeners + [self.instrumentation]
+        
+        self._client = None
+        self._lock = threading.RLock()
+    
+    @property
+    def client(self):
+        """MongoClient, created on first access"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._connect()
+        return self._client
+    
+    def _connect(self):
+        """
+        Create the client and bootstrap the indexes and search keys
+        
+        The client connects lazily, so success is only reported once the
+        index bootstrap reached the server. An unreachable server is
+        reported and the client kept (it reconnects on the next command).
+        
+        Raises:
+            ConnectionError: If the URI or a client option is invalid
         """
         try:
-            # Create connection
-            self.client = MongoClient(host, port)
-            self.db = self.client[database]
-            
-            # Collections
-            self.books = self.db['books']
-            self.users = self.db['users']
-            self.orders = self.db['orders']
-            self.reviews = self.db['reviews']
-            self.categories = self.db['categories']
-            
+            if self.uri:
+                client = MongoClient(self.uri, **self.client_options)
+            else:
+                client = MongoClient(self.host, self.port, **self.client_options)
+        except (ConfigurationError, ValueError, TypeError) as e:
+            raise ConnectionError(f"Invalid MongoDB configuration: {e}") from e
+        self._client = client
+        
+        # Make sure every declared index exists
+        result = self.ensure_indexes()
+        if result["created"]:
+            # Documents stored before the search keys existed
+            try:
+                self.ensure_search_keys()
+            except PyMongoError as e:
+                print(f"Error adding search keys: {e}")
             print("Successfully connected to MongoDB")
+        else:
+            errors = [error for messages in result["errors"].values() for error in messages]
+            print(f"Error connecting to MongoDB: {errors[0] if errors else 'no index could be created'}")
+    
+    @property
+    def connected(self) -> bool:
+        """Whether the client has been created"""
+        return self._client is not None
+    
+    @property
+    def db(self):
+        """Application database"""
+        return self.client[self.database_name]
+    
+    # Collections
+    @property
+    def books(self):
+        return self.db['books']
+    
+    @property
+    def users(self):
+        return self.db['users']
+    
+    @property
+    def orders(self):
+        return self.db['orders']
+    
+    @property
+    def reviews(self):
+        return self.db['reviews']
+    
+    @property
+    def categories(self):
+        return self.db['categories']
+    
+    @property
+    def order_summaries(self):
+        return self.db['order_summaries']
+    
+    def ensure_indexes(self):
+        """
+        Create the indexes declared in config.indexes.INDEX_REGISTRY
+        
+        Returns:
+            Dict with the created index names and errors per collection
+        """
+        return ensure_indexes(self.db)
+    
+    def ensure_search_keys(self):
+        """
+        Add the lowercase search keys to the documents missing them
+        
+        Returns:
+            Dict with the number of documents updated per collection
+        """
+        return ensure_search_keys(self.db)
+    
+    def audit_indexes(self):
+        """
+        Report missing, undeclared and unused indexes
         
-        except Exception as e:
-            print(f"Error connecting to MongoDB: {e}")
+        Returns:
+            Dict with the audit result per collection
+        """
+        return audit_indexes(self.db)
     
     def close_connection(self):
         """Close the MongoDB connection"""
-        if self.client:
-            self.client.close()
-            print("MongoDB connection closed")
+        with self._lock:
+            if self._client:
+                self._client.close()
+                self._client = None
+                print("MongoDB connection closed")
 
-# Global database connection
-db_connection = DatabaseConnection()
\ No newline at end of file
+# Global database connection (connects lazily)
+db_connection = DatabaseConnection()
@@ -0,0 +1,322 @@
+# digital_library/config/indexes.py
+from typing import Dict, List, Any
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import ConnectionFailure, OperationFailure, PyMongoError
+
+# Declarative index registry
+#
+# Every collection handled by DatabaseConnection lists the indexes it needs.
+# 'used_by' records the query sites relying on the index so that the audit
+# can explain why an index exists.
+INDEX_REGISTRY: Dict[str, List[Dict[str, Any]]] = {
+    'books': [
+        {
+            'name': 'isbn_unique',
+            'keys': [('isbn', ASCENDING)],
+            'unique': True,
+            'used_by': ['LibraryController._isbn_filter']
+        },
+        {
+            # Canonical ISBN-13; books whose ISBN is not valid have a null key
+            'name': 'isbn13_unique',
+            'keys': [('isbn13', ASCENDING)],
+            'unique': True,
+            'partialFilterExpression': {'isbn13': {'$type': 'string'}},
+            'used_by': ['LibraryController.edit_book', 'LibraryController.delete_book',
+                        'LibraryController.find_book_by_isbn', 'LibraryController.migrate_isbn_keys']
+        },
+        {
+            # Keyset pages of the Books table sorted by rating
+            'name': 'rating_avg_id',
+            'keys': [('ratingAvg', DESCENDING), ('_id', DESCENDING)],
+            'used_by': ['LibraryController.get_books_page']
+        },
+        {
+            'name': 'title',
+            'keys': [('title', ASCENDING)],
+            'used_by': ['ReviewView.add_review']
+        },
+        {
+            # Case-insensitive prefix searches use anchored regexes on the
+            # lowercase copy, which only read the matching range of keys
+            'name': 'title_lower',
+            'keys': [('title_lower', ASCENDING)],
+            'used_by': ['LibraryController.search_reviews']
+        }
+    ],
+    'users': [
+        {
+            'name': 'username_unique',
+            'keys': [('username', ASCENDING)],
+            'unique': True,
+            'used_by': ['OrderView.create_order', 'ReviewView.add_review']
+        },
+        {
+            'name': 'email_unique',
+            'keys': [('email', ASCENDING)],
+            'unique': True,
+            'sparse': True
+        },
+        {
+            'name': 'username_lower',
+            'keys': [('username_lower', ASCENDING)],
+            'used_by': ['LibraryController.search_users', 'LibraryController.search_reviews']
+        },
+        {
+            'name': 'email_lower',
+            'keys': [('email_lower', ASCENDING)],
+            'used_by': ['LibraryController.search_users']
+        },
+        {
+            # Only users with an unsettled checkout are indexed
+            'name': 'pending_checkouts',
+            'keys': [('pending_checkouts._id', ASCENDING)],
+            'sparse': True,
+            'used_by': ['CheckoutEngine.settle_checkout', 'CheckoutEngine.recover_checkouts']
+        }
+    ],
+    'orders': [
+        {
+            'name': 'user_id_order_date',
+            'keys': [('user_id', ASCENDING), ('order_date', DESCENDING)],
+            'used_by': ['LibraryController.count_orders_by_user']
+        },
+        {
+            'name': 'order_date',
+            'keys': [('order_date', DESCENDING)],
+            'used_by': ['OrderView.load_orders']
+        }
+    ],
+    'reviews': [
+        {
+            'name': 'book_id',
+            'keys': [('book_id', ASCENDING)],
+            'used_by': ['ReviewView.load_reviews', 'ReviewView.search_reviews']
+        },
+        {
+            'name': 'user_id',
+            'keys': [('user_id', ASCENDING)],
+            'used_by': ['ReviewView.load_reviews', 'ReviewView.search_reviews']
+        },
+        {
+            # Each clause of the review search's $or needs an index, or the
+            # whole search scans the collection; words are matched with $text
+            'name': 'review_text_search',
+            'keys': [('review_text', TEXT)],
+            'used_by': ['LibraryController.search_reviews']
+        }
+    ],
+    'order_summaries': [
+        {
+            # Keyset pages of the Orders tab, ties broken by _id
+            'name': 'order_date_id',
+            'keys': [('order_date', DESCENDING), ('_id', DESCENDING)],
+            'used_by': ['OrderSummaries.page', 'OrderSummaries.search']
+        },
+        {
+            'name': 'username_lower_order_date',
+            'keys': [('username_lower', ASCENDING), ('order_date', DESCENDING)],
+            'used_by': ['OrderSummaries.search']
+        },
+        {
+            'name': 'refreshed_at',
+            'keys': [('refreshedAt', ASCENDING)],
+            'used_by': ['OrderSummaries.refresh']
+        }
+    ],
+    'categories': [
+        {
+            'name': 'name_unique',
+            'keys': [('name', ASCENDING)],
+            'unique': True
+        }
+    ]
+}
+
+# Lowercase copies of fields matched by prefix searches, per collection
+# (copy -> source field). Documents written without them are backfilled
+# by ensure_search_keys.
+SEARCH_KEYS: Dict[str, Dict[str, str]] = {
+    'books': {'title_lower': 'title'},
+    'users': {'username_lower': 'username', 'email_lower': 'email'}
+}
+
+# Options of an index specification that are forwarded to create_index
+INDEX_OPTIONS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds')
+
+def _key_signature(keys) -> tuple:
+    """
+    Build a comparable signature from an index key pattern
+
+    Args:
+        keys (list or dict): Key pattern as list of pairs or mapping
+
+    Returns:
+        tuple: Normalized key pattern
+    """
+    items = keys.items() if hasattr(keys, 'items') else keys
+    signature = []
+    for field, direction in items:
+        if direction == TEXT or field in ('_fts', '_ftsx'):
+            # The server stores the text fields of an index as _fts/_ftsx
+            if ('_fts', TEXT) not in signature:
+                signature += [('_fts', TEXT), ('_ftsx', 1)]
+        else:
+            signature.append((field, int(direction) if isinstance(direction, (int, float)) else direction))
+    return tuple(signature)
+
+def ensure_indexes(db, registry: Dict[str, List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Create every index declared in the registry
+
+    create_index is idempotent, so this is safe to run at every startup.
+
+    Args:
+        db (Database): pymongo database
+        registry (dict, optional): Index registry, defaults to INDEX_REGISTRY
+
+    Returns:
+        Dict with the created index names and the errors per collection
+    """
+    registry = registry or INDEX_REGISTRY
+    result = {"created": {}, "errors": {}}
+
+    for collection_name, specs in registry.items():
+        collection = db[collection_name]
+        for spec in specs:
+            options = {k: spec[k] for k in INDEX_OPTIONS if k in spec}
+            try:
+                name = collection.create_index(spec['keys'], name=spec['name'], **options)
+                result["created"].setdefault(collection_name, []).append(name)
+            except ConnectionFailure as e:
+                # Server unreachable: every other index would fail the same way
+                print(f"Error creating indexes: {e}")
+                result["errors"].setdefault(collection_name, []).append(str(e))
+                return result
+            except PyMongoError as e:
+                # A unique index fails on existing duplicates; report, don't abort
+                result["errors"].setdefault(collection_name, []).append(f"{spec['name']}: {e}")
+                print(f"Error creating index {collection_name}.{spec['name']}: {e}")
+
+    return result
+
+def ensure_search_keys(db, search_keys: Dict[str, Dict[str, str]] = None) -> Dict[str, int]:
+    """
+    Add the lowercase search keys to the documents missing them
+
+    Each collection is updated with one update pipeline on the server.
+    The filter reads the key indexes, so this is cheap once every document
+    has its keys and safe to run at every startup.
+
+    Args:
+        db (Database): pymongo database
+        search_keys (dict, optional): Search keys, defaults to SEARCH_KEYS
+
+    Returns:
+        Dict with the number of documents updated per collection
+    """
+    search_keys = search_keys or SEARCH_KEYS
+    updated = {}
+    for collection_name, keys in search_keys.items():
+        result = db[collection_name].update_many(
+            {'$or': [{key: {'$exists': False}} for key in keys]},
+            [{'$set': {key: {'$toLower': f'${source}'} for key, source in keys.items()}}]
+        )
+        updated[collection_name] = result.modified_count
+    return updated
+
+def audit_indexes(db, registry: Dict[str, List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Compare the indexes present in the database with the registry
+
+    Args:
+        db (Database): pymongo database
+        registry (dict, optional): Index registry, defaults to INDEX_REGISTRY
+
+    Returns:
+        Dict per collection listing missing, undeclared and unused indexes
+    """
+    registry = registry or INDEX_REGISTRY
+    report = {}
+
+    for collection_name, specs in registry.items():
+        collection = db[collection_name]
+        existing = {
+            _key_signature(info['key']): info['name']
+            for info in collection.list_indexes()
+        }
+        declared = {_key_signature(spec['keys']): spec for spec in specs}
+
+        # Usage counters since the last server restart
+        try:
+            usage = {
+                stats['name']: stats['accesses']['ops']
+                for stats in collection.aggregate([{'$indexStats': {}}])
+            }
+        except OperationFailure:
+            usage = None
+
+        report[collection_name] = {
+            'missing': [
+                {'name': spec['name'], 'used_by': spec.get('used_by', [])}
+                for signature, spec in declared.items() if signature not in existing
+            ],
+            'undeclared': [
+                name for signature, name in existing.items()
+                if signature not in declared and name != '_id_'
+            ],
+            'unused': [
+                name for name, ops in (usage or {}).items()
+                if ops == 0 and name != '_id_'
+            ],
+            'usage': usage
+        }
+
+    return report
+
+def format_audit_report(report: Dict[str, Any]) -> str:
+    """
+    Format an index audit report for the terminal
+
+    Args:
+        report (dict): Report returned by audit_indexes
+
+    Returns:
+        str: Human readable report
+    """
+    lines = []
+    for collection_name, entry in report.items():
+        lines.append(f"[{collection_name}]")
+        for missing in entry['missing']:
+            used_by = ', '.join(missing['used_by']) or 'n/a'
+            lines.append(f"  MISSING     {missing['name']} (used by: {used_by})")
+        for name in entry['undeclared']:
+            lines.append(f"  UNDECLARED  {name}")
+        for name in entry['unused']:
+            lines.append(f"  UNUSED      {name}")
+        if entry['usage'] is None:
+            lines.append("  (index usage statistics unavailable)")
+        if not (entry['missing'] or entry['undeclared'] or entry['unused']):
+            lines.append("  OK")
+    return '\n'.join(lines)
+
+def main():
+    """
+    Index maintenance entry point
+
+    Usage:
+        python -m config.indexes          Audit indexes
+        python -m config.indexes --ensure Create missing indexes, then audit
+    """
+    import sys
+    from config.database import db_connection
+
+    try:
+        if '--ensure' in sys.argv[1:]:
+            db_connection.ensure_indexes()
+        print(format_audit_report(db_connection.audit_indexes()))
+    finally:
+        db_connection.close_connection()
+
+if __name__ == "__main__":
+    main()
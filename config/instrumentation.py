@@ -0,0 +1,305 @@
+# digital_library/config/instrumentation.py
+import os
+import sys
+import time
+import itertools
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import bson
+from bson import json_util
+from pymongo import monitoring
+
+# Action the current commands run for (e.g. the executor key 'books:list')
+current_tag: ContextVar[Optional[str]] = ContextVar('query_tag', default=None)
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+# Modules whose functions are reported as the caller of a command
+CALLER_PREFIXES = ('controllers', 'views', 'models', 'cli', 'benchmarks')
+
+# Commands that carry no application work
+IGNORED_COMMANDS = {'hello', 'ismaster', 'isMaster', 'ping', 'saslStart', 'saslContinue',
+                    'endSessions', 'buildInfo', 'getnonce', 'authenticate'}
+
+@contextmanager
+def query_tag(tag: str):
+    """
+    Attribute the commands run inside the block to an action
+
+    Args:
+        tag (str): Action name, e.g. a view request key
+    """
+    token = current_tag.set(tag)
+    try:
+        yield
+    finally:
+        current_tag.reset(token)
+
+# Caller name of each code object seen by find_caller, None for code
+# outside the application
+_caller_names: Dict[Any, Optional[str]] = {}
+
+def find_caller() -> Optional[str]:
+    """
+    Name the innermost application function on the current stack
+
+    Whether a function belongs to the application and its name are cached
+    per code object, so each frame of the walk costs a dict lookup.
+
+    Returns:
+        str: 'Class.method' or 'module.function' style name, None if no
+        app code is found
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        try:
+            name = _caller_names[code]
+        except KeyError:
+            module = frame.f_globals.get('__name__', '')
+            name = None
+            if module.startswith(CALLER_PREFIXES) or module == '__main__':
+                qualified = getattr(code, 'co_qualname', code.co_name)
+                name = qualified if '.' in qualified else f"{module}.{qualified}"
+            _caller_names[code] = name
+        if name is not None:
+            return name
+        frame = frame.f_back
+    return None
+
+class CommandStats:
+    """Counters and latency histogram of one (caller, command, collection)"""
+
+    __slots__ = ('count', 'failures', 'total_ms', 'max_ms', 'documents', 'bytes', 'sized', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.documents = 0
+        # Bytes of the replies that were measured, and how many there were
+        self.bytes = 0
+        self.sized = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, duration_ms: float, documents: int, size: Optional[int], failed: bool):
+        self.count += 1
+        self.failures += failed
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.documents += documents
+        if size is not None:
+            self.bytes += size
+            self.sized += 1
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of the calls"""
+        wanted = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'failures': self.failures,
+            'avg_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': self.max_ms,
+            'documents': self.documents,
+            # Estimated from the measured replies
+            'bytes': round(self.bytes * self.count / self.sized) if self.sized else None,
+            'histogram': dict(zip([f"<{bound}ms" for bound in LATENCY_BUCKETS_MS] + ['more'], self.buckets))
+        }
+
+class QueryInstrumentation(monitoring.CommandListener):
+    """
+    Record every MongoDB command sent by the client
+
+    Registered as an event listener of the MongoClient (see
+    DatabaseConnection), it keeps per caller, command and collection a
+    latency histogram and the documents returned. The caller is the
+    action tag set with query_tag (the executor uses the request key)
+    followed by the innermost controller or view method. Commands slower
+    than the threshold are kept in a slow-query log.
+
+    Every command pays for a short stack walk and two locked dict updates.
+    The driver does not report reply sizes, so bytes are only estimated
+    when bytes_sample is set: one reply in bytes_sample is re-encoded.
+    """
+
+    def __init__(self,
+                 slow_ms: float = 100.0,
+                 slow_log_path: Optional[str] = None,
+                 max_slow_queries: int = 200,
+                 bytes_sample: int = 0):
+        """
+        Args:
+            slow_ms (float): Duration from which a command is logged as slow
+            slow_log_path (str, optional): File the slow commands are
+                appended to (printed when omitted)
+            max_slow_queries (int): Slow commands kept in memory
+            bytes_sample (int): Measure the size of one reply in this many
+                (0 to not measure reply sizes)
+        """
+        self.slow_ms = slow_ms
+        self.slow_log_path = slow_log_path
+        self.bytes_sample = bytes_sample
+        self.slow_queries = deque(maxlen=max_slow_queries)
+        self.stats = {}
+        self.started_at = time.time()
+        self._pending = {}
+        self._replies = 0
+        self._slow_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['QueryInstrumentation']:
+        """
+        Build the instrumentation configured by the environment
+
+        Disabled unless MONGO_INSTRUMENTATION=1; MONGO_SLOW_QUERY_MS and
+        MONGO_SLOW_QUERY_LOG set the slow-query threshold and log file,
+        MONGO_MEASURE_BYTES the reply size sampling (see bytes_sample).
+
+        Returns:
+            QueryInstrumentation, or None when disabled
+        """
+        if os.getenv('MONGO_INSTRUMENTATION', '0').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls(
+            slow_ms=float(os.getenv('MONGO_SLOW_QUERY_MS', 100)),
+            slow_log_path=os.getenv('MONGO_SLOW_QUERY_LOG') or None,
+            bytes_sample=int(os.getenv('MONGO_MEASURE_BYTES', 0))
+        )
+
+    # CommandListener interface (called on the thread sending the command)
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        tag, caller = current_tag.get(), find_caller()
+        if tag and caller:
+            caller = f"{tag} {caller}"
+        command = event.command
+        # The command's value names the collection, except for getMore
+        collection = command.get('collection' if event.command_name == 'getMore' else event.command_name)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                caller or tag or 'unknown',
+                event.command_name,
+                collection if isinstance(collection, str) else event.database_name,
+                command
+            )
+
+    def succeeded(self, event):
+        self._finish(event, event.reply, failed=False)
+
+    def failed(self, event):
+        self._finish(event, None, failed=True)
+
+    def _finish(self, event, reply, failed: bool):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        caller, command_name, collection, command = pending
+        duration_ms = event.duration_micros / 1000.0
+        documents = self._count_documents(reply) if reply else 0
+
+        size = None
+        if reply and self.bytes_sample:
+            # Unlocked counter: an occasional extra or missed sample is fine
+            self._replies += 1
+            if self._replies % self.bytes_sample == 0:
+                size = len(bson.encode(reply))
+
+        key = (caller, command_name, collection)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = CommandStats()
+            stats.record(duration_ms, documents, size, failed)
+
+        if duration_ms >= self.slow_ms:
+            self._log_slow(caller, command_name, collection, command, duration_ms, documents, failed)
+
+    @staticmethod
+    def _count_documents(reply) -> int:
+        """Documents returned (cursor batches) or written ('n') by a command"""
+        cursor = reply.get('cursor')
+        if isinstance(cursor, dict):
+            return len(cursor.get('firstBatch', cursor.get('nextBatch', ())))
+        n = reply.get('n')
+        return n if isinstance(n, int) else 0
+
+    def _log_slow(self, caller, command_name, collection, command, duration_ms, documents, failed):
+        """Keep and write a slow command, without its documents"""
+        summary = {key: value for key, value in command.items()
+                   if key not in ('documents', 'updates', 'deletes', 'lsid', '$clusterTime', '$db')}
+        text = json_util.dumps(summary, json_options=json_util.RELAXED_JSON_OPTIONS)
+        entry = {
+            'id': next(self._slow_ids),
+            'time': datetime.now(),
+            'caller': caller,
+            'command': command_name,
+            'collection': collection,
+            'duration_ms': duration_ms,
+            'documents': documents,
+            'failed': failed,
+            'detail': text[:1000]
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+
+        line = (f"{entry['time']:%Y-%m-%d %H:%M:%S} SLOW {duration_ms:.1f}ms {command_name} "
+                f"{collection} [{caller}] {entry['detail']}")
+        if self.slow_log_path:
+            try:
+                with open(self.slow_log_path, 'a', encoding='utf-8') as log:
+                    log.write(line + '\n')
+            except OSError as e:
+                print(f"Error writing slow query log: {e}")
+        else:
+            print(line)
+
+    # Reporting
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Statistics per caller, command and collection
+
+        Returns:
+            list: Dicts sorted by total time, slowest first
+        """
+        with self._lock:
+            items = [(key, stats.to_dict(), stats.total_ms) for key, stats in self.stats.items()]
+        items.sort(key=lambda item: item[2], reverse=True)
+        return [
+            {'caller': caller, 'command': command, 'collection': collection, **stats}
+            for (caller, command, collection), stats, _ in items
+        ]
+
+    def recent_slow_queries(self) -> List[Dict[str, Any]]:
+        """Slow commands kept in memory, newest first"""
+        with self._lock:
+            return list(reversed(self.slow_queries))
+
+    def reset(self):
+        """Clear the statistics and the in-memory slow-query log"""
+        with self._lock:
+            self.stats.clear()
+            self.slow_queries.clear()
+            self.started_at = time.time()
@@ -0,0 +1,154 @@
+# digital_library/controllers/book_import.py
+import csv
+import io
+import gzip
+import json
+import argparse
+from typing import Dict, Any, Iterator
+
+# Column aliases accepted in import files, mapped to add_book field names
+FIELD_ALIASES = {
+    'publishedyear': 'published_year',
+    'published_year': 'published_year',
+    'year': 'published_year',
+    'publisher': 'imprint'
+}
+
+def open_text(path: str):
+    """
+    Open a text file for streaming, transparently decompressing .gz files
+
+    Args:
+        path (str): File path
+
+    Returns:
+        Text file object
+    """
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+def normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map an input row to the field names used by LibraryController.add_book
+
+    Args:
+        row (dict): Raw row
+
+    Returns:
+        dict: Book information
+    """
+    book_data = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip()
+        name = FIELD_ALIASES.get(key.lower(), key.lower())
+        book_data[name] = value.strip() if isinstance(value, str) else value
+    return book_data
+
+def iter_csv(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream books from a CSV file with a header row
+
+    Args:
+        path (str): CSV file path (optionally gzipped)
+
+    Yields:
+        dict: Book information per row
+    """
+    with open_text(path) as handle:
+        for row in csv.DictReader(handle):
+            yield normalize_row(row)
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream books from a JSON Lines file
+
+    Lines that are not valid JSON objects are yielded as empty rows so they
+    are reported by the validation with their row number.
+
+    Args:
+        path (str): JSONL file path (optionally gzipped)
+
+    Yields:
+        dict: Book information per line
+    """
+    with open_text(path) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = {}
+            yield normalize_row(row) if isinstance(row, dict) else {}
+
+def iter_books(path: str, file_format: str = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream books from a CSV or JSONL file, detecting the format from the name
+
+    Args:
+        path (str): File path
+        file_format (str, optional): 'csv' or 'jsonl'
+
+    Returns:
+        Iterator of book information dicts
+    """
+    if file_format is None:
+        name = path[:-3] if path.endswith('.gz') else path
+        file_format = 'jsonl' if name.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+    return iter_jsonl(path) if file_format == 'jsonl' else iter_csv(path)
+
+def import_books(controller, path: str, file_format: str = None, batch_size: int = 1000,
+                 verbose: bool = True) -> Dict[str, Any]:
+    """
+    Import a CSV or JSONL file of books
+
+    Args:
+        controller (LibraryController): Controller used for the inserts
+        path (str): File path
+        file_format (str, optional): 'csv' or 'jsonl'
+        batch_size (int): Number of documents per insert_many
+        verbose (bool): Print progress after every batch
+
+    Returns:
+        Dict with the import statistics of LibraryController.bulk_add_books
+    """
+    def report(stats):
+        print(f"{stats['rows']} rows, {stats['inserted']} inserted, "
+              f"{stats['failed']} failed, {stats['rate']:.0f} rows/s")
+
+    return controller.bulk_add_books(
+        iter_books(path, file_format),
+        batch_size=batch_size,
+        on_progress=report if verbose else None
+    )
+
+def main(argv=None):
+    """
+    Command-line importer
+
+    Usage:
+        python -m controllers.book_import books.csv [--format csv|jsonl] [--batch-size N]
+    """
+    parser = argparse.ArgumentParser(description="Import books from a CSV or JSONL file")
+    parser.add_argument('path', help="CSV or JSONL file, optionally gzipped")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="File format (default: from file name)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Documents per insert_many")
+    args = parser.parse_args(argv)
+
+    from config.database import db_connection
+    from controllers.controller import LibraryController
+
+    try:
+        stats = import_books(LibraryController(db_connection), args.path, args.format, args.batch_size)
+        for row_number, message in stats['errors']:
+            print(f"Row {row_number}: {message}")
+        print(f"{stats['message']} in {stats['elapsed']:.1f}s ({stats['rate']:.0f} rows/s)")
+        return 0 if stats['success'] else 1
+    finally:
+        db_connection.close_connection()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+# digital_library/controllers/cache.py
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+# Sentinel distinguishing a cache miss from a cached None
+MISSING = object()
+
+class LRUCache:
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        """
+        Thread-safe LRU cache with per-entry time to live
+
+        Args:
+            max_size (int): Maximum number of entries
+            ttl (float): Seconds an entry stays valid (0 disables expiry)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidations so in-flight loads don't cache stale data
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        Get a cached value
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entries if full
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Read-through access: load and cache the value on a miss
+
+        Args:
+            key: Cache key
+            loader (callable): Computes the value on a miss
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        value = self.get(key)
+        if value is MISSING:
+            generation = self._generation
+            value = loader()
+            if generation == self._generation:
+                self.set(key, value)
+        return value
+
+    @property
+    def generation(self) -> int:
+        """Invalidation counter, see set_many"""
+        return self._generation
+
+    def set_many(self, items: Dict[Hashable, Any], generation: int = None):
+        """
+        Store several values at once
+
+        Args:
+            items (dict): Values by key
+            generation (int, optional): Generation read before loading the
+                values; nothing is stored if an invalidation happened since
+        """
+        if generation is not None and generation != self._generation:
+            return
+        for key, value in items.items():
+            self.set(key, value)
+
+    def invalidate(self, key: Hashable):
+        """
+        Drop one entry
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics
+
+        Returns:
+            Dict with size, hits, misses, hit ratio, evictions and expirations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+class CatalogCache:
+    """
+    Book documents and catalog query results shared by all controllers
+    of a connection
+
+    Books are held as models.Book (slots instead of a dict per document,
+    converted back with to_dict() on read) and invalidated by _id when a
+    book changes; query
+    results (searches, pages, pickers) are dropped on every catalog write
+    since any write may change them.
+    """
+
+    # One shared cache per database connection
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_connection(cls, db_connection) -> 'CatalogCache':
+        """
+        Get the cache shared by all controllers of a connection
+
+        Args:
+            db_connection (DatabaseConnection): Database connection
+
+        Returns:
+            CatalogCache: Shared cache
+        """
+        with cls._instances_lock:
+            cache = cls._instances.get(id(db_connection))
+            if cache is None:
+                cache = cls._instances[id(db_connection)] = cls()
+            return cache
+
+    def __init__(self, max_books: int = 50000, max_queries: int = 500, ttl: float = 60.0):
+        """
+        Args:
+            max_books (int): Maximum number of cached book documents
+            max_queries (int): Maximum number of cached query results
+            ttl (float): Seconds before entries are re-read from MongoDB
+        """
+        self.books = LRUCache(max_books, ttl)
+        self.queries = LRUCache(max_queries, ttl)
+
+    def book_changed(self, book_id=None):
+        """
+        Invalidate after a catalog write
+
+        Args:
+            book_id (optional): _id of the changed book; None for inserts
+        """
+        if book_id is not None:
+            self.books.invalidate(book_id)
+        self.queries.clear()
+
+    def clear(self):
+        """Drop every cached entry"""
+        self.books.clear()
+        self.queries.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Statistics of both cache regions
+
+        Returns:
+            Dict with 'books' and 'queries' statistics
+        """
+        return {"books": self.books.stats(), "queries": self.queries.stats()}
@@ -0,0 +1,390 @@
+# digital_library/controllers/checkout.py
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+from controllers.order_summaries import OrderSummaries
+
+# Server error code for transactions on a standalone server
+ILLEGAL_OPERATION = 20
+
+class CheckoutEngine:
+    """
+    Create many orders at once, paying them from the users' wallets
+
+    A checkout batch resolves every book price with one query, debits each
+    user once with a conditional $inc (the wallet must cover the amount)
+    and inserts the orders with one bulk_write. On a replica set all
+    writes of a batch run in one transaction; on a standalone server the
+    engine falls back to compensating writes (see _write_batch).
+
+    Every debit leaves a marker (checkout _id, amount, time) in the user's
+    pending_checkouts until the orders of the batch are written, and every
+    order records its checkout_id, so a checkout interrupted between the
+    two can be settled later by recover_checkouts.
+    """
+
+    # Minutes after which an unsettled checkout marker is considered abandoned
+    RECOVERY_AGE_MINUTES = 10
+
+    def __init__(self, db_connection, batch_size: int = 1000):
+        """
+        Args:
+            db_connection (DatabaseConnection): Database connection
+            batch_size (int): Orders written per transaction
+        """
+        self.db = db_connection
+        self.batch_size = batch_size
+        self.summaries = OrderSummaries.for_connection(db_connection)
+        # Set to False once the server rejected a transaction
+        self.transactions_supported = None
+
+    def checkout(self,
+                 orders: Iterable[Dict[str, Any]],
+                 debit_wallets: bool = True,
+                 use_transaction: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Create orders in batches
+
+        Args:
+            orders (iterable): Dicts with 'user_id' and 'book_ids' (ObjectIds
+                or their strings)
+            debit_wallets (bool): Charge the order totals to the users'
+                wallets; orders a wallet cannot cover are rejected
+            use_transaction (bool, optional): True requires transactions,
+                False never uses them, None uses them when the server
+                supports them
+
+        Returns:
+            Dict with the created 'orders' (index, order_id, user_id,
+            total_price), the 'rejected' orders (index, reason), counts,
+            'elapsed' seconds and 'rate' (orders per second)
+        """
+        use_transactions = use_transaction or (use_transaction is None and self.transactions_supported is not False)
+        stats = {"success": True, "created": 0, "failed": 0, "orders": [], "rejected": [],
+                 "transactions": use_transactions, "elapsed": 0.0, "rate": 0.0}
+        started = time.perf_counter()
+
+        batch = []
+        for index, order in enumerate(orders):
+            batch.append((index, order))
+            if len(batch) >= self.batch_size:
+                self._checkout_batch(batch, debit_wallets, use_transaction, stats)
+                batch = []
+        if batch:
+            self._checkout_batch(batch, debit_wallets, use_transaction, stats)
+
+        total = stats["created"] + stats["failed"]
+        stats["elapsed"] = time.perf_counter() - started
+        stats["rate"] = total / stats["elapsed"] if stats["elapsed"] else 0.0
+        stats["success"] = stats["failed"] == 0
+        stats["message"] = f"Created {stats['created']} of {total} orders ({stats['failed']} rejected)"
+        return stats
+
+    def _checkout_batch(self, batch, debit_wallets, use_transaction, stats):
+        """Price, pay and write one batch of orders"""
+        requests = []
+        for index, order in batch:
+            try:
+                user_id = self._as_object_id(order['user_id'])
+                book_ids = [self._as_object_id(book_id) for book_id in order['book_ids']]
+            except (KeyError, TypeError, InvalidId) as e:
+                self._reject(stats, index, f"Invalid order: {e}")
+                continue
+            if not book_ids:
+                self._reject(stats, index, "Order has no books")
+                continue
+            requests.append({'index': index, 'user_id': user_id, 'book_ids': book_ids})
+
+        if not requests:
+            return
+
+        # All prices of the batch in one query
+        all_book_ids = list({book_id for request in requests for book_id in request['book_ids']})
+        prices = {
+            book['_id']: book.get('price', 0)
+            for book in self.db.books.find({'_id': {'$in': all_book_ids}}, {'price': 1})
+        }
+
+        priced = []
+        for request in requests:
+            unknown = [book_id for book_id in request['book_ids'] if book_id not in prices]
+            if unknown:
+                self._reject(stats, request['index'], f"Unknown book: {unknown[0]}")
+                continue
+            request['total_price'] = round(sum(prices[book_id] for book_id in request['book_ids']), 2)
+            priced.append(request)
+
+        if debit_wallets:
+            priced = self._allocate(priced, stats)
+
+        if priced:
+            self._write_batch(priced, debit_wallets, use_transaction, stats)
+
+    def _allocate(self, requests: List[Dict[str, Any]], stats) -> List[Dict[str, Any]]:
+        """
+        Accept orders, in request order, while each user's wallet covers them
+
+        The balances read here only decide which orders are attempted; the
+        debit itself is conditional, so a concurrent change cannot
+        overdraw a wallet.
+        """
+        user_ids = list({request['user_id'] for request in requests})
+        balances = {
+            user['_id']: user.get('wallet', 0) or 0
+            for user in self.db.users.find({'_id': {'$in': user_ids}}, {'wallet': 1})
+        }
+
+        accepted = []
+        for request in requests:
+            user_id = request['user_id']
+            if user_id not in balances:
+                self._reject(stats, request['index'], f"Unknown user: {user_id}")
+            elif balances[user_id] < request['total_price']:
+                self._reject(stats, request['index'], "Insufficient funds")
+            else:
+                balances[user_id] -= request['total_price']
+                accepted.append(request)
+        return accepted
+
+    def _write_batch(self, requests, debit_wallets, use_transaction, stats):
+        """
+        Debit the wallets and insert the orders of a batch
+
+        Each debit pushes a checkout marker on the user so the users whose
+        conditional update matched can be found with one query. In a
+        transaction the writes commit together; without one, orders whose
+        debit failed are dropped, orders that fail to insert are refunded,
+        and if the batch fails part-way the debits not matched by a written
+        order are refunded (see settle_checkout).
+        """
+        checkout_id = ObjectId()
+        # Orders the write attempted, to sort out a failed batch
+        attempted = []
+
+        def write(session=None):
+            attempted.clear()
+            debited_users = set()
+            if debit_wallets:
+                debited_users = self._debit(requests, checkout_id, session)
+
+            created, rejected = [], []
+            operations = []
+            for request in requests:
+                if debit_wallets and request['user_id'] not in debited_users:
+                    rejected.append((request['index'], "Insufficient funds"))
+                    continue
+                order = {
+                    '_id': ObjectId(),
+                    'user_id': request['user_id'],
+                    'book_ids': request['book_ids'],
+                    'total_price': request['total_price'],
+                    'version': 1,
+                    'order_date': datetime.utcnow(),
+                    'checkout_id': checkout_id
+                }
+                operations.append(InsertOne(order))
+                created.append((request, order))
+            attempted.extend(created)
+
+            if operations:
+                try:
+                    self.db.orders.bulk_write(operations, ordered=False, session=session)
+                except BulkWriteError as e:
+                    if session is not None:
+                        raise
+                    # Without a transaction: keep the orders that were written
+                    # and refund the others
+                    failed = {write_error['index']: write_error.get('errmsg', 'Write error')
+                              for write_error in e.details.get('writeErrors', [])}
+                    refunds = [request for i, (request, _) in enumerate(created) if i in failed]
+                    self._refund(refunds, checkout_id)
+                    rejected.extend((created[i][0]['index'], f"Write error: {message}")
+                                    for i, message in failed.items())
+                    created = [entry for i, entry in enumerate(created) if i not in failed]
+
+            # Keep the Orders tab's materialized view in step
+            self.summaries.record([order for _, order in created], session)
+
+            if debited_users:
+                self.db.users.update_many(
+                    {'_id': {'$in': list(debited_users)}},
+                    {'$pull': {'pending_checkouts': {'_id': checkout_id}}},
+                    session=session
+                )
+            return created, rejected
+
+        try:
+            created, rejected = self._run(write, use_transaction, stats)
+        except PyMongoError as e:
+            # In a transaction nothing of the batch was written; otherwise
+            # keep the orders that were and refund the debits of the others
+            created = [] if stats["transactions"] else self._settle_failed_batch(checkout_id, attempted)
+            kept = {id(request) for request, _ in created}
+            rejected = [(request['index'], f"Checkout failed: {e}") for request in requests if id(request) not in kept]
+
+        for index, reason in rejected:
+            self._reject(stats, index, reason)
+        for request, order in created:
+            stats["orders"].append({
+                "index": request['index'],
+                "order_id": str(order['_id']),
+                "user_id": str(order['user_id']),
+                "total_price": order['total_price']
+            })
+        stats["created"] += len(created)
+
+    def _run(self, write, use_transaction, stats):
+        """Run write in a transaction when possible (see checkout)"""
+        if stats["transactions"]:
+            try:
+                with self.db.client.start_session() as session:
+                    return session.with_transaction(lambda session: write(session))
+            except OperationFailure as e:
+                if e.code != ILLEGAL_OPERATION or use_transaction:
+                    raise
+                print(f"Transactions not supported, using compensating writes: {e}")
+                self.transactions_supported = False
+                stats["transactions"] = False
+        return write()
+
+    def _debit(self, requests, checkout_id, session=None) -> set:
+        """
+        Charge every user of a batch once with a conditional $inc
+
+        Returns:
+            set: _ids of the users whose wallet was debited
+        """
+        totals = {}
+        for request in requests:
+            totals[request['user_id']] = round(totals.get(request['user_id'], 0) + request['total_price'], 2)
+
+        now = datetime.utcnow()
+        result = self.db.users.bulk_write([
+            UpdateOne(
+                {'_id': user_id, 'wallet': {'$gte': amount}},
+                {
+                    '$inc': {'wallet': -amount},
+                    '$push': {'pending_checkouts': {'_id': checkout_id, 'amount': amount, 'at': now}}
+                }
+            )
+            for user_id, amount in totals.items()
+        ], ordered=False, session=session)
+
+        if result.matched_count == len(totals):
+            return set(totals)
+        return {
+            user['_id']
+            for user in self.db.users.find(
+                {'_id': {'$in': list(totals)}, 'pending_checkouts._id': checkout_id}, {'_id': 1}, session=session
+            )
+        }
+
+    def _settle_failed_batch(self, checkout_id, attempted) -> list:
+        """
+        Keep the written orders of a batch that failed without a transaction
+
+        Returns:
+            list: (request, order) pairs of the orders that were written;
+            empty if the database cannot be read, in which case the markers
+            are left for recover_checkouts
+        """
+        try:
+            written = self.settle_checkout(checkout_id)
+        except PyMongoError as e:
+            print(f"Checkout {checkout_id} could not be settled ({e}); run recover-checkouts")
+            return []
+        created = [(request, order) for request, order in attempted if order['_id'] in written]
+        try:
+            self.summaries.record([order for _, order in created])
+        except PyMongoError as e:
+            print(f"Order summaries not updated ({e}); run refresh-order-summaries")
+        return created
+
+    def settle_checkout(self, checkout_id: ObjectId) -> Set[ObjectId]:
+        """
+        Settle an interrupted checkout from its markers
+
+        Each debited user is refunded the part of the debit not covered by
+        the orders the checkout wrote, and the marker is removed in the
+        same conditional update, so a checkout is never refunded twice.
+
+        Args:
+            checkout_id (ObjectId): Checkout batch
+
+        Returns:
+            set: _ids of the orders the checkout wrote
+        """
+        written = set()
+        users = self.db.users.find({'pending_checkouts._id': checkout_id}, {'pending_checkouts': 1})
+        for user in users:
+            marker = next((entry for entry in user.get('pending_checkouts', [])
+                           if isinstance(entry, dict) and entry.get('_id') == checkout_id), None)
+            if marker is None:
+                continue
+            orders = list(self.db.orders.find({'user_id': user['_id'], 'checkout_id': checkout_id},
+                                              {'total_price': 1}))
+            written.update(order['_id'] for order in orders)
+            refund = round(marker.get('amount', 0) - sum(order.get('total_price', 0) for order in orders), 2)
+            self.db.users.update_one(
+                {'_id': user['_id'], 'pending_checkouts._id': checkout_id},
+                {'$inc': {'wallet': max(refund, 0)}, '$pull': {'pending_checkouts': {'_id': checkout_id}}}
+            )
+        return written
+
+    def recover_checkouts(self, older_than_minutes: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Settle every checkout left unfinished (e.g. the process stopped)
+
+        Args:
+            older_than_minutes (float, optional): Only settle markers older
+                than this, so running checkouts are left alone; defaults to
+                RECOVERY_AGE_MINUTES
+
+        Returns:
+            Dict with the number of 'checkouts' settled and their 'orders'
+        """
+        if older_than_minutes is None:
+            older_than_minutes = self.RECOVERY_AGE_MINUTES
+        cutoff = datetime.utcnow() - timedelta(minutes=older_than_minutes)
+        checkout_ids = set()
+        markers = self.db.users.find({'pending_checkouts._id': {'$exists': True}}, {'pending_checkouts': 1})
+        for user in markers:
+            checkout_ids.update(entry['_id'] for entry in user.get('pending_checkouts', [])
+                                if isinstance(entry, dict) and entry.get('at') and entry['at'] < cutoff)
+
+        orders = sum(len(self.settle_checkout(checkout_id)) for checkout_id in checkout_ids)
+        return {
+            "success": True,
+            "checkouts": len(checkout_ids),
+            "orders": orders,
+            "message": f"Settled {len(checkout_ids)} interrupted checkouts ({orders} orders kept)"
+        }
+
+    def _refund(self, requests, checkout_id):
+        """Give back the debits of orders that could not be written"""
+        totals = {}
+        for request in requests:
+            totals[request['user_id']] = round(totals.get(request['user_id'], 0) + request['total_price'], 2)
+        if totals:
+            # The marker's amount shrinks too, so settle_checkout does not refund it again
+            self.db.users.bulk_write([
+                UpdateOne(
+                    {'_id': user_id, 'pending_checkouts._id': checkout_id},
+                    {'$inc': {'wallet': amount, 'pending_checkouts.$.amount': -amount}}
+                )
+                for user_id, amount in totals.items()
+            ], ordered=False)
+
+    @staticmethod
+    def _as_object_id(value) -> ObjectId:
+        """Convert an ObjectId string, raising InvalidId if it is not one"""
+        return value if isinstance(value, ObjectId) else ObjectId(value)
+
+    @staticmethod
+    def _reject(stats, index, reason):
+        stats["failed"] += 1
+        stats["rejected"].append((index, reason))
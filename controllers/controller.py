@@ -1,12 +1,54 @@
 # digital_library/controllers/controller.py
-import tkinter as tk
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Union, Iterable, Optional, Callable
+from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 from config.database import db_connection
+from controllers.search_index import CatalogSearchIndex
+from controllers.loader import BatchLoader
+from controllers.cache import CatalogCache, MISSING
+from controllers.serialization import display_collection, fields_projection
+from controllers.checkout import CheckoutEngine
+from controllers.order_summaries import OrderSummaries
+from controllers.query_builder import SearchQuery, DEFAULT_SEARCH_LIMIT, keyset_conditions
 from models.models import Book, User, Order, Review
-from utils.helpers import validate_email, hash_password, validate_password_strength
+from utils.helpers import validate_email, hash_password, validate_password_strength, normalize_isbn
+
+# Server error code for a $text query without a text index
+INDEX_NOT_FOUND = 27
 
 class LibraryController:
+    # Fields every book must provide
+    REQUIRED_BOOK_FIELDS = ['title', 'author', 'isbn', 'published_year', 'price']
+    
+    # Rating aggregates of a book without reviews
+    EMPTY_RATINGS = {
+        'ratingCount': 0,
+        'ratingSum': 0,
+        'ratingAvg': 0,
+        'ratingHistogram': {str(stars): 0 for stars in range(1, 6)}
+    }
+    
+    # Average rating computed from the stored counters (update pipeline)
+    RATING_AVERAGE = {
+        '$cond': [
+            {'$gt': ['$ratingCount', 0]},
+            {'$divide': ['$ratingSum', '$ratingCount']},
+            0
+        ]
+    }
+    
+    # Fields returned by the list queries of each table and picker
+    BOOK_LIST_FIELDS = ['title', 'author', 'isbn', 'publishedYear', 'price', 'categories',
+                        'ratingAvg', 'ratingCount', 'version', 'updatedAt']
+    BOOK_CHOICE_FIELDS = ['title', 'author']
+    USER_LIST_FIELDS = ['username', 'email', 'registration_date']
+    USER_CHOICE_FIELDS = ['username']
+    ORDER_LIST_FIELDS = ['username', 'book_count', 'total_price', 'order_date', 'version']
+    REVIEW_LIST_FIELDS = ['book_id', 'user_id', 'rating', 'review_text', 'review_date']
+    
     def __init__(self, db_connection):
         """
         Main controller for digital library operations
@@ -15,80 +57,850 @@ class LibraryController:
             db_connection (DatabaseConnection): Database connection
         """
         self.db = db_connection
+        self.search_index = CatalogSearchIndex.for_connection(db_connection)
+        self.cache = CatalogCache.for_connection(db_connection)
+        self.order_summaries = OrderSummaries.for_connection(db_connection)
+        self.checkout_engine = CheckoutEngine(db_connection)
+        # Set to False once the server rejected a $text query (no text
+        # index on the reviews); review text is then matched with a regex
+        self.text_search_supported = True
+        # Set to False for clients without custom type registries or
+        # $lookup sub-pipelines (e.g. mongomock): documents are then read
+        # with the default codec options and joined on localField
+        self.display_codecs_supported = True
+        self.lookup_pipelines_supported = True
     
-    # Existing methods remain the same, but add helper method for ObjectId conversion
-    def _convert_objectid_to_str(self, data):
+    def search_books(self, 
+                     query: Union[str, Dict[str, Any]], 
+                     limit: int = 50, 
+                     fields: List[str] = None) -> List[Dict[str, Any]]:
         """
-        Recursively convert ObjectId to string in nested dictionaries
+        Search books based on various criteria
+        
+        A text query goes through the catalog search index (title, author
+        and ISBN, prefix matching, ranked by relevance). A dict is used as
+        a raw MongoDB filter.
         
         Args:
-            data (dict or list): Data to convert
+            query (str or dict): Search text or MongoDB filter
+            limit (int): Maximum number of results
+            fields (list, optional): Fields to return for a MongoDB filter
         
         Returns:
-            Converted data with ObjectId converted to strings
+            List of matching books with ObjectIds as strings (shared with
+            the cache, do not modify)
         """
-        if isinstance(data, dict):
-            return {
-                k: (str(v) if isinstance(v, ObjectId) else 
-                    self._convert_objectid_to_str(v)) 
-                for k, v in data.items()
-            }
-        elif isinstance(data, list):
-            return [self._convert_objectid_to_str(item) for item in data]
-        return data
+        if isinstance(query, dict):
+            books = self._display(self.db.books).find(query, fields_projection(fields))
+            return list(books.limit(limit))
+        
+        return list(self.cache.queries.get_or_load(
+            ('search', query.strip().lower(), limit),
+            lambda: self._search_catalog(query, limit)
+        ))
     
-    def search_books(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _search_catalog(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Run a text search against the catalog search index"""
+        # Builds on first use and rebuilds after writes from other processes
+        self.search_index.ensure_current(self.db.books)
+        
+        ranked_ids = self.search_index.search(query, limit=limit)
+        if not ranked_ids:
+            return []
+        
+        # Fetch the matches (cached or in one query) and restore the relevance order
+        books_by_id = self.get_books_by_ids(ranked_ids)
+        return [books_by_id[book_id] for book_id in ranked_ids if book_id in books_by_id]
+    
+    def get_books_page(self, 
+                       after=None, 
+                       before=None, 
+                       page_size: int = 100, 
+                       sort_field: str = '_id', 
+                       query: Dict[str, Any] = None, 
+                       ids: List[Any] = None, 
+                       fields: List[str] = None, 
+                       descending: bool = False, 
+                       fresh: bool = False) -> Dict[str, Any]:
         """
-        Search books based on various criteria
+        Fetch one page of books using keyset pagination
+        
+        Pages are addressed by the (sort value, _id) of the row next to them
+        instead of an offset, so every page is an index range scan no
+        matter how deep the user has scrolled. Pages are kept in the query
+        cache, which only writes of this process invalidate; refreshes
+        pass fresh=True to see changes made elsewhere.
         
         Args:
-            query (dict): Search criteria
+            after (tuple, optional): Cursor of the row preceding the page
+            before (tuple, optional): Cursor of the row following the page
+            page_size (int): Number of books per page
+            sort_field (str): Field to sort on, ties broken by _id
+            query (dict, optional): Additional MongoDB filter
+            ids (list, optional): Restrict the page to these _ids (used to
+                re-read the rows currently displayed)
+            fields (list, optional): Fields to return (all when omitted)
+            descending (bool): Sort in descending order (e.g. top rated first)
+            fresh (bool): Read the page from the database, replacing the
+                cached one
         
         Returns:
-            List of matching books with ObjectIds converted to strings
+            Dict with the page 'items', its 'first' and 'last' cursors and
+            whether more rows exist in the fetch direction ('has_more')
         """
-        books = list(self.db.books.find(query))
-        return [self._convert_objectid_to_str(book) for book in books]
+        key = ('page', after, before, page_size, sort_field, descending, repr(query), tuple(ids or ()), tuple(fields or ()))
+        if fresh:
+            self.cache.queries.invalidate(key)
+        return self.cache.queries.get_or_load(
+            key,
+            lambda: self._fetch_books_page(after, before, page_size, sort_field, query, ids, fields, descending)
+        )
+    
+    def _fetch_books_page(self, after, before, page_size, sort_field, query, ids, fields, descending) -> Dict[str, Any]:
+        """Query one keyset page of books, see get_books_page"""
+        conditions = [query] if query else []
+        if ids is not None:
+            conditions.append({'_id': {'$in': [BatchLoader._as_id(value) for value in ids]}})
+        cursor = after if after is not None else before
+        
+        if cursor is not None:
+            operator = '$gt' if (after is not None) != descending else '$lt'
+            value, last_id = cursor
+            if sort_field == '_id':
+                conditions.append({'_id': {operator: last_id}})
+            else:
+                conditions.append({'$or': keyset_conditions(sort_field, operator, value, last_id)})
+        
+        # Pages before the cursor are read backwards, then reversed
+        direction = 1 if (before is None) != descending else -1
+        sort = [('_id', direction)] if sort_field == '_id' else [(sort_field, direction), ('_id', direction)]
+        
+        projection = fields_projection(fields)
+        if projection is not None and sort_field != '_id':
+            projection[sort_field] = 1
+        
+        books = list(
+            self._display(self.db.books)
+            .find({'$and': conditions} if conditions else {}, projection)
+            .sort(sort)
+            .limit(page_size + 1)
+        )
+        has_more = len(books) > page_size
+        books = books[:page_size]
+        if before is not None:
+            books.reverse()
+        
+        # Cursors hold the stored _id type so they compare correctly in queries
+        def make_cursor(book):
+            book_id = BatchLoader._as_id(book['_id'])
+            return (book.get(sort_field) if sort_field != '_id' else book_id, book_id)
+        
+        return {
+            "items": books,
+            "first": make_cursor(books[0]) if books else None,
+            "last": make_cursor(books[-1]) if books else None,
+            "has_more": has_more
+        }
     
-    def create_order(self, user_id: str, book_ids: List[str]) -> Dict[str, Any]:
+    def book_loader(self, projection: Dict[str, Any] = None) -> BatchLoader:
         """
-        Create a new order
+        Create a batched book loader for one request
         
         Args:
-            user_id (str): User placing the order
-            book_ids (list): Books to be ordered
+            projection (dict, optional): Book fields to fetch
         
         Returns:
-            Dict containing order creation result
+            BatchLoader: Loader memoizing books by _id
+        """
+        return BatchLoader(self.db.books, projection)
+    
+    def user_loader(self, projection: Dict[str, Any] = None) -> BatchLoader:
+        """
+        Create a batched user loader for one request
+        
+        Args:
+            projection (dict, optional): User fields to fetch
+        
+        Returns:
+            BatchLoader: Loader memoizing users by _id
+        """
+        return BatchLoader(self.db.users, projection)
+    
+    def get_books_by_ids(self, book_ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Fetch many books, reading through the catalog cache
+        
+        Books missing from the cache are fetched with a single $in query.
+        
+        Args:
+            book_ids (list): Book _ids (ObjectId or strings)
+        
+        Returns:
+            Dict mapping book _id (ObjectId) to the book document, decoded
+            with string ObjectIds
+        """
+        found = {}
+        missing = []
+        for book_id in dict.fromkeys(BatchLoader._as_id(value) for value in book_ids):
+            book = self.cache.books.get(book_id)
+            if book is MISSING:
+                missing.append(book_id)
+            elif book is not None:
+                found[book_id] = book.to_dict()
+        
+        if missing:
+            generation = self.cache.books.generation
+            # Cached documents are decoded for display (string _ids)
+            loaded = BatchLoader(self._display(self.db.books)).load_many(missing)
+            # Books are cached as compact models, unknown ids as None so
+            # they are not looked up again
+            shared = {}
+            self.cache.books.set_many({
+                book_id: Book.from_document(loaded[book_id], shared) if book_id in loaded else None
+                for book_id in missing
+            }, generation)
+            found.update(loaded)
+        
+        return found
+    
+    def get_book_choices(self) -> List[Dict[str, Any]]:
+        """
+        List every book for selection widgets (cached)
+        
+        Returns:
+            List of books with _id, title and author
+        """
+        return self.cache.queries.get_or_load(
+            ('choices',),
+            lambda: list(
+                self._display(self.db.books)
+                .find({}, fields_projection(self.BOOK_CHOICE_FIELDS))
+                .sort('title', 1)
+            )
+        )
+    
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Hit/miss statistics of the catalog cache
+        
+        Returns:
+            Dict with 'books' and 'queries' statistics
+        """
+        return self.cache.stats()
+    
+    def get_order_details(self, order_id) -> Dict[str, Any]:
+        """
+        Fetch an order together with the books it contains
+        
+        Args:
+            order_id (str or ObjectId): Order identifier
+        
+        Returns:
+            Dict with the 'order' (None if not found) and its 'books'
+        """
+        if isinstance(order_id, str) and ObjectId.is_valid(order_id):
+            order_id = ObjectId(order_id)
+        
+        order = self.db.orders.find_one({'_id': order_id})
+        if not order:
+            return {"order": None, "books": []}
+        
+        book_ids = order.get('book_ids', [])
+        books = self.get_books_by_ids(book_ids)
+        
+        return {
+            "order": order,
+            "books": [books[book_id] for book_id in book_ids if book_id in books]
+        }
+    
+    def list_reviews(self, query: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        List reviews with their book title and username resolved
+        
+        Books and users are resolved with one batched query each instead
+        of joining every review.
+        
+        Args:
+            query (dict, optional): MongoDB filter on reviews
+        
+        Returns:
+            List of reviews with 'book_title' and 'username' added
+        """
+        reviews = list(self.db.reviews.find(query or {}, fields_projection(self.REVIEW_LIST_FIELDS)))
+        
+        books = self.book_loader({'title': 1}).load_many(review.get('book_id') for review in reviews)
+        users = self.user_loader({'username': 1}).load_many(review.get('user_id') for review in reviews)
+        
+        for review in reviews:
+            review['book_title'] = books.get(review.get('book_id'), {}).get('title', 'Unknown Book')
+            review['username'] = users.get(review.get('user_id'), {}).get('username', 'Unknown User')
+        
+        return reviews
+    
+    def add_review(self, book_id, user_id, rating: int, review_text: str) -> Dict[str, Any]:
+        """
+        Add a review and count its rating in the book's aggregates
+        
+        Args:
+            book_id (str or ObjectId): Reviewed book
+            user_id (str or ObjectId): Reviewing user
+            rating (int): Stars, 1 to 5
+            review_text (str): Review text
+        
+        Returns:
+            Dict containing review addition result
         """
         try:
-            # Ensure user_id and book_ids are ObjectId
-            user_obj_id = ObjectId(user_id)
-            book_obj_ids = [ObjectId(bid) for bid in book_ids]
-            
-            # Fetch book prices
-            books = list(self.db.books.find({"_id": {"$in": book_obj_ids}}))
-            total_price = sum(book['price'] for book in books)
+            rating = int(rating)
+            if not 1 <= rating <= 5:
+                return {"success": False, "message": "Rating must be between 1 and 5"}
             
-            # Create order
-            new_order = {
-                'user_id': user_obj_id,
-                'book_ids': book_obj_ids,
-                'total_price': total_price,
-                'order_date': tk.datetime.now()  # You might want to import datetime
+            review = {
+                'book_id': BatchLoader._as_id(book_id),
+                'user_id': BatchLoader._as_id(user_id),
+                'rating': rating,
+                'review_text': review_text,
+                'review_date': datetime.utcnow(),
+                'version': 1
             }
-            
-            result = self.db.orders.insert_one(new_order)
+            result = self.db.reviews.insert_one(review)
+            self._update_ratings(review['book_id'], 1, rating, {rating: 1})
             
             return {
                 "success": True, 
-                "message": "Order created successfully",
-                "order_id": str(result.inserted_id),
-                "total_price": total_price
+                "message": "Review added successfully",
+                "review_id": str(result.inserted_id)
             }
+        except Exception as e:
+            return {"success": False, "message": f"Error adding review: {str(e)}"}
+    
+    def edit_review(self, review_id, rating: int = None, review_text: str = None) -> Dict[str, Any]:
+        """
+        Edit a review, moving its rating between the book's aggregates
+        
+        Args:
+            review_id (str or ObjectId): Review to edit
+            rating (int, optional): New stars, 1 to 5
+            review_text (str, optional): New review text
+        
+        Returns:
+            Dict containing review edit result
+        """
+        try:
+            update = {'updatedAt': datetime.utcnow()}
+            if rating is not None:
+                rating = int(rating)
+                if not 1 <= rating <= 5:
+                    return {"success": False, "message": "Rating must be between 1 and 5"}
+                update['rating'] = rating
+            if review_text is not None:
+                update['review_text'] = review_text
+            
+            # The previous rating tells which counters to move
+            previous = self.db.reviews.find_one_and_update(
+                {'_id': BatchLoader._as_id(review_id)},
+                {'$set': update, '$inc': {'version': 1}},
+                projection={'book_id': 1, 'rating': 1},
+                return_document=ReturnDocument.BEFORE
+            )
+            if not previous:
+                return {"success": False, "message": "Review not found"}
+            
+            old_rating = previous.get('rating')
+            if rating is not None and rating != old_rating:
+                histogram = {rating: 1}
+                if old_rating:
+                    histogram[old_rating] = -1
+                self._update_ratings(previous['book_id'], 0 if old_rating else 1, rating - (old_rating or 0), histogram)
+            
+            return {"success": True, "message": "Review updated successfully"}
+        except Exception as e:
+            return {"success": False, "message": f"Error updating review: {str(e)}"}
+    
+    def delete_review(self, review_id) -> Dict[str, Any]:
+        """
+        Delete a review and remove its rating from the book's aggregates
+        
+        Args:
+            review_id (str or ObjectId): Review to delete
+        
+        Returns:
+            Dict containing review deletion result
+        """
+        try:
+            review = self.db.reviews.find_one_and_delete(
+                {'_id': BatchLoader._as_id(review_id)},
+                projection={'book_id': 1, 'rating': 1}
+            )
+            if not review:
+                return {"success": False, "message": "Review not found"}
+            
+            rating = review.get('rating')
+            if rating:
+                self._update_ratings(review['book_id'], -1, -rating, {rating: -1})
+            
+            return {"success": True, "message": "Review deleted successfully"}
+        except Exception as e:
+            return {"success": False, "message": f"Error deleting review: {str(e)}"}
+    
+    def _update_ratings(self, book_id, count: int, total: int, histogram: Dict[int, int]):
+        """
+        Apply a change to a book's rating aggregates
+        
+        The counters are incremented and the average recomputed from them
+        in a single update pipeline, so concurrent updates cannot leave it
+        out of step. Missing counters count as 0.
+        
+        Args:
+            book_id (ObjectId): Book
+            count (int): Change of the number of ratings
+            total (int): Change of the sum of the ratings
+            histogram (dict): Change of the count per number of stars
+        """
+        def increment(path, change):
+            return {'$add': [{'$ifNull': [f'${path}', 0]}, change]}
+        
+        changes = {int(stars): change for stars, change in histogram.items()}
+        counters = {
+            'ratingCount': increment('ratingCount', count),
+            'ratingSum': increment('ratingSum', total),
+            'ratingHistogram': {
+                str(stars): increment(f'ratingHistogram.{stars}', changes.get(stars, 0)) for stars in range(1, 6)
+            },
+            'version': increment('version', 1)
+        }
+        
+        self.db.books.update_one({'_id': book_id}, [
+            {'$set': counters},
+            {'$set': {'ratingAvg': self.RATING_AVERAGE}}
+        ])
+        self.cache.book_changed(book_id)
+    
+    def rebuild_rating_aggregates(self, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Recompute the rating aggregates of every book from the reviews
+        
+        Repairs drift (e.g. reviews written by other tools). Aggregates are
+        grouped on the server and written in unordered bulk batches; books
+        without reviews, or without aggregates at all (e.g. inserted by other
+        tools), are reset to 0 afterwards so they keep their place when paging
+        by rating.
+        
+        Args:
+            batch_size (int): Number of updates per bulk_write
+        
+        Returns:
+            Dict with the number of 'rated' and 'reset' books
+        """
+        started = datetime.utcnow()
+        stats = {"success": True, "rated": 0, "reset": 0}
+        
+        pipeline = [{'$match': {'rating': {'$gte': 1, '$lte': 5}}}]
+        pipeline.append({'$group': dict(
+            {'_id': '$book_id', 'ratingCount': {'$sum': 1}, 'ratingSum': {'$sum': '$rating'}},
+            **{
+                f'stars{stars}': {'$sum': {'$cond': [{'$eq': ['$rating', stars]}, 1, 0]}}
+                for stars in range(1, 6)
+            }
+        )})
+        
+        batch = []
+        for group in self.db.reviews.aggregate(pipeline, allowDiskUse=True):
+            batch.append(UpdateOne({'_id': group['_id']}, {
+                '$set': {
+                    'ratingCount': group['ratingCount'],
+                    'ratingSum': group['ratingSum'],
+                    'ratingAvg': group['ratingSum'] / group['ratingCount'],
+                    'ratingHistogram': {str(stars): group[f'stars{stars}'] for stars in range(1, 6)},
+                    'ratingsRebuiltAt': started
+                },
+                '$inc': {'version': 1}
+            }))
+            if len(batch) >= batch_size:
+                stats["rated"] += self.db.books.bulk_write(batch, ordered=False).matched_count
+                batch = []
+        if batch:
+            stats["rated"] += self.db.books.bulk_write(batch, ordered=False).matched_count
+        
+        # Books not touched above have no (valid) reviews
+        result = self.db.books.update_many(
+            {'ratingsRebuiltAt': {'$ne': started},
+             '$or': [{'ratingCount': {'$ne': 0}}, {'ratingAvg': {'$exists': False}}]},
+            {'$set': self.EMPTY_RATINGS, '$inc': {'version': 1}}
+        )
+        stats["reset"] = result.modified_count
+        
+        self.cache.clear()
+        stats["message"] = f"Rebuilt ratings of {stats['rated']} books ({stats['reset']} without reviews)"
+        return stats
+    
+    def search_reviews(self, search_term: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Search reviews by _id, book title, username or review text
+        
+        Args:
+            search_term (str): Review _id, the beginning of a book title or
+                username (case-insensitive), or words of the review text
+            limit (int): Maximum number of reviews
+        
+        Returns:
+            List of reviews with 'book_title' and 'username' added
+        """
+        try:
+            return self._review_search(search_term, limit).run()
+        except OperationFailure as e:
+            if e.code != INDEX_NOT_FOUND or not self.text_search_supported:
+                raise
+            print(f"No text index on reviews, matching review text with a regex: {e}")
+            self.text_search_supported = False
+            return self._review_search(search_term, limit).run()
+    
+    def _review_search(self, search_term: str, limit: int = DEFAULT_SEARCH_LIMIT) -> SearchQuery:
+        """
+        Build the review search: titles and usernames are resolved to
+        _ids first, and only the returned reviews are joined
+        """
+        search = (
+            SearchQuery(self.db.reviews, limit)
+            .match_id(search_term)
+            .match_reference('book_id', self.db.books, 'title_lower', search_term, 'title')
+            .match_reference('user_id', self.db.users, 'username_lower', search_term, 'username')
+        )
+        if self.text_search_supported:
+            search.match_words(search_term)
+        else:
+            search.match_text('review_text', search_term)
+        return (
+            search
+            .join(self._lookup_field('books', 'book_id', 'title', 'book_title', 'Unknown Book'))
+            .join(self._lookup_field('users', 'user_id', 'username', 'username', 'Unknown User'))
+            .project(fields_projection(self.REVIEW_LIST_FIELDS + ['book_title', 'username']))
+        )
+    
+    def get_orders_page(self, 
+                        after=None, 
+                        before=None, 
+                        page_size: int = 100, 
+                        ids: List[Any] = None, 
+                        fresh: bool = False) -> Dict[str, Any]:
+        """
+        Fetch one keyset page of the orders table, newest first
+        
+        Args:
+            after (tuple, optional): Cursor of the row preceding the page
+            before (tuple, optional): Cursor of the row following the page
+            page_size (int): Number of orders per page
+            ids (list, optional): Restrict the page to these _ids
+            fresh (bool): Accepted for PagedTable; summaries are always
+                read from the database
+        
+        Returns:
+            Dict with the page 'items' (order summaries), its 'first' and
+            'last' cursors and 'has_more', see get_books_page
+        """
+        return self.order_summaries.page(after, before, page_size, ids, fields_projection(self.ORDER_LIST_FIELDS))
+    
+    def list_orders(self, search_term: str = None, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        List orders for the orders table, newest first
+        
+        Reads the order_summaries collection, so no join with the users
+        is needed.
+        
+        Args:
+            search_term (str, optional): Order _id, or the beginning of a
+                username (case-insensitive)
+            limit (int): Maximum number of orders
+        
+        Returns:
+            List of order summaries with 'username' and 'book_count'
+        """
+        return self.order_summaries.search(search_term, fields_projection(self.ORDER_LIST_FIELDS), limit)
+    
+    def refresh_order_summaries(self) -> Dict[str, Any]:
+        """
+        Rebuild the order summaries from the orders collection ($merge)
+        
+        Returns:
+            Dict containing the refresh result
+        """
+        count = self.order_summaries.refresh()
+        return {"success": True, "summaries": count, "message": f"Refreshed {count} order summaries"}
+    
+    def _display(self, collection):
+        """
+        Get the collection books are read through for display
+        
+        Args:
+            collection (Collection): Collection with the default codec options
+        
+        Returns:
+            Collection: display_collection(collection), or the collection
+            itself when display codecs are not supported
+        """
+        return display_collection(collection) if self.display_codecs_supported else collection
+    
+    def _lookup_field(self, 
+                      collection: str, 
+                      local_field: str, 
+                      field: str, 
+                      as_field: str, 
+                      default: Any = None) -> List[Dict[str, Any]]:
+        """
+        Build stages joining a single field of another collection
+        
+        The joined document is projected inside the $lookup sub-pipeline,
+        so nothing else (e.g. password hashes) leaves the server. Without
+        sub-pipelines the whole document is joined, then reduced to the field.
+        
+        Args:
+            collection (str): Collection to join
+            local_field (str): Field holding the joined _id
+            field (str): Field of the joined document to fetch
+            as_field (str): Output field
+            default: Value used when there is no joined document
+        
+        Returns:
+            list: $lookup and $addFields stages
+        """
+        if not self.lookup_pipelines_supported:
+            return [
+                {'$lookup': {'from': collection, 'localField': local_field, 'foreignField': '_id', 'as': as_field}},
+                {'$addFields': {as_field: {'$ifNull': [{'$arrayElemAt': [f'${as_field}.{field}', 0]}, default]}}}
+            ]
+        return [
+            {
+                '$lookup': {
+                    'from': collection,
+                    'let': {'joined_id': f'${local_field}'},
+                    'pipeline': [
+                        {'$match': {'$expr': {'$eq': ['$_id', '$$joined_id']}}},
+                        {'$project': {'_id': 0, field: 1}}
+                    ],
+                    'as': as_field
+                }
+            },
+            {'$addFields': {as_field: {'$ifNull': [{'$arrayElemAt': [f'${as_field}.{field}', 0]}, default]}}}
+        ]
+    
+    def list_users(self, query: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        List users for the users table
+        
+        Args:
+            query (dict, optional): MongoDB filter on users
+        
+        Returns:
+            List of users with the USER_LIST_FIELDS
+        """
+        return list(self.db.users.find(query or {}, fields_projection(self.USER_LIST_FIELDS)))
+    
+    def search_users(self, search_term: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Search users by _id, username or email
+        
+        Args:
+            search_term (str): User _id, or the beginning of the username
+                or email (case-insensitive)
+            limit (int): Maximum number of users
+        
+        Returns:
+            List of users with the USER_LIST_FIELDS
+        """
+        return self._user_search(search_term, limit).run()
+    
+    def _user_search(self, search_term: str, limit: int = DEFAULT_SEARCH_LIMIT) -> SearchQuery:
+        """Build the user search on the username and email indexes"""
+        return (
+            SearchQuery(self.db.users, limit)
+            .match_id(search_term)
+            .match_prefix('username_lower', search_term, 'username')
+            .match_prefix('email_lower', search_term, 'email')
+            .project(fields_projection(self.USER_LIST_FIELDS))
+        )
+    
+    def explain_searches(self, search_term: str) -> Dict[str, Any]:
+        """
+        Explain the review and user searches for a term
+        
+        Reports the stages, indexes and keys examined of every query the
+        searches run, failing if any of them scans a whole collection or
+        examines far more index keys than it returns documents.
+        
+        Args:
+            search_term (str): Search term
+        
+        Returns:
+            Dict with the explain summary of each search
+        """
+        searches = {
+            'reviews': self._review_search(search_term).explain(),
+            'users': self._user_search(search_term).explain()
+        }
+        failed = [name for name, report in searches.items() if not report['success']]
+        return {
+            "success": not failed,
+            "searches": searches,
+            "message": f"Unselective queries in: {', '.join(failed)}" if failed else "All queries are selective"
+        }
+    
+    def get_user_choices(self) -> List[Dict[str, Any]]:
+        """
+        List every user for selection widgets
+        
+        Returns:
+            List of users with _id and username, sorted by username
+        """
+        return list(self.db.users.find({}, fields_projection(self.USER_CHOICE_FIELDS)).sort('username', 1))
+    
+    def count_orders_by_user(self, user_ids: List[Any] = None) -> Dict[Any, int]:
+        """
+        Count the orders of many users in a single aggregation
+        
+        Args:
+            user_ids (list, optional): User _ids to count orders for;
+                all users when omitted
+        
+        Returns:
+            Dict mapping user _id to its number of orders (users without
+            orders are absent)
+        """
+        pipeline = []
+        if user_ids is not None:
+            if not user_ids:
+                return {}
+            pipeline.append({'$match': {'user_id': {'$in': list(user_ids)}}})
+        pipeline.append({'$group': {'_id': '$user_id', 'count': {'$sum': 1}}})
+        
+        return {entry['_id']: entry['count'] for entry in self.db.orders.aggregate(pipeline)}
+    
+    def create_order(self, user_id: str, book_ids: List[str], debit_wallet: bool = False) -> Dict[str, Any]:
+        """
+        Create a new order
+        
+        Args:
+            user_id (str): User placing the order
+            book_ids (list): Books to be ordered
+            debit_wallet (bool): Pay the order from the user's wallet,
+                rejecting it when the wallet cannot cover it
+        
+        Returns:
+            Dict containing order creation result
+        """
+        try:
+            result = self.checkout_engine.checkout([{'user_id': user_id, 'book_ids': book_ids}], debit_wallet)
         except Exception as e:
             return {"success": False, "message": str(e)}
         
+        if not result['orders']:
+            _, reason = result['rejected'][0]
+            return {"success": False, "message": reason}
+        
+        order = result['orders'][0]
+        return {
+            "success": True, 
+            "message": "Order created successfully",
+            "order_id": order['order_id'],
+            "total_price": order['total_price']
+        }
+    
+    def checkout_orders(self, 
+                        orders: Iterable[Dict[str, Any]], 
+                        debit_wallets: bool = True, 
+                        use_transaction: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Create many orders at once, see CheckoutEngine.checkout
+        
+        Args:
+            orders (iterable): Dicts with 'user_id' and 'book_ids'
+            debit_wallets (bool): Charge the orders to the users' wallets
+            use_transaction (bool, optional): Require (True), disable
+                (False) or auto-detect (None) transactions
+        
+        Returns:
+            Dict with the created and rejected orders
+        """
+        return self.checkout_engine.checkout(orders, debit_wallets, use_transaction)
+    
+    def recover_checkouts(self, older_than_minutes: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Refund the debits of checkouts interrupted before their orders were written
+        
+        Args:
+            older_than_minutes (float, optional): Age from which a checkout
+                is considered interrupted
+        
+        Returns:
+            Dict containing the recovery result
+        """
+        return self.checkout_engine.recover_checkouts(older_than_minutes)
+        
+    def _validate_book_data(self, book_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Check that a book provides every required field
+        
+        Args:
+            book_data (dict): Book information
+        
+        Returns:
+            Error message, or None if the book is valid
+        """
+        for field in self.REQUIRED_BOOK_FIELDS:
+            if not book_data.get(field):
+                return f"Missing required field: {field}"
+        return None
+    
+    def _book_fields(self, book_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map book information to document fields, converting text values
+        (e.g. from a form or a CSV file) to their stored types
+        
+        Args:
+            book_data (dict): Validated book information
+        
+        Returns:
+            Dict of book document fields
+        
+        Raises:
+            ValueError: If the year or price is not a number
+        """
+        categories = book_data.get('categories') or []
+        if isinstance(categories, str):
+            categories = [category.strip() for category in categories.split(',') if category.strip()]
+        
+        isbn = str(book_data['isbn']).strip()
+        return {
+            'title': book_data['title'],
+            # Indexed for case-insensitive prefix searches
+            'title_lower': book_data['title'].lower(),
+            'author': book_data['author'],
+            'isbn': isbn,
+            # Canonical lookup key, None for values that are not valid ISBNs
+            'isbn13': normalize_isbn(isbn),
+            'publishedYear': int(book_data['published_year']),
+            'price': float(book_data['price']),
+            'categories': categories,
+            'description': book_data.get('description') or '',
+            'imprint': book_data.get('imprint') or ''
+        }
+    
+    def _prepare_new_book(self, book_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the document inserted for a new book
+        
+        Args:
+            book_data (dict): Validated book information
+        
+        Returns:
+            Book document
+        """
+        new_book = self._book_fields(book_data)
+        # Change tracking for incremental table refreshes
+        new_book['version'] = 1
+        new_book['updatedAt'] = datetime.utcnow()
+        new_book.update(self.EMPTY_RATINGS)
+        return new_book
+    
     def add_book(self, book_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Add a new book to the database
@@ -101,28 +913,22 @@ class LibraryController:
         """
         try:
             # Validate required fields
-            required_fields = ['title', 'author', 'isbn', 'published_year', 'price']
-            for field in required_fields:
-                if not book_data.get(field):
-                    return {
-                        "success": False, 
-                        "message": f"Missing required field: {field}"
-                    }
+            error = self._validate_book_data(book_data)
+            if error:
+                return {
+                    "success": False, 
+                    "message": error
+                }
 
             # Prepare book data for insertion
-            new_book = {
-                'title': book_data['title'],
-                'author': book_data['author'],
-                'isbn': book_data['isbn'],
-                'publishedYear': book_data['published_year'],
-                'price': book_data['price'],
-                'categories': book_data.get('categories', []),
-                'description': book_data.get('description', ''),
-                'imprint': book_data.get('imprint', '')
-            }
+            new_book = self._prepare_new_book(book_data)
 
             # Insert the book
             result = self.db.books.insert_one(new_book)
+            
+            if self.search_index.built:
+                self.search_index.add(new_book)
+            self.cache.book_changed()
 
             return {
                 "success": True, 
@@ -136,73 +942,140 @@ class LibraryController:
                 "message": f"Error adding book: {str(e)}"
             }
     
-    def edit_book(self, original_isbn: str, book_data: Dict[str, Any]) -> Dict[str, Any]:
+    def bulk_add_books(self, 
+                       books: Iterable[Dict[str, Any]], 
+                       batch_size: int = 1000, 
+                       max_errors: int = 1000, 
+                       on_progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        Insert a stream of books with unordered insert_many batches
+        
+        Rows are validated with the add_book rules and buffered one batch
+        at a time, so memory use does not depend on the size of the input.
+        Invalid rows and rows rejected by the server (e.g. duplicate ISBN)
+        are reported with their 1-based row number.
+        
+        Args:
+            books (iterable): Book information dicts, as accepted by add_book
+            batch_size (int): Number of documents per insert_many
+            max_errors (int): Maximum number of row errors kept in the result
+            on_progress (callable, optional): Called with the running
+                statistics after every batch
+        
+        Returns:
+            Dict with 'inserted', 'failed', 'rows', 'errors' (row, message),
+            'elapsed' seconds and 'rate' (rows per second)
+        """
+        stats = {"success": True, "rows": 0, "inserted": 0, "failed": 0, "errors": [], "elapsed": 0.0, "rate": 0.0}
+        started = time.perf_counter()
+        
+        def record_error(row_number, message):
+            stats["failed"] += 1
+            if len(stats["errors"]) < max_errors:
+                stats["errors"].append((row_number, message))
+        
+        def flush(batch, row_numbers):
+            try:
+                result = self.db.books.insert_many(batch, ordered=False)
+                inserted_ids = set(result.inserted_ids)
+                stats["inserted"] += len(result.inserted_ids)
+            except BulkWriteError as e:
+                failed_indexes = set()
+                for write_error in e.details.get('writeErrors', []):
+                    failed_indexes.add(write_error['index'])
+                    record_error(row_numbers[write_error['index']], write_error.get('errmsg', 'Write error'))
+                stats["inserted"] += e.details.get('nInserted', 0)
+                inserted_ids = {book['_id'] for i, book in enumerate(batch) if i not in failed_indexes}
+            
+            if self.search_index.built:
+                for book in batch:
+                    if book['_id'] in inserted_ids:
+                        self.search_index.add(book)
+            self.cache.book_changed()
+            
+            stats["elapsed"] = time.perf_counter() - started
+            stats["rate"] = stats["rows"] / stats["elapsed"] if stats["elapsed"] else 0.0
+            if on_progress:
+                on_progress(stats)
+        
+        batch, row_numbers = [], []
+        for row_number, book_data in enumerate(books, start=1):
+            stats["rows"] = row_number
+            
+            error = self._validate_book_data(book_data)
+            if error:
+                record_error(row_number, error)
+                continue
+            try:
+                new_book = self._prepare_new_book(book_data)
+            except (TypeError, ValueError) as e:
+                record_error(row_number, f"Invalid value: {e}")
+                continue
+            
+            new_book['_id'] = ObjectId()
+            batch.append(new_book)
+            row_numbers.append(row_number)
+            
+            if len(batch) >= batch_size:
+                flush(batch, row_numbers)
+                batch, row_numbers = [], []
+        
+        if batch:
+            flush(batch, row_numbers)
+        
+        stats["elapsed"] = time.perf_counter() - started
+        stats["rate"] = stats["rows"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        stats["success"] = stats["failed"] == 0
+        stats["message"] = f"Imported {stats['inserted']} of {stats['rows']} books ({stats['failed']} failed)"
+        return stats
+    
+    def edit_book(self, original_isbn: Optional[str], book_data: Dict[str, Any], book_id=None) -> Dict[str, Any]:
         """
         Edit a book in the database
         
         Args:
-            original_isbn (str): Original ISBN to identify the book
+            original_isbn (str, optional): Original ISBN to identify the book
             book_data (dict): Updated book information
+            book_id (optional): _id (or its string) identifying the book
+                instead of the ISBN, e.g. the row of a table
         
         Returns:
             Dict containing book edit result
         """
         try:
             # Validate required fields
-            required_fields = ['title', 'author', 'isbn', 'published_year', 'price']
-            for field in required_fields:
-                if not book_data.get(field):
-                    return {
-                        "success": False, 
-                        "message": f"Missing required field: {field}"
-                    }
+            error = self._validate_book_data(book_data)
+            if error:
+                return {
+                    "success": False, 
+                    "message": error
+                }
             
             # Prepare book data for update
-            update_data = {
-                'title': book_data['title'],
-                'author': book_data['author'],
-                'isbn': book_data['isbn'],
-                'publishedYear': book_data['published_year'],
-                'price': book_data['price'],
-                'categories': book_data.get('categories', []),
-                'description': book_data.get('description', ''),
-                'imprint': book_data.get('imprint', '')
-            }
+            update_data = self._book_fields(book_data)
+            update_data['updatedAt'] = datetime.utcnow()
             
-            # Try multiple ways to find the book
-            result = self.db.books.update_one(
-                # Try multiple query methods to find the book
-                {
-                    '$or': [
-                        {'isbn': original_isbn},  # Exact ISBN match
-                        {'isbn': {'$regex': f'^{original_isbn}$', '$options': 'i'}},  # Case-insensitive exact match
-                        {'isbn': str(original_isbn)}  # Ensure string conversion
-                    ]
-                },
-                {'$set': update_data}
+            updated_book = self.db.books.find_one_and_update(
+                self._book_filter(original_isbn, book_id),
+                {'$set': update_data, '$inc': {'version': 1}},
+                projection=CatalogSearchIndex.PROJECTION,
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.modified_count > 0:
+            if not updated_book:
                 return {
-                    "success": True, 
-                    "message": "Book updated successfully"
+                    "success": False, 
+                    "message": self._book_not_found(original_isbn, book_id)
                 }
-            else:
-                # If no book was found, provide more diagnostic information
-                # Try to find why the book wasn't found
-                existing_book = self.db.books.find_one({'isbn': original_isbn})
-                
-                if existing_book:
-                    print(f"Existing book found: {existing_book}")
-                    return {
-                        "success": False, 
-                        "message": "Book found but not updated. Check data types and field names."
-                    }
-                else:
-                    return {
-                        "success": False, 
-                        "message": f"No book found with ISBN: {original_isbn}"
-                    }
+            
+            if self.search_index.built:
+                self.search_index.add(updated_book)
+            self.cache.book_changed(updated_book['_id'])
+            
+            return {
+                "success": True, 
+                "message": "Book updated successfully"
+            }
         
         except Exception as e:
             return {
@@ -210,66 +1083,175 @@ class LibraryController:
                 "message": f"Error updating book: {str(e)}"
             }
         
-    def delete_book(self, isbn):
+    def delete_book(self, isbn=None, book_id=None):
         """
-        Delete a book from the database by ISBN
+        Delete a book from the database by ISBN or _id
 
         Args:
             isbn: ISBN of the book to delete (can be int or str)
+            book_id (optional): _id (or its string) identifying the book
+                instead of the ISBN, e.g. the row of a table
 
         Returns:
             Dict containing book deletion result
         """
         try:
-            # Convert isbn to string if it's not already a string
-            isbn = str(isbn).strip()
-
-            # First, try to find the book to understand why it's not being found
-            existing_book = self.db.books.find_one({'isbn': isbn})
-
-            if existing_book:
-                # Print out the book details for debugging
-                print("Book found:", existing_book)
-
-                # Ensure case-insensitive and whitespace-stripped comparison
-                result = self.db.books.delete_one({
-                    'isbn': {'$regex': f'^{isbn}$', '$options': 'i'}
-                })
-
-                if result.deleted_count > 0:
-                    return {
-                        "success": True, 
-                        "message": "Book deleted successfully"
-                    }
-                else:
-                    return {
-                        "success": False, 
-                        "message": "Book found but could not be deleted"
-                    }
-            else:
-                # Try more flexible search methods
-                # Look for partial matches or whitespace variations
-                flexible_search = self.db.books.find_one({
-                    'isbn': {'$regex': f'{isbn}', '$options': 'i'}
-                })
-
-                if flexible_search:
-                    print("Flexible match found:", flexible_search)
-                    result = self.db.books.delete_one({'_id': flexible_search['_id']})
-
-                    if result.deleted_count > 0:
-                        return {
-                            "success": True, 
-                            "message": "Book deleted successfully (flexible match)"
-                        }
-
+            deleted_book = self.db.books.find_one_and_delete(self._book_filter(isbn, book_id), projection={'_id': 1})
+            
+            if not deleted_book:
                 return {
                     "success": False, 
-                    "message": f"No book found with ISBN: {isbn}"
+                    "message": self._book_not_found(isbn, book_id)
                 }
+            
+            self.search_index.remove(deleted_book['_id'])
+            self.cache.book_changed(deleted_book['_id'])
+            return {
+                "success": True, 
+                "message": "Book deleted successfully"
+            }
 
         except Exception as e:
             return {
                 "success": False, 
                 "message": f"Error deleting book: {str(e)}"
-            }
\ No newline at end of file
+            }
+    
+    def _book_filter(self, isbn, book_id=None) -> Dict[str, Any]:
+        """
+        Build an exact-match filter for a book identified by _id or ISBN
+        
+        A _id read back from a table is a string; it is matched as stored
+        (string), as an ObjectId and as an int, so imported books with
+        other _id types are found too.
+        
+        Args:
+            isbn (str or int): ISBN, used when book_id is None
+            book_id (optional): _id or its string
+        
+        Returns:
+            dict: MongoDB filter
+        """
+        if book_id is None:
+            return self._isbn_filter(isbn)
+        candidates = [book_id]
+        if isinstance(book_id, str):
+            if ObjectId.is_valid(book_id):
+                candidates.append(ObjectId(book_id))
+            if book_id.lstrip('-').isdigit():
+                candidates.append(int(book_id))
+        return {'_id': {'$in': candidates}}
+    
+    @staticmethod
+    def _book_not_found(isbn, book_id) -> str:
+        """Message for a book that _book_filter did not find"""
+        return f"No book found with ISBN: {isbn}" if book_id is None else f"No book found with _id: {book_id}"
+    
+    def _isbn_filter(self, isbn) -> Dict[str, Any]:
+        """
+        Build an exact-match filter for a book identified by ISBN
+        
+        Valid ISBNs are matched on the canonical isbn13 key, so hyphenated
+        or ISBN-10 spellings find the same book; other values are matched
+        exactly on the stored isbn. Books stored before isbn13 existed (not
+        yet keyed by migrate_isbn_keys) are matched exactly on their isbn,
+        both clauses using an index.
+        
+        Args:
+            isbn (str or int): ISBN as entered or stored
+        
+        Returns:
+            dict: MongoDB filter
+        """
+        key = normalize_isbn(isbn)
+        spelling = str(isbn).strip()
+        if not key:
+            return {'isbn': spelling}
+        spellings = {spelling, key}
+        if isinstance(isbn, int):
+            # Read back from a Treeview, leading zeros lost
+            spellings.add(spelling.zfill(10))
+        return {'$or': [
+            {'isbn13': key},
+            {'isbn13': {'$exists': False}, 'isbn': {'$in': sorted(spellings)}}
+        ]}
+    
+    def find_book_by_isbn(self, isbn, projection: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find a book by ISBN with an exact, indexed match
+        
+        Args:
+            isbn (str or int): ISBN as entered or stored
+            projection (dict, optional): Fields to return
+        
+        Returns:
+            The book document, or None if not found
+        """
+        return self.db.books.find_one(self._isbn_filter(isbn), projection)
+    
+    def migrate_search_keys(self) -> Dict[str, Any]:
+        """
+        Compute the lowercase search keys of books and users stored before
+        they existed (title_lower, username_lower, email_lower)
+        
+        Also run at every connection; see config.indexes.ensure_search_keys.
+        
+        Returns:
+            Dict with the number of 'books' and 'users' updated
+        """
+        updated = self.db.ensure_search_keys()
+        self.cache.clear()
+        return {
+            "success": True,
+            "books": updated['books'],
+            "users": updated['users'],
+            "message": f"Added search keys to {updated['books']} books and {updated['users']} users"
+        }
+    
+    def migrate_isbn_keys(self, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Compute the isbn13 key of books stored before it existed
+        
+        Books without the field are updated with unordered bulk writes,
+        one batch at a time. Books whose ISBN duplicates another book once
+        normalized are left without the key and reported.
+        
+        Args:
+            batch_size (int): Number of updates per bulk_write
+        
+        Returns:
+            Dict with the number of 'updated' books and the 'duplicates'
+            (_id, isbn) that could not be keyed
+        """
+        stats = {"success": True, "updated": 0, "duplicates": []}
+        
+        def flush(batch):
+            try:
+                result = self.db.books.bulk_write([request for request, _ in batch], ordered=False)
+                stats["updated"] += result.modified_count
+            except BulkWriteError as e:
+                stats["updated"] += e.details.get('nModified', 0)
+                for write_error in e.details.get('writeErrors', []):
+                    stats["duplicates"].append(batch[write_error['index']][1])
+        
+        cursor = self.db.books.find({'isbn13': {'$exists': False}}, {'isbn': 1}).batch_size(batch_size)
+        batch = []
+        for book in cursor:
+            key = normalize_isbn(book.get('isbn', ''))
+            batch.append((
+                UpdateOne({'_id': book['_id']}, {'$set': {'isbn13': key}}),
+                (book['_id'], book.get('isbn'))
+            ))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        
+        # Duplicates keep a null key so they are not picked up again
+        for book_id, _ in stats["duplicates"]:
+            self.db.books.update_one({'_id': book_id}, {'$set': {'isbn13': None}})
+        
+        self.cache.clear()
+        stats["message"] = f"Keyed {stats['updated']} books ({len(stats['duplicates'])} duplicate ISBNs)"
+        return stats
@@ -0,0 +1,191 @@
+# digital_library/controllers/executor.py
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from config.instrumentation import query_tag
+
+class QueryExecutor:
+    def __init__(self,
+                 root,
+                 max_workers: int = 4,
+                 poll_interval: int = 30,
+                 busy_callback: Optional[Callable[[bool], None]] = None,
+                 profiler=None):
+        """
+        Run database work on a thread pool and deliver results to Tk
+
+        Worker threads never touch widgets: they put results on a queue that
+        the Tk thread drains with root.after, where the callbacks run.
+        Requests share a key per table or dialog; submitting a new request
+        under a key supersedes the previous one, whose result is dropped.
+
+        Args:
+            root (tk.Misc): Any widget, used to schedule polling with after()
+            max_workers (int): Number of worker threads
+            poll_interval (int): Milliseconds between result polls
+            busy_callback (callable, optional): Called with True when work
+                starts and False when every request has completed
+            profiler (UIProfiler, optional): Times the worker and Tk parts
+                of every request
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.busy_callback = busy_callback
+        self.profiler = profiler
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='query')
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._futures = {}
+        self._active = set()
+        self._polling = False
+        self._poll_job = None
+        self._busy = False
+        self._closed = False
+
+    def submit(self, key: str, fn: Callable, *args,
+               on_success: Optional[Callable] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               **kwargs):
+        """
+        Run fn(*args, **kwargs) on a worker thread
+
+        Args:
+            key (str): Request key; a newer request with the same key
+                supersedes this one
+            fn (callable): Function doing the database work
+            on_success (callable, optional): Called on the Tk thread with the result
+            on_error (callable, optional): Called on the Tk thread with the exception
+
+        Returns:
+            Future: The submitted work, None once the executor is shut down
+        """
+        if self._closed:
+            return None
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+
+            previous = self._futures.get(key)
+            if previous is not None:
+                # Only succeeds if the worker has not started it yet
+                previous.cancel()
+
+            future = self._pool.submit(self._run, key, generation, fn, args, kwargs, on_success, on_error)
+            self._futures[key] = future
+            self._active.add(future)
+
+        self._set_busy(True)
+        self._schedule_poll()
+        return future
+
+    def cancel(self, key: str):
+        """
+        Cancel the request running under a key
+
+        A request already running completes but its result is discarded.
+
+        Args:
+            key (str): Request key
+        """
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _run(self, key, generation, fn, args, kwargs, on_success, on_error):
+        """Execute a request on a worker thread"""
+        if self._generations.get(key) != generation:
+            return
+        try:
+            # Commands of the request are attributed to its key
+            with query_tag(key):
+                if self.profiler:
+                    result, elapsed_ms = self.profiler.measure(key, 'db', fn, *args, **kwargs)
+                else:
+                    result, elapsed_ms = fn(*args, **kwargs), None
+            self._results.put((key, generation, on_success, result, elapsed_ms))
+        except Exception as e:
+            self._results.put((key, generation, on_error or self._default_error, e, None))
+
+    @staticmethod
+    def _default_error(error: Exception):
+        """Report errors of requests submitted without on_error"""
+        print(f"Background query failed: {error}")
+
+    def _schedule_poll(self):
+        """Start polling the result queue if not already polling"""
+        if not self._polling:
+            self._polling = True
+            self._poll_job = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Deliver finished results on the Tk thread"""
+        self._poll_job = None
+        if self._closed:
+            return
+        while True:
+            try:
+                key, generation, callback, value, elapsed_ms = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            # Drop results of superseded or cancelled requests
+            if self._generations.get(key) == generation and callback is not None:
+                try:
+                    if self.profiler:
+                        _, ui_ms = self.profiler.measure(key, 'ui', callback, value)
+                        self.profiler.record_action(key, elapsed_ms, ui_ms)
+                    else:
+                        callback(value)
+                except Exception as e:
+                    print(f"Error in callback for {key}: {e}")
+
+        with self._lock:
+            self._active = {future for future in self._active if not future.done()}
+            idle = not self._active and self._results.empty()
+
+        if idle:
+            self._polling = False
+            self._set_busy(False)
+        else:
+            self._poll_job = self.root.after(self.poll_interval, self._poll)
+
+    def _set_busy(self, busy: bool):
+        """Notify the busy callback when the busy state changes"""
+        if busy != self._busy:
+            self._busy = busy
+            if self.busy_callback:
+                self.busy_callback(busy)
+
+    @property
+    def busy(self) -> bool:
+        """Whether requests are pending"""
+        return self._busy
+
+    def shutdown(self):
+        """
+        Stop the worker threads, dropping queued requests and pending results
+
+        Call it before the root window is destroyed: no callback runs after
+        it, and later submissions are ignored. Running queries finish on
+        their thread but their results are discarded.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            for future in self._active:
+                future.cancel()
+            self._active.clear()
+        if self._poll_job is not None:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                # The window is already gone, and its pending callbacks with it
+                pass
+            self._poll_job = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
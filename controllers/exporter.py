@@ -0,0 +1,268 @@
+# digital_library/controllers/exporter.py
+import io
+import sys
+import csv
+import gzip
+import time
+import argparse
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from bson import ObjectId, json_util
+
+# Known exports: collection, projection, CSV columns and resolved references
+EXPORTS = {
+    'books': {
+        'collection': 'books',
+        'projection': None,
+        'fields': ['_id', 'title', 'author', 'isbn', 'publishedYear', 'price',
+                   'categories', 'description', 'imprint']
+    },
+    'orders': {
+        'collection': 'orders',
+        'projection': None,
+        'fields': ['_id', 'user_id', 'username', 'book_ids', 'total_price', 'order_date']
+    },
+    'reviews': {
+        'collection': 'reviews',
+        'projection': None,
+        'fields': ['_id', 'book_id', 'book_title', 'user_id', 'username', 'rating',
+                   'review_text', 'review_date']
+    },
+    'users': {
+        'collection': 'users',
+        # Never export password hashes
+        'projection': {'passwordHash': 0, 'password': 0},
+        'fields': ['_id', 'username', 'email', 'wallet', 'registration_date']
+    }
+}
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Group an iterable into lists of at most size items
+
+    Args:
+        iterable (iterable): Items
+        size (int): Batch size
+
+    Yields:
+        list: Next batch
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def resolve_usernames(controller, batches: Iterable[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Add the 'username' of each document's user_id, one query per batch
+
+    Args:
+        controller (LibraryController): Controller providing the loaders
+        batches (iterable): Batches of documents with a user_id
+
+    Yields:
+        list: Batch with usernames resolved
+    """
+    for batch in batches:
+        # A fresh loader per batch keeps memory flat
+        users = controller.user_loader({'username': 1}).load_many(doc.get('user_id') for doc in batch)
+        for document in batch:
+            document['username'] = users.get(document.get('user_id'), {}).get('username', '')
+        yield batch
+
+def resolve_book_titles(controller, batches: Iterable[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Add the 'book_title' of each document's book_id, one query per batch
+
+    Args:
+        controller (LibraryController): Controller providing the loaders
+        batches (iterable): Batches of documents with a book_id
+
+    Yields:
+        list: Batch with book titles resolved
+    """
+    for batch in batches:
+        books = controller.book_loader({'title': 1}).load_many(doc.get('book_id') for doc in batch)
+        for document in batch:
+            document['book_title'] = books.get(document.get('book_id'), {}).get('title', '')
+        yield batch
+
+# Reference resolution applied per export
+RESOLVERS = {
+    'orders': [resolve_usernames],
+    'reviews': [resolve_book_titles, resolve_usernames]
+}
+
+def iter_export_documents(controller, name: str, query: Dict[str, Any] = None,
+                          batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the documents of an export with references resolved
+
+    Args:
+        controller (LibraryController): Controller
+        name (str): Export name (see EXPORTS) or any collection name
+        query (dict, optional): MongoDB filter
+        batch_size (int): Cursor batch size and resolution batch size
+
+    Yields:
+        dict: Exported documents
+    """
+    spec = EXPORTS.get(name, {'collection': name, 'projection': None})
+    cursor = controller.db.db[spec['collection']].find(query or {}, spec['projection']).batch_size(batch_size)
+
+    batches = batched(cursor, batch_size)
+    for resolver in RESOLVERS.get(name, []):
+        batches = resolver(controller, batches)
+
+    for batch in batches:
+        yield from batch
+
+def to_text(value: Any) -> Any:
+    """Convert a BSON value to a CSV cell"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ';'.join(str(to_text(item)) for item in value)
+    if isinstance(value, dict):
+        return json_util.dumps(value)
+    return value
+
+def write_jsonl(documents: Iterable[Dict[str, Any]], handle) -> int:
+    """
+    Write documents as JSON Lines (relaxed extended JSON)
+
+    Args:
+        documents (iterable): Documents
+        handle: Text file object
+
+    Returns:
+        int: Number of documents written
+    """
+    count = 0
+    for document in documents:
+        handle.write(json_util.dumps(document, json_options=json_util.RELAXED_JSON_OPTIONS))
+        handle.write('\n')
+        count += 1
+    return count
+
+def write_csv(documents: Iterable[Dict[str, Any]], handle, fields: Optional[List[str]] = None) -> int:
+    """
+    Write documents as CSV
+
+    Args:
+        documents (iterable): Documents
+        handle: Text file object
+        fields (list, optional): Columns; taken from the first document
+            when omitted
+
+    Returns:
+        int: Number of documents written
+    """
+    documents = iter(documents)
+    writer = None
+    count = 0
+    for document in documents:
+        if writer is None:
+            writer = csv.DictWriter(handle, fieldnames=fields or list(document), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow({key: to_text(value) for key, value in document.items()})
+        count += 1
+    return count
+
+def open_output(path: str, compress: Optional[bool] = None):
+    """
+    Open an export destination
+
+    Args:
+        path (str): File path, '-' for standard output
+        compress (bool, optional): gzip the output; defaults to True for .gz paths
+
+    Returns:
+        Text file object
+    """
+    if path == '-':
+        return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='', write_through=True)
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        return io.TextIOWrapper(gzip.open(path, 'wb'), encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+def export(controller, name: str, path: str, file_format: str = 'jsonl',
+           query: Dict[str, Any] = None, compress: Optional[bool] = None,
+           batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Stream a collection or query to a CSV or JSONL file
+
+    Args:
+        controller (LibraryController): Controller
+        name (str): Export name (books, orders, reviews, users) or collection
+        path (str): Destination file, '-' for standard output
+        file_format (str): 'jsonl' or 'csv'
+        query (dict, optional): MongoDB filter
+        compress (bool, optional): gzip the output
+        batch_size (int): Cursor and resolution batch size
+
+    Returns:
+        Dict with 'success', 'rows', 'elapsed' and 'message'
+    """
+    started = time.perf_counter()
+    documents = iter_export_documents(controller, name, query, batch_size)
+
+    handle = open_output(path, compress)
+    try:
+        if file_format == 'csv':
+            rows = write_csv(documents, handle, EXPORTS.get(name, {}).get('fields'))
+        else:
+            rows = write_jsonl(documents, handle)
+    finally:
+        if path == '-':
+            handle.flush()
+            handle.detach()
+        else:
+            handle.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "success": True,
+        "rows": rows,
+        "elapsed": elapsed,
+        "message": f"Exported {rows} {name} documents in {elapsed:.1f}s"
+    }
+
+def main(argv=None):
+    """
+    Command-line exporter
+
+    Usage:
+        python -m controllers.exporter orders orders.csv.gz --format csv
+        python -m controllers.exporter books - --query '{"publishedYear": 2020}'
+    """
+    parser = argparse.ArgumentParser(description="Export a collection to CSV or JSONL")
+    parser.add_argument('name', help="books, orders, reviews, users or any collection name")
+    parser.add_argument('path', help="Destination file ('-' for stdout, .gz to compress)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--query', help="MongoDB filter as (extended) JSON")
+    parser.add_argument('--gzip', action='store_true', default=None, help="Compress the output")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    from config.database import db_connection
+    from controllers.controller import LibraryController
+
+    try:
+        query = json_util.loads(args.query) if args.query else None
+        result = export(LibraryController(db_connection), args.name, args.path, args.format,
+                        query, args.gzip, args.batch_size)
+        print(result['message'], file=sys.stderr)
+        return 0
+    finally:
+        db_connection.close_connection()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+# digital_library/controllers/loader.py
+from typing import Dict, Any, Iterable, Optional
+from bson import ObjectId
+
+class BatchLoader:
+    def __init__(self, collection, projection: Optional[Dict[str, Any]] = None, batch_size: int = 1000):
+        """
+        Resolve documents by _id with batched $in queries
+
+        Ids are collected and fetched once; documents already loaded are
+        memoized for the lifetime of the loader, which is meant to be one
+        request (a dialog, a table load, an export batch).
+
+        Args:
+            collection (Collection): Collection to load from
+            projection (dict, optional): Fields to fetch
+            batch_size (int): Maximum number of ids per $in query
+        """
+        self.collection = collection
+        self.projection = projection
+        self.batch_size = batch_size
+        self._cache: Dict[Any, Optional[Dict[str, Any]]] = {}
+
+    @staticmethod
+    def _as_id(value):
+        """Convert ObjectId-shaped strings to ObjectId"""
+        if isinstance(value, str) and ObjectId.is_valid(value):
+            return ObjectId(value)
+        return value
+
+    def load_many(self, ids: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Load documents for many ids
+
+        Args:
+            ids (iterable): Document _ids (ObjectId or ObjectId strings)
+
+        Returns:
+            Dict mapping each found _id to its document
+        """
+        ids = [self._as_id(value) for value in ids]
+        missing = list(dict.fromkeys(value for value in ids if value not in self._cache))
+
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            for document in self.collection.find({'_id': {'$in': chunk}}, self.projection):
+                # _id may be decoded as a string (see serialization.display_collection)
+                self._cache[self._as_id(document['_id'])] = document
+            # Remember misses too so they are not queried again
+            for value in chunk:
+                self._cache.setdefault(value, None)
+
+        return {value: self._cache[value] for value in ids if self._cache.get(value) is not None}
+
+    def load(self, document_id) -> Optional[Dict[str, Any]]:
+        """
+        Load a single document
+
+        Args:
+            document_id: Document _id
+
+        Returns:
+            The document, or None if it does not exist
+        """
+        document_id = self._as_id(document_id)
+        return self.load_many([document_id]).get(document_id)
+
+    def prime(self, documents: Iterable[Dict[str, Any]]):
+        """
+        Seed the loader with documents that are already known
+
+        Args:
+            documents (iterable): Documents including their _id
+        """
+        for document in documents:
+            self._cache[self._as_id(document['_id'])] = document
@@ -0,0 +1,243 @@
+# digital_library/controllers/order_summaries.py
+import re
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import ReplaceOne
+from controllers.query_builder import as_object_id, keyset_conditions, DEFAULT_SEARCH_LIMIT
+
+class OrderSummaries:
+    """
+    Materialized view of the orders shown in the Orders tab
+
+    One document per order holds what the table displays (username, item
+    count, total, date), so listing and searching orders never joins the
+    users collection. Summaries are written together with their orders
+    (see CheckoutEngine) and can be rebuilt from the orders with $merge.
+    """
+
+    # Seconds between checks for missing summaries
+    CHECK_INTERVAL = 30.0
+
+    # One shared instance per database connection
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_connection(cls, db_connection) -> 'OrderSummaries':
+        """
+        Get the summaries shared by all controllers of a connection
+
+        Args:
+            db_connection (DatabaseConnection): Database connection
+
+        Returns:
+            OrderSummaries: Shared instance
+        """
+        with cls._instances_lock:
+            summaries = cls._instances.get(id(db_connection))
+            if summaries is None:
+                summaries = cls._instances[id(db_connection)] = cls(db_connection)
+            return summaries
+
+    def __init__(self, db_connection):
+        """
+        Args:
+            db_connection (DatabaseConnection): Database connection
+        """
+        self.db = db_connection
+        # time.monotonic() of the last check for missing summaries
+        self.checked_at = None
+
+    @property
+    def collection(self):
+        return self.db.order_summaries
+
+    @staticmethod
+    def summarize(order: Dict[str, Any], username: Optional[str]) -> Dict[str, Any]:
+        """
+        Build the summary of an order
+
+        Args:
+            order (dict): Order document
+            username (str, optional): Username of the ordering user
+
+        Returns:
+            dict: Summary document, sharing the order's _id
+        """
+        username = username or 'Unknown'
+        return {
+            '_id': order['_id'],
+            'user_id': order.get('user_id'),
+            'username': username,
+            'username_lower': username.lower(),
+            'book_count': len(order.get('book_ids') or []),
+            'total_price': order.get('total_price', 0),
+            'order_date': order.get('order_date'),
+            'version': order.get('version'),
+            'refreshedAt': datetime.utcnow()
+        }
+
+    def record(self, orders: List[Dict[str, Any]], session=None):
+        """
+        Write the summaries of new or changed orders
+
+        Usernames are resolved with one query for all orders.
+
+        Args:
+            orders (list): Order documents
+            session (ClientSession, optional): Session of the order writes
+        """
+        if not orders:
+            return
+        user_ids = list({order.get('user_id') for order in orders})
+        usernames = {
+            user['_id']: user.get('username')
+            for user in self.db.users.find({'_id': {'$in': user_ids}}, {'username': 1}, session=session)
+        }
+        self.collection.bulk_write([
+            ReplaceOne({'_id': order['_id']}, self.summarize(order, usernames.get(order.get('user_id'))), upsert=True)
+            for order in orders
+        ], ordered=False, session=session)
+
+    def refresh(self, match: Dict[str, Any] = None) -> int:
+        """
+        Rebuild summaries from the orders collection on the server
+
+        Args:
+            match (dict, optional): Filter on orders (e.g. {'user_id': ...}
+                after a user was renamed); all orders when omitted
+
+        Returns:
+            int: Number of summaries after the refresh
+        """
+        started = datetime.utcnow()
+        pipeline = [{'$match': match}] if match else []
+        pipeline += [
+            {
+                '$lookup': {
+                    'from': 'users',
+                    'let': {'user_id': '$user_id'},
+                    'pipeline': [
+                        {'$match': {'$expr': {'$eq': ['$_id', '$$user_id']}}},
+                        {'$project': {'_id': 0, 'username': 1}}
+                    ],
+                    'as': 'user'
+                }
+            },
+            {'$addFields': {'username': {'$ifNull': [{'$arrayElemAt': ['$user.username', 0]}, 'Unknown']}}},
+            {
+                '$project': {
+                    'user_id': 1,
+                    'username': 1,
+                    'username_lower': {'$toLower': '$username'},
+                    'book_count': {'$size': {'$ifNull': ['$book_ids', []]}},
+                    'total_price': 1,
+                    'order_date': 1,
+                    'version': 1,
+                    'refreshedAt': {'$literal': started}
+                }
+            },
+            {'$merge': {'into': self.collection.name, 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ]
+        self.db.orders.aggregate(pipeline, allowDiskUse=True)
+
+        if not match:
+            # Summaries not rewritten above belong to orders that no longer exist
+            self.collection.delete_many({'refreshedAt': {'$lt': started}})
+        self.checked_at = time.monotonic()
+        return self.collection.estimated_document_count()
+
+    def ensure_built(self):
+        """
+        Build the summaries if orders exist but none are summarized
+
+        Checked at most every CHECK_INTERVAL seconds, so a summaries
+        collection dropped while the application runs is rebuilt too.
+        """
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < self.CHECK_INTERVAL:
+            return
+        self.checked_at = now
+        if self.collection.estimated_document_count() == 0 and self.db.orders.estimated_document_count() > 0:
+            print("Building order summaries")
+            self.refresh()
+
+    def page(self, after=None, before=None, page_size: int = 100, ids: List[Any] = None,
+             projection: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Fetch one keyset page of summaries, newest first
+
+        Pages are addressed by the (order_date, _id) of the row next to them,
+        so every page is a range scan of the order_date index.
+
+        Args:
+            after (tuple, optional): Cursor of the row preceding the page
+            before (tuple, optional): Cursor of the row following the page
+            page_size (int): Number of summaries per page
+            ids (list, optional): Restrict the page to these _ids (used to
+                re-read the rows currently displayed)
+            projection (dict, optional): Fields to return
+
+        Returns:
+            Dict with the page 'items', its 'first' and 'last' cursors and
+            whether more rows exist in the fetch direction ('has_more')
+        """
+        self.ensure_built()
+        conditions = []
+        if ids is not None:
+            conditions.append({'_id': {'$in': [as_object_id(value) or value for value in ids]}})
+        cursor = after if after is not None else before
+        if cursor is not None:
+            value, last_id = cursor
+            conditions.append({'$or': keyset_conditions('order_date', '$lt' if after is not None else '$gt', value, last_id)})
+
+        # Pages before the cursor are read backwards, then reversed
+        direction = -1 if before is None else 1
+        if projection is not None:
+            projection = dict(projection, order_date=1)
+        summaries = list(
+            self.collection.find({'$and': conditions} if conditions else {}, projection)
+            .sort([('order_date', direction), ('_id', direction)])
+            .limit(page_size + 1)
+        )
+        has_more = len(summaries) > page_size
+        summaries = summaries[:page_size]
+        if before is not None:
+            summaries.reverse()
+
+        def make_cursor(summary):
+            return summary.get('order_date'), summary['_id']
+
+        return {
+            "items": summaries,
+            "first": make_cursor(summaries[0]) if summaries else None,
+            "last": make_cursor(summaries[-1]) if summaries else None,
+            "has_more": has_more
+        }
+
+    def search(self, search_term: str = None, projection: Dict[str, Any] = None,
+               limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        List order summaries, newest first
+
+        Args:
+            search_term (str, optional): Order _id, or the beginning of a
+                username (case-insensitive)
+            projection (dict, optional): Fields to return
+            limit (int): Maximum number of summaries (0 for no limit)
+
+        Returns:
+            List of summary documents
+        """
+        self.ensure_built()
+        order_id = as_object_id(search_term)
+        if not search_term:
+            query = {}
+        elif order_id is not None:
+            query = {'_id': order_id}
+        else:
+            # Anchored prefix on the lowercase copy can use the index
+            query = {'username_lower': {'$regex': f'^{re.escape(search_term.lower())}'}}
+        return list(self.collection.find(query, projection).sort([('order_date', -1), ('_id', -1)]).limit(limit))
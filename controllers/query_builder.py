@@ -0,0 +1,387 @@
+# digital_library/controllers/query_builder.py
+import re
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+
+# Results returned by a search unless the caller asks for another limit
+DEFAULT_SEARCH_LIMIT = 200
+
+# Maximum number of _ids a referenced-field match resolves to; terms
+# matching more documents only search the first ones
+MAX_RESOLVED_IDS = 1000
+
+# Plan stages that read every document of a collection
+COLLECTION_SCAN = 'COLLSCAN'
+
+# Index keys or documents a query may examine per document it returns
+# before explain() reports it as unselective
+MAX_EXAMINED_RATIO = 10
+
+_OBJECT_ID_PATTERN = re.compile(r'^[0-9a-fA-F]{24}$')
+
+def as_object_id(value) -> Optional[ObjectId]:
+    """
+    Convert search input to an ObjectId when it has the shape of one
+
+    Args:
+        value: ObjectId or user input
+
+    Returns:
+        ObjectId, or None if the value is not a 24 hex digit string
+    """
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and _OBJECT_ID_PATTERN.match(value.strip()):
+        return ObjectId(value.strip())
+    return None
+
+def starts_with(term: str) -> Dict[str, Any]:
+    """
+    Prefix condition on a lowercase copy of a field (e.g. 'title_lower')
+
+    The regex is anchored and case-sensitive, so the index is read only
+    over the range of keys starting with the term. The term is escaped,
+    so characters like '+' or '(' are matched literally.
+
+    Args:
+        term (str): Search term
+
+    Returns:
+        dict: $regex condition
+    """
+    return {'$regex': f'^{re.escape(term.strip().lower())}'}
+
+def prefix_filter(field: str, term: str, source: str = None) -> Dict[str, Any]:
+    """
+    Filter on a lowercase field starting with the term
+
+    With a source field, documents written without the lowercase copy
+    (e.g. inserted by another tool since the last startup) are matched on
+    the source with a case-insensitive prefix regex. They are found through
+    the null keys of the lowercase field's index, so only they are read.
+
+    Args:
+        field (str): Indexed lowercase field (e.g. 'username_lower')
+        term (str): Search term
+        source (str, optional): Field the lowercase copy is computed from
+
+    Returns:
+        dict: Filter
+    """
+    condition = {field: starts_with(term)}
+    if not source:
+        return condition
+    missing = {field: {'$exists': False}, source: {'$regex': f'^{re.escape(term.strip())}', '$options': 'i'}}
+    return {'$or': [condition, missing]}
+
+def contains(term: str) -> Dict[str, Any]:
+    """
+    Case-insensitive "contains" condition for user input
+
+    No index can bound such a regex, so every key (or document) is read;
+    only used where starts_with or a text index is not available.
+
+    Args:
+        term (str): Search term
+
+    Returns:
+        dict: $regex condition
+    """
+    return {'$regex': re.escape(term), '$options': 'i'}
+
+def keyset_conditions(sort_field: str, operator: str, value, last_id) -> List[Dict[str, Any]]:
+    """
+    $or clauses selecting the documents past a keyset cursor
+
+    Missing and null values sort before every other value, but are not
+    matched by $gt / $lt, so they are selected explicitly: after the other
+    values when reading downwards, and before them upwards.
+
+    Args:
+        sort_field (str): Field sorted on, ties broken by _id
+        operator (str): '$gt' or '$lt', the direction of the read
+        value: Sort value of the cursor row
+        last_id: _id of the cursor row
+
+    Returns:
+        list: Clauses to combine with $or
+    """
+    tie = {sort_field: value, '_id': {operator: last_id}}
+    if value is None:
+        return [tie, {sort_field: {'$ne': None}}] if operator == '$gt' else [tie]
+    if operator == '$lt':
+        return [{sort_field: {operator: value}}, tie, {sort_field: None}]
+    return [{sort_field: {operator: value}}, tie]
+
+class SearchQuery:
+    """
+    Build a search over one collection that filters before it joins
+
+    Every alternative of the search becomes a clause of a single $match on
+    the base collection, and the pipeline is:
+
+        $match -> $limit -> joins -> $project
+
+    so the joins only run for the documents that are returned. Matches on
+    a joined field (a username, a book title) are resolved to an _id set
+    first with an indexed query on the other collection, then matched
+    with $in on the reference field. A $or can use indexes only if each of
+    its clauses can, which explain() verifies.
+    """
+
+    def __init__(self, collection, limit: int = DEFAULT_SEARCH_LIMIT):
+        """
+        Args:
+            collection (Collection): Collection searched
+            limit (int): Maximum number of results (0 for no limit)
+        """
+        self.collection = collection
+        self.limit = limit
+        self.clauses = []
+        self.joins = []
+        self.projection = None
+        # (collection, filter) of the queries resolving references
+        self.resolutions = []
+
+    def match_id(self, term, field: str = '_id') -> 'SearchQuery':
+        """
+        Match a field holding an ObjectId when the term looks like one
+
+        Args:
+            term: Search input
+            field (str): ObjectId field
+
+        Returns:
+            SearchQuery: self
+        """
+        object_id = as_object_id(term)
+        if object_id is not None:
+            self.clauses.append({field: object_id})
+        return self
+
+    def match_prefix(self, field: str, term: str, source: str = None) -> 'SearchQuery':
+        """
+        Match documents whose lowercase field starts with the term
+
+        Args:
+            field (str): Indexed lowercase field of the base collection
+            term (str): Search term
+            source (str, optional): Field matched when the lowercase copy
+                is missing (see prefix_filter)
+
+        Returns:
+            SearchQuery: self
+        """
+        self.clauses.append(prefix_filter(field, term, source))
+        return self
+
+    def match_words(self, term: str) -> 'SearchQuery':
+        """
+        Match documents containing the words of the term ($text)
+
+        Uses the text index of the collection, which must exist.
+
+        Args:
+            term (str): Search term
+
+        Returns:
+            SearchQuery: self
+        """
+        self.clauses.append({'$text': {'$search': term}})
+        return self
+
+    def match_text(self, field: str, term: str) -> 'SearchQuery':
+        """
+        Match documents whose field contains the term
+
+        Reads every key of the field (see contains); for servers without
+        text search.
+
+        Args:
+            field (str): String field of the base collection
+            term (str): Search term
+
+        Returns:
+            SearchQuery: self
+        """
+        self.clauses.append({field: contains(term)})
+        return self
+
+    def match_reference(self, field: str, collection, lookup_field: str, term: str,
+                        source: str = None) -> 'SearchQuery':
+        """
+        Match documents referencing a document whose lookup_field starts with the term
+
+        At most MAX_RESOLVED_IDS referenced documents are resolved, which
+        keeps the $in (and the command holding it) bounded for short terms.
+
+        Args:
+            field (str): Reference field of the base collection (e.g. 'user_id')
+            collection (Collection): Referenced collection
+            lookup_field (str): Indexed lowercase field of the referenced collection
+            term (str): Search term
+            source (str, optional): Field matched when the lowercase copy
+                is missing (see prefix_filter)
+
+        Returns:
+            SearchQuery: self
+        """
+        query = prefix_filter(lookup_field, term, source)
+        self.resolutions.append((collection, query))
+        ids = [document['_id'] for document in collection.find(query, {'_id': 1}).limit(MAX_RESOLVED_IDS)]
+        if ids:
+            self.clauses.append({field: {'$in': ids}})
+        return self
+
+    def join(self, stages: List[Dict[str, Any]]) -> 'SearchQuery':
+        """
+        Add stages run on the limited results (e.g. $lookup)
+
+        Args:
+            stages (list): Aggregation stages
+
+        Returns:
+            SearchQuery: self
+        """
+        self.joins.extend(stages)
+        return self
+
+    def project(self, projection: Optional[Dict[str, Any]]) -> 'SearchQuery':
+        """
+        Set the fields returned
+
+        Args:
+            projection (dict, optional): $project specification
+
+        Returns:
+            SearchQuery: self
+        """
+        self.projection = projection
+        return self
+
+    def filter(self) -> Dict[str, Any]:
+        """
+        Build the $match filter of the base collection
+
+        Returns:
+            dict: Filter matching any clause (nothing when there is none)
+        """
+        if not self.clauses:
+            return {'_id': {'$in': []}}
+        if len(self.clauses) == 1:
+            return self.clauses[0]
+        return {'$or': self.clauses}
+
+    def pipeline(self) -> List[Dict[str, Any]]:
+        """
+        Build the aggregation pipeline
+
+        Returns:
+            list: Stages, filtering and limiting first
+        """
+        stages = [{'$match': self.filter()}]
+        if self.limit:
+            stages.append({'$limit': self.limit})
+        stages.extend(self.joins)
+        if self.projection:
+            stages.append({'$project': self.projection})
+        return stages
+
+    def run(self) -> List[Dict[str, Any]]:
+        """
+        Run the search
+
+        Returns:
+            List of matching documents
+        """
+        return list(self.collection.aggregate(self.pipeline()))
+
+    def explain(self) -> Dict[str, Any]:
+        """
+        Explain every query of the search with execution statistics
+
+        A query fails the check when it scans a collection, or when it
+        examines more than MAX_EXAMINED_RATIO index keys or documents per
+        document returned (e.g. an unanchored regex reading a whole index).
+
+        Returns:
+            Dict with one entry per query ('collection', 'stages', 'indexes',
+            'keys_examined', 'docs_examined', 'returned') in 'plans', and
+            'success' False if any of them fails the check
+        """
+        database = self.collection.database
+        plans = []
+        for collection, query in self.resolutions:
+            explained = database.command(
+                'explain',
+                {'find': collection.name, 'filter': query, 'projection': {'_id': 1}, 'limit': MAX_RESOLVED_IDS},
+                verbosity='executionStats'
+            )
+            plans.append(summarize_plan(collection.name, explained))
+
+        explained = database.command(
+            'explain',
+            {'aggregate': self.collection.name, 'pipeline': self.pipeline(), 'cursor': {}},
+            verbosity='executionStats'
+        )
+        plans.append(summarize_plan(self.collection.name, explained))
+
+        problems = []
+        for plan in plans:
+            allowed = MAX_EXAMINED_RATIO * max(plan['returned'], 1)
+            if COLLECTION_SCAN in plan['stages']:
+                problems.append(f"collection scan on {plan['collection']}")
+            elif max(plan['keys_examined'], plan['docs_examined']) > allowed:
+                problems.append(
+                    f"{plan['collection']} examined {max(plan['keys_examined'], plan['docs_examined'])} "
+                    f"keys/documents for {plan['returned']} results"
+                )
+        return {
+            "success": not problems,
+            "plans": plans,
+            "message": "; ".join(problems).capitalize() if problems else "All queries are selective"
+        }
+
+def summarize_plan(collection_name: str, explained: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Collect the stages, indexes and work of the winning plans of an explain output
+
+    Works for find and aggregate explains; rejected plans are ignored.
+    The keys and documents examined are summed over the executionStats
+    found (an aggregate reports them per $cursor stage).
+
+    Args:
+        collection_name (str): Collection explained
+        explained (dict): explain output, executionStats verbosity
+
+    Returns:
+        Dict with 'collection', 'stages', 'indexes', 'keys_examined',
+        'docs_examined' and 'returned'
+    """
+    stages, indexes = [], []
+    work = {'keys_examined': 0, 'docs_examined': 0, 'returned': 0}
+
+    def walk(node):
+        if isinstance(node, dict):
+            if isinstance(node.get('stage'), str):
+                stages.append(node['stage'])
+            if isinstance(node.get('indexName'), str):
+                indexes.append(node['indexName'])
+            stats = node.get('executionStats')
+            if isinstance(stats, dict):
+                work['keys_examined'] += stats.get('totalKeysExamined', 0)
+                work['docs_examined'] += stats.get('totalDocsExamined', 0)
+                work['returned'] += stats.get('nReturned', 0)
+            for key, value in node.items():
+                if key not in ('rejectedPlans', 'allPlansExecution'):
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explained)
+    return dict({
+        'collection': collection_name,
+        'stages': sorted(set(stages)),
+        'indexes': sorted(set(indexes))
+    }, **work)
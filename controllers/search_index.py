@@ -0,0 +1,287 @@
+# digital_library/controllers/search_index.py
+import re
+import time
+import heapq
+import threading
+from bisect import bisect_left
+from typing import List, Dict, Any, Iterable
+
+class CatalogSearchIndex:
+    """
+    In-process inverted index over the book catalog
+
+    Maps every token of a book's title, author and ISBN to the books
+    containing it, so a search is a handful of dictionary lookups instead
+    of a regex scan over the whole collection.
+
+    Writes made through the controllers update the index in place. Books
+    written by other processes (imports, the dataset generator, another
+    instance of the app) are picked up by ensure_current(), which rebuilds
+    the index when the collection's count or highest _id no longer match
+    the ones recorded at build time, and at the latest after MAX_AGE.
+    """
+
+    # Relevance weight of a token depending on the field it was found in
+    FIELD_WEIGHTS = {'title': 3.0, 'author': 2.0, 'isbn': 5.0}
+
+    # Prefix matches rank below exact token matches
+    PREFIX_FACTOR = 0.5
+
+    # Maximum number of index tokens a single prefix may expand to
+    MAX_PREFIX_EXPANSIONS = 256
+
+    # Seconds between two checks of the collection for outside writes
+    CHECK_INTERVAL = 5.0
+
+    # Seconds after which the index is rebuilt anyway (catches outside edits,
+    # which change neither the count nor the highest _id)
+    MAX_AGE = 600.0
+
+    # Fields needed to build the index
+    PROJECTION = {'title': 1, 'author': 1, 'isbn': 1}
+
+    # One shared index per database connection
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_connection(cls, db_connection) -> 'CatalogSearchIndex':
+        """
+        Get the search index shared by all controllers of a connection
+
+        Args:
+            db_connection (DatabaseConnection): Database connection
+
+        Returns:
+            CatalogSearchIndex: Shared index
+        """
+        with cls._instances_lock:
+            index = cls._instances.get(id(db_connection))
+            if index is None:
+                index = cls._instances[id(db_connection)] = cls()
+            return index
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Any, float]] = {}
+        self._doc_tokens: Dict[Any, List[str]] = {}
+        self._sorted_tokens: List[str] = []
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self.built = False
+        # (document count, highest _id) of the collection the index reflects
+        self.signature = None
+        self.built_at = 0.0
+        self.checked_at = 0.0
+
+    @staticmethod
+    def tokenize(text) -> List[str]:
+        """
+        Split text into lowercase word tokens
+
+        Args:
+            text: Text to tokenize
+
+        Returns:
+            List of tokens
+        """
+        return re.findall(r'\w+', str(text or '').lower())
+
+    def _book_tokens(self, book: Dict[str, Any]) -> Dict[str, float]:
+        """Compute the weighted tokens of a book document"""
+        weights = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            tokens = self.tokenize(book.get(field))
+            if field == 'isbn' and tokens:
+                # Also index the ISBN without hyphens or spaces
+                tokens.append(''.join(tokens))
+            for token in set(tokens):
+                weights[token] = weights.get(token, 0.0) + weight
+        return weights
+
+    def build(self, books: Iterable[Dict[str, Any]]):
+        """
+        (Re)build the index from an iterable of book documents
+
+        Args:
+            books (iterable): Documents with _id, title, author and isbn
+        """
+        postings = {}
+        doc_tokens = {}
+        for book in books:
+            weights = self._book_tokens(book)
+            for token, weight in weights.items():
+                postings.setdefault(token, {})[book['_id']] = weight
+            doc_tokens[book['_id']] = list(weights)
+
+        with self._lock:
+            self._postings = postings
+            self._doc_tokens = doc_tokens
+            self._sorted_tokens = sorted(postings)
+            self.built = True
+
+    def build_from_collection(self, collection, batch_size: int = 5000):
+        """
+        Build the index by streaming a books collection
+
+        Args:
+            collection (Collection): Books collection
+            batch_size (int): Cursor batch size
+        """
+        # Taken first, so books inserted while streaming cause a later rebuild
+        signature = self.collection_signature(collection)
+        self.build(collection.find({}, self.PROJECTION).batch_size(batch_size))
+        with self._lock:
+            self.signature = signature
+            self.built_at = self.checked_at = time.monotonic()
+
+    @staticmethod
+    def collection_signature(collection) -> tuple:
+        """
+        Cheap fingerprint of a collection's content
+
+        Args:
+            collection (Collection): Books collection
+
+        Returns:
+            tuple: (estimated document count, highest _id); both are read
+            from metadata and the _id index
+        """
+        last = collection.find_one({}, {'_id': 1}, sort=[('_id', -1)])
+        return (collection.estimated_document_count(), last['_id'] if last else None)
+
+    def ensure_current(self, collection) -> bool:
+        """
+        Build the index, or rebuild it if the collection changed behind its back
+
+        The collection is checked at most every CHECK_INTERVAL seconds.
+
+        Args:
+            collection (Collection): Books collection
+
+        Returns:
+            bool: Whether the index was (re)built
+        """
+        with self._build_lock:
+            now = time.monotonic()
+            if self.built:
+                if now - self.checked_at < self.CHECK_INTERVAL:
+                    return False
+                if now - self.built_at < self.MAX_AGE:
+                    self.checked_at = now
+                    if self.collection_signature(collection) == self.signature:
+                        return False
+            self.build_from_collection(collection)
+            return True
+
+    def add(self, book: Dict[str, Any]):
+        """
+        Add or replace a book in the index
+
+        Args:
+            book (dict): Book document including its _id
+        """
+        with self._lock:
+            if book['_id'] not in self._doc_tokens:
+                self._track_insert(book['_id'])
+            self.remove(book['_id'], deleted=False)
+            weights = self._book_tokens(book)
+            for token, weight in weights.items():
+                if token not in self._postings:
+                    self._postings[token] = {}
+                    position = bisect_left(self._sorted_tokens, token)
+                    if position == len(self._sorted_tokens) or self._sorted_tokens[position] != token:
+                        self._sorted_tokens.insert(position, token)
+                self._postings[token][book['_id']] = weight
+            self._doc_tokens[book['_id']] = list(weights)
+
+    def _track_insert(self, book_id):
+        """Account for a book inserted through this process in the signature"""
+        if self.signature is None:
+            return
+        count, last_id = self.signature
+        try:
+            last_id = max(last_id, book_id) if last_id is not None else book_id
+        except TypeError:
+            pass
+        self.signature = (count + 1, last_id)
+
+    def remove(self, book_id, deleted: bool = True):
+        """
+        Remove a book from the index
+
+        Args:
+            book_id: _id of the book
+            deleted (bool): The book was deleted (not re-indexed)
+        """
+        with self._lock:
+            if deleted and self.signature is not None and book_id in self._doc_tokens:
+                count, last_id = self.signature
+                self.signature = (count - 1, last_id)
+            for token in self._doc_tokens.pop(book_id, []):
+                posting = self._postings.get(token)
+                if posting is None:
+                    continue
+                posting.pop(book_id, None)
+                if not posting:
+                    # Stale entries in _sorted_tokens are skipped on lookup
+                    del self._postings[token]
+
+    def _matching_tokens(self, token: str):
+        """Yield (index token, factor) pairs for an exact or prefix match"""
+        if token in self._postings:
+            yield token, 1.0
+
+        position = bisect_left(self._sorted_tokens, token)
+        expansions = 0
+        while position < len(self._sorted_tokens) and expansions < self.MAX_PREFIX_EXPANSIONS:
+            candidate = self._sorted_tokens[position]
+            if not candidate.startswith(token):
+                break
+            if candidate != token and candidate in self._postings:
+                expansions += 1
+                yield candidate, self.PREFIX_FACTOR
+            position += 1
+
+    def search(self, term: str, limit: int = 50) -> List[Any]:
+        """
+        Search the index
+
+        Every term token must match a title, author or ISBN token, either
+        exactly or as a prefix. Results are ranked by summed field weights.
+
+        Args:
+            term (str): Search text
+            limit (int): Maximum number of results
+
+        Returns:
+            List of book _ids ordered by relevance
+        """
+        tokens = list(dict.fromkeys(self.tokenize(term)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            per_token_scores = []
+            for token in tokens:
+                scores = {}
+                for index_token, factor in self._matching_tokens(token):
+                    for book_id, weight in self._postings[index_token].items():
+                        score = weight * factor
+                        if score > scores.get(book_id, 0.0):
+                            scores[book_id] = score
+                if not scores:
+                    return []
+                per_token_scores.append(scores)
+
+        # Intersect starting from the most selective token
+        per_token_scores.sort(key=len)
+        candidates = per_token_scores[0]
+        for scores in per_token_scores[1:]:
+            candidates = {
+                book_id: score + scores[book_id]
+                for book_id, score in candidates.items() if book_id in scores
+            }
+            if not candidates:
+                return []
+
+        return [book_id for book_id, _ in heapq.nlargest(limit, candidates.items(), key=lambda item: item[1])]
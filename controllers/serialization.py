@@ -0,0 +1,45 @@
+# digital_library/controllers/serialization.py
+from typing import Any, Dict, Iterable, Optional
+from bson import ObjectId
+from bson.codec_options import TypeDecoder, TypeRegistry
+
+class ObjectIdAsString(TypeDecoder):
+    """Decode ObjectId values straight to their hex string"""
+    bson_type = ObjectId
+
+    def transform_bson(self, value):
+        return str(value)
+
+# Registry applied to collections whose documents go to the views
+DISPLAY_TYPE_REGISTRY = TypeRegistry([ObjectIdAsString()])
+
+def display_collection(collection):
+    """
+    Get a view of a collection that decodes ObjectIds as strings
+
+    The conversion happens while the BSON is decoded, so documents read
+    through this collection are ready for display (and JSON) without a
+    second pass over every dict and list.
+
+    Args:
+        collection (Collection): Collection with the default codec options
+
+    Returns:
+        Collection: Same collection with the display codec options
+    """
+    codec_options = collection.codec_options.with_options(type_registry=DISPLAY_TYPE_REGISTRY)
+    return collection.with_options(codec_options=codec_options)
+
+def fields_projection(fields: Optional[Iterable[str]]) -> Optional[Dict[str, int]]:
+    """
+    Build a projection that only returns the given fields
+
+    Args:
+        fields (iterable, optional): Field names; None returns every field
+
+    Returns:
+        dict: MongoDB projection, or None
+    """
+    if fields is None:
+        return None
+    return {field: 1 for field in fields}
@@ -1,20 +1,38 @@
 # digital_library/main.py
+import os
+import argparse
 import tkinter as tk
 from views.main_window import DigitalLibraryApp
+from views.ui_profiler import UIProfiler
 from config.database import db_connection
 
-def main():
+def main(argv=None):
     """
     Main application entry point
+    
+    Usage:
+        python main.py
+        python main.py --profile profiles/   Measure UI responsiveness
     """
+    parser = argparse.ArgumentParser(description="Digital Library")
+    parser.add_argument('--profile', nargs='?', const='profiles', default=os.getenv('UI_PROFILE'), 
+                        metavar='DIRECTORY', 
+                        help="Measure event-loop lag and write a cProfile dump per action (default: profiles)")
+    args = parser.parse_args(argv)
+    
+    profiler = None
+    app = None
     try:
         # Create root window
         root = tk.Tk()
         root.title("Digital Library")
         root.geometry("1024x768")
         
+        # Optional responsiveness profiling (--profile or UI_PROFILE)
+        profiler = UIProfiler.from_setting(root, args.profile)
+        
         # Initialize application
-        app = DigitalLibraryApp(root, db_connection)
+        app = DigitalLibraryApp(root, db_connection, profiler=profiler)
         
         # Start application main loop
         root.mainloop()
@@ -22,8 +40,13 @@ def main():
     except Exception as e:
         print(f"Application startup error: {e}")
     finally:
+        # Closing the window already did this; covers other exits
+        if app is not None:
+            app.executor.shutdown()
+        if profiler:
+            profiler.close()
         # Ensure database connection is closed
         db_connection.close_connection()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
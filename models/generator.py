@@ -0,0 +1,379 @@
+# digital_library/models/generator.py
+import os
+import sys
+import time
+import bisect
+import random
+import argparse
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from bson import ObjectId, json_util
+from models.models import User, Book, Order, Review, Category
+from utils.helpers import hash_password
+
+# Documents of the other collections per book when not given explicitly
+USERS_PER_BOOK = 0.1
+ORDERS_PER_BOOK = 0.5
+REVIEWS_PER_BOOK = 0.5
+
+FIRST_NAMES = ['anna', 'ben', 'clara', 'david', 'emma', 'felix', 'grace', 'hugo', 'iris', 'jonas',
+               'kate', 'leo', 'mia', 'noah', 'olivia', 'paul', 'rosa', 'sam', 'tara', 'yann']
+WORDS = ['shadow', 'river', 'empire', 'garden', 'winter', 'machine', 'silver', 'journey',
+         'ocean', 'forest', 'stone', 'crown', 'night', 'storm', 'city', 'letter']
+CATEGORIES = ['fiction', 'history', 'science', 'poetry', 'travel', 'children', 'fantasy', 'crime']
+IMPRINTS = ['Penguin', 'Vintage', 'Orbit', 'Tor', 'Faber', 'Gallimard', 'Diogenes', 'Reclam']
+
+# Share of each star rating (1 to 5)
+RATING_WEIGHTS = [0.05, 0.08, 0.17, 0.35, 0.35]
+
+# Share of orders with 1, 2, 3 and 4 books
+ORDER_SIZE_WEIGHTS = [0.55, 0.25, 0.12, 0.08]
+
+# Byte identifying the collection inside generated ObjectIds
+ID_TAGS = {'users': 1, 'books': 2, 'orders': 3, 'reviews': 4, 'categories': 5}
+
+def isbn13(number: int) -> str:
+    """
+    Build a valid ISBN-13 from a sequence number
+
+    Args:
+        number (int): Sequence number (below 10**9)
+
+    Returns:
+        str: ISBN-13 with a correct check digit
+    """
+    digits = f"978{number:09d}"
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+def username(index: int) -> str:
+    """Username of the generated user with the given index"""
+    return f"{FIRST_NAMES[index % len(FIRST_NAMES)]}{index}"
+
+class ZipfSampler:
+    """Draw ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** exponent"""
+
+    def __init__(self, n: int, exponent: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = array('d')
+        total = 0.0
+        for rank in range(n):
+            total += 1.0 / (rank + 1) ** exponent
+            self.cumulative.append(total)
+        self.total = total
+
+    def draw(self) -> int:
+        return bisect.bisect_right(self.cumulative, self.rng.random() * self.total)
+
+class DatasetGenerator:
+    """
+    Deterministic generator of linked users, books, reviews and orders
+
+    Documents are built with the models package and yielded one at a time,
+    so millions of them can be streamed without being held in memory; only
+    one price and one review count per book are kept. The same seed always
+    produces the same documents, including their _ids.
+
+    Popularity follows a Zipf law: a few books get most of the orders and
+    reviews, and a few users place most of the orders. Books carry the
+    rating aggregates of the reviews generated for them.
+    """
+
+    def __init__(self,
+                 books: int,
+                 users: Optional[int] = None,
+                 orders: Optional[int] = None,
+                 reviews: Optional[int] = None,
+                 seed: int = 42,
+                 book_exponent: float = 1.07,
+                 user_exponent: float = 0.8,
+                 start: datetime = datetime(2020, 1, 1),
+                 days: int = 5 * 365):
+        """
+        Args:
+            books (int): Number of books
+            users (int, optional): Number of users (default books / 10)
+            orders (int, optional): Number of orders (default books / 2)
+            reviews (int, optional): Number of reviews (default books / 2)
+            seed (int): Random seed
+            book_exponent (float): Zipf exponent of book popularity
+            user_exponent (float): Zipf exponent of user activity
+            start (datetime): Earliest registration, order and review date
+            days (int): Length of the period covered by the dates
+        """
+        self.counts = {
+            'categories': len(CATEGORIES),
+            'users': users if users is not None else max(10, int(books * USERS_PER_BOOK)),
+            'books': books,
+            'reviews': reviews if reviews is not None else int(books * REVIEWS_PER_BOOK),
+            'orders': orders if orders is not None else int(books * ORDERS_PER_BOOK)
+        }
+        self.seed = seed
+        self.book_exponent = book_exponent
+        self.user_exponent = user_exponent
+        self.start = start
+        self.days = days
+
+    def object_id(self, collection: str, index: int) -> ObjectId:
+        """
+        _id of the generated document with the given index
+
+        The timestamp part is the start date, followed by a collection tag
+        and the index, so references can be computed without a lookup.
+        """
+        timestamp = int((self.start - datetime(1970, 1, 1)).total_seconds())
+        return ObjectId(timestamp.to_bytes(4, 'big') + bytes([ID_TAGS[collection]]) + index.to_bytes(7, 'big'))
+
+    def _date(self, rng: random.Random) -> datetime:
+        return self.start + timedelta(seconds=rng.randrange(self.days * 86400))
+
+    def documents(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate the dataset
+
+        Collections are produced in dependency order: categories, users,
+        books (each followed by its reviews), then orders.
+
+        Yields:
+            (collection name, document) pairs
+        """
+        rng = random.Random(self.seed)
+        counts = self.counts
+
+        for index, name in enumerate(CATEGORIES):
+            category = Category(name, f"Books about {name}", document_id=self.object_id('categories', index)).to_dict()
+            category['createdAt'] = self.start
+            yield 'categories', category
+
+        password_hash = hash_password('password')
+        for index in range(counts['users']):
+            user = User(username(index), f"{username(index)}@example.com", password_hash,
+                        wallet=round(rng.uniform(0, 500), 2),
+                        document_id=self.object_id('users', index)).to_dict()
+            user['registration_date'] = self._date(rng)
+            yield 'users', user
+
+        # Popularity ranks are shuffled so that popular books are spread
+        # over the collection instead of being the first ones inserted
+        book_ranks = array('l', range(counts['books']))
+        rng.shuffle(book_ranks)
+        user_ranks = array('l', range(counts['users']))
+        rng.shuffle(user_ranks)
+        popular_books = ZipfSampler(counts['books'], self.book_exponent, rng)
+        active_users = ZipfSampler(counts['users'], self.user_exponent, rng)
+
+        review_counts = array('l', [0]) * counts['books']
+        for _ in range(counts['reviews']):
+            review_counts[book_ranks[popular_books.draw()]] += 1
+
+        prices = array('d')
+        review_index = 0
+        for index in range(counts['books']):
+            price = round(rng.uniform(5, 60), 2)
+            prices.append(price)
+            book = Book(
+                f"The {rng.choice(WORDS).title()} of the {rng.choice(WORDS).title()}",
+                f"{rng.choice(FIRST_NAMES).title()} {rng.choice(WORDS).title()}son",
+                isbn13(index),
+                rng.randrange(1900, 2025),
+                price,
+                categories=rng.sample(CATEGORIES, rng.randrange(1, 3)),
+                description="Lorem ipsum dolor sit amet " * rng.randrange(1, 8),
+                imprint=rng.choice(IMPRINTS),
+                document_id=self.object_id('books', index)
+            ).to_dict()
+
+            reviews = []
+            for _ in range(review_counts[index]):
+                rating = rng.choices(range(1, 6), RATING_WEIGHTS)[0]
+                review = Review(
+                    self.object_id('users', user_ranks[active_users.draw()]),
+                    book['_id'],
+                    rating,
+                    f"A {rng.choice(WORDS)} of a book, {rating} stars",
+                    document_id=self.object_id('reviews', review_index)
+                ).to_dict()
+                review['review_date'] = self._date(rng)
+                reviews.append(review)
+                review_index += 1
+
+                book['ratingCount'] += 1
+                book['ratingSum'] += rating
+                book['ratingHistogram'][str(rating)] += 1
+            if book['ratingCount']:
+                book['ratingAvg'] = book['ratingSum'] / book['ratingCount']
+            book['createdAt'] = book['updatedAt'] = self._date(rng)
+
+            yield 'books', book
+            for review in reviews:
+                yield 'reviews', review
+
+        for index in range(counts['orders']):
+            size = min(counts['books'], rng.choices(range(1, 5), ORDER_SIZE_WEIGHTS)[0])
+            books = []
+            while len(books) < size:
+                book_index = book_ranks[popular_books.draw()]
+                if book_index not in books:
+                    books.append(book_index)
+            order = Order(
+                self.object_id('users', user_ranks[active_users.draw()]),
+                [self.object_id('books', book_index) for book_index in books],
+                round(sum(prices[book_index] for book_index in books), 2),
+                document_id=self.object_id('orders', index)
+            ).to_dict()
+            order['order_date'] = self._date(rng)
+            yield 'orders', order
+
+class MongoSink:
+    """Write generated documents with unordered insert_many batches per collection"""
+
+    def __init__(self, db_connection, batch_size: int = 10000,
+                 on_flush: Callable[[str, list], None] = None):
+        """
+        Args:
+            db_connection (DatabaseConnection): Target database
+            batch_size (int): Documents per insert_many
+            on_flush (callable, optional): Called with the collection name
+                and the documents of every inserted batch
+        """
+        self.db = db_connection
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.batches = {}
+
+    def write(self, collection: str, document: Dict[str, Any]):
+        batch = self.batches.setdefault(collection, [])
+        batch.append(document)
+        if len(batch) >= self.batch_size:
+            self.flush(collection)
+
+    def flush(self, collection: str):
+        batch = self.batches.pop(collection, None)
+        if batch:
+            self.db.db[collection].insert_many(batch, ordered=False)
+            if self.on_flush:
+                self.on_flush(collection, batch)
+
+    def close(self):
+        for collection in list(self.batches):
+            self.flush(collection)
+
+class JsonlSink:
+    """Write generated documents to one JSON Lines file per collection"""
+
+    def __init__(self, directory: str, compress: bool = False):
+        """
+        Args:
+            directory (str): Output directory, created if needed
+            compress (bool): gzip the files (.jsonl.gz)
+        """
+        from controllers.exporter import open_output
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.compress = compress
+        self.open_output = open_output
+        self.handles = {}
+
+    def write(self, collection: str, document: Dict[str, Any]):
+        handle = self.handles.get(collection)
+        if handle is None:
+            extension = '.jsonl.gz' if self.compress else '.jsonl'
+            handle = self.handles[collection] = self.open_output(
+                os.path.join(self.directory, collection + extension), self.compress)
+        handle.write(json_util.dumps(document, json_options=json_util.RELAXED_JSON_OPTIONS))
+        handle.write('\n')
+
+    def close(self):
+        for handle in self.handles.values():
+            handle.close()
+        self.handles.clear()
+
+def generate(generator: DatasetGenerator, sink, on_progress: Callable[[Dict[str, int]], None] = None,
+             progress_every: int = 100000) -> Dict[str, Any]:
+    """
+    Stream a generated dataset into a sink
+
+    Args:
+        generator (DatasetGenerator): Dataset to generate
+        sink (MongoSink or JsonlSink): Destination
+        on_progress (callable, optional): Called with the running counts
+        progress_every (int): Documents between progress calls
+
+    Returns:
+        Dict with the 'written' count per collection, 'elapsed' seconds and
+        'rate' (documents per second)
+    """
+    written = {name: 0 for name in generator.counts}
+    started = time.perf_counter()
+    try:
+        for total, (collection, document) in enumerate(generator.documents(), start=1):
+            sink.write(collection, document)
+            written[collection] += 1
+            if on_progress and total % progress_every == 0:
+                on_progress(written)
+    finally:
+        sink.close()
+
+    elapsed = time.perf_counter() - started
+    total = sum(written.values())
+    return {
+        "success": True,
+        "written": written,
+        "elapsed": elapsed,
+        "rate": total / elapsed if elapsed else 0.0,
+        "message": f"Generated {total} documents in {elapsed:.1f}s"
+    }
+
+def main(argv=None):
+    """
+    Generate a dataset into MongoDB or JSON Lines files
+
+    Usage:
+        python -m models.generator --books 1000000 --mongo
+        python -m models.generator --books 100000 --jsonl data/ --gzip
+    """
+    parser = argparse.ArgumentParser(description="Synthetic BookStore dataset generator")
+    parser.add_argument('--books', type=int, required=True)
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--orders', type=int)
+    parser.add_argument('--reviews', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--book-exponent', type=float, default=1.07, help="Zipf exponent of book popularity")
+    parser.add_argument('--user-exponent', type=float, default=0.8, help="Zipf exponent of user activity")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--mongo', action='store_true', help="Insert into the configured database")
+    target.add_argument('--jsonl', metavar='DIRECTORY', help="Write one JSONL file per collection")
+    parser.add_argument('--gzip', action='store_true', help="Compress the JSONL files")
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--drop', action='store_true', help="Drop the generated collections first")
+    args = parser.parse_args(argv)
+
+    generator = DatasetGenerator(args.books, args.users, args.orders, args.reviews, args.seed,
+                                 args.book_exponent, args.user_exponent)
+
+    def report(written):
+        print(', '.join(f"{name}: {count}" for name, count in written.items()), file=sys.stderr)
+
+    if args.jsonl:
+        print(generate(generator, JsonlSink(args.jsonl, args.gzip), report)['message'])
+        return 0
+
+    from config.database import db_connection
+    from controllers.order_summaries import OrderSummaries
+    try:
+        if args.drop:
+            for name in list(generator.counts) + ['order_summaries']:
+                db_connection.db[name].drop()
+            db_connection.ensure_indexes()
+        result = generate(generator, MongoSink(db_connection, args.batch_size), report)
+        print(result['message'])
+        # Derived collection of the Orders tab
+        OrderSummaries.for_connection(db_connection).refresh()
+    finally:
+        db_connection.close_connection()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,264 @@
 # digital_library/models/models.py
+import bson
 from bson import ObjectId
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from operator import attrgetter
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+from utils.helpers import normalize_isbn
 
-class User:
-    def __init__(self, 
-                 username: str, 
-                 email: str, 
-                 password_hash: str, 
-                 wallet: float = 0.0):
+# Keys of a book's rating histogram, kept as a 5-tuple in memory
+RATING_KEYS = ('1', '2', '3', '4', '5')
+
+def _as_tuple(value):
+    """Store lists as tuples (no over-allocation)"""
+    return tuple(value) if isinstance(value, list) else value
+
+def _as_list(value):
+    return list(value) if isinstance(value, tuple) else value
+
+def _pack_histogram(value):
+    """Store a {'1'..'5': count} histogram as a tuple of counts"""
+    if isinstance(value, dict) and value.keys() <= set(RATING_KEYS):
+        return tuple(value.get(key, 0) for key in RATING_KEYS)
+    return value
+
+def _unpack_histogram(value):
+    if isinstance(value, tuple):
+        return dict(zip(RATING_KEYS, value))
+    return value
+
+def split_documents(data) -> List[bytes]:
+    """
+    Split concatenated BSON documents (a raw batch) into one bytes per document
+    
+    Args:
+        data (bytes): BSON documents, as returned by find_raw_batches
+    
+    Returns:
+        list: BSON of each document
+    """
+    view = memoryview(data)
+    documents = []
+    position = 0
+    while position < len(view):
+        size = int.from_bytes(view[position:position + 4], 'little')
+        documents.append(bytes(view[position:position + size]))
+        position += size
+    return documents
+
+class Model:
+    """
+    Base of the document models
+    
+    Fields live in __slots__ instead of a dict, which makes a model a
+    fraction of the size of the decoded document; to_dict() builds the
+    document only when it is written or handed to code expecting a dict.
+    
+    Subclasses list FIELDS as (attribute, document key) pairs; PACK and
+    UNPACK convert a field to its in-memory form and back; equal values of
+    the SHARED fields are stored once across the models of a bulk
+    factory call (authors, imprints, ...). Keys without an attribute are
+    kept in 'extra'. A model built with from_bson holds
+    the raw BSON only and decodes it on first attribute access.
+    Fields missing from the document (e.g. left out by a projection)
+    read as None and are left out of to_dict().
+    """
+    
+    __slots__ = ('extra', '_raw', '_partial')
+    
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+    PACK: Dict[str, Any] = {}
+    UNPACK: Dict[str, Any] = {}
+    SHARED: frozenset = frozenset()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRIBUTES = {key: attribute for attribute, key in cls.FIELDS}
+        cls._FIELD_NAMES = frozenset(cls._ATTRIBUTES.values())
+        cls._KEYS = tuple(key for _, key in cls.FIELDS)
+        cls._GET_FIELDS = attrgetter(*(attribute for attribute, _ in cls.FIELDS))
+        cls._UNPACK_KEYS = tuple((key, cls.UNPACK[attribute]) for attribute, key in cls.FIELDS
+                                 if attribute in cls.UNPACK)
+        # Slot descriptors raise AttributeError for unset fields, unlike getattr
+        cls._SLOTS = tuple((key, getattr(cls, attribute)) for attribute, key in cls.FIELDS)
+    
+    def _set(self, document: Dict[str, Any], shared: Optional[Dict[Any, Any]] = None):
+        """Fill the slots from a decoded document, reusing values from shared"""
+        attributes = self._ATTRIBUTES
+        pack = self.PACK
+        shared_fields = self.SHARED if shared is not None else ()
+        found = 0
+        extra = None
+        for key, value in document.items():
+            attribute = attributes.get(key)
+            if attribute is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            found += 1
+            if attribute in pack:
+                value = pack[attribute](value)
+            if attribute in shared_fields:
+                try:
+                    value = shared.setdefault(value, value)
+                except TypeError:
+                    pass
+            setattr(self, attribute, value)
+        self.extra = extra
+        self._partial = found < len(attributes)
+        self._raw = None
+    
+    def __getattr__(self, name):
+        # Only called for unset slots: decode a raw model, or a missing field
+        if name not in self._FIELD_NAMES:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        raw = object.__getattribute__(self, '_raw')
+        if raw is not None:
+            self._set(bson.decode(raw))
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return None
+    
+    @classmethod
+    def from_document(cls, document: Dict[str, Any], shared: Optional[Dict[Any, Any]] = None) -> 'Model':
+        """
+        Build a model from a decoded document
+        
+        Args:
+            document (dict): Document as read from MongoDB
+            shared (dict, optional): Values already held by other models,
+                filled as new values of the SHARED fields are seen
+        
+        Returns:
+            Model holding the document's fields
+        """
+        model = cls.__new__(cls)
+        model._set(document, shared)
+        return model
+    
+    @classmethod
+    def from_bson(cls, data: bytes) -> 'Model':
+        """
+        Build a model from the BSON of a document, without decoding it
+        
+        The document is decoded (with the default codec options) when a
+        field is first read; to_dict() decodes it without filling the slots.
+        
+        Args:
+            data (bytes): BSON of one document
+        
+        Returns:
+            Model holding the raw BSON
+        """
+        model = cls.__new__(cls)
+        model.extra = None
+        model._partial = False
+        model._raw = data
+        return model
+    
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict[str, Any]]) -> List['Model']:
+        """
+        Build models from decoded documents, e.g. a cursor
+        
+        Args:
+            documents (iterable): Documents
+        
+        Returns:
+            list: Models
+        """
+        from_document = cls.from_document
+        shared = {}
+        return [from_document(document, shared) for document in documents]
+    
+    @classmethod
+    def from_raw_batches(cls, batches: Iterable[bytes], codec_options=None, lazy: bool = False) -> List['Model']:
+        """
+        Build models from raw batches of BSON documents
+        
+        Args:
+            batches (iterable): Batches of concatenated BSON documents, e.g.
+                a find_raw_batches cursor
+            codec_options (CodecOptions, optional): Options the documents
+                are decoded with
+            lazy (bool): Keep each document as raw BSON (see from_bson)
+        
+        Returns:
+            list: Models
+        """
+        models = []
+        shared = {}
+        for batch in batches:
+            if lazy:
+                models.extend(map(cls.from_bson, split_documents(batch)))
+            else:
+                documents = bson.decode_all(batch, codec_options) if codec_options else bson.decode_all(batch)
+                models.extend(cls.from_document(document, shared) for document in documents)
+        return models
+    
+    @classmethod
+    def find(cls, collection, filter: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None,
+             lazy: bool = False) -> List['Model']:
+        """
+        Load matching documents straight from raw BSON batches
+        
+        Args:
+            collection (Collection): Collection to read; its codec options
+                apply to the decoded documents
+            filter (dict, optional): Query filter
+            projection (dict, optional): Fields to fetch
+            lazy (bool): Keep each document as raw BSON (see from_bson)
+        
+        Returns:
+            list: Models
+        """
+        batches = collection.find_raw_batches(filter or {}, projection)
+        return cls.from_raw_batches(batches, collection.codec_options, lazy)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert model to dictionary"""
+        if self._raw is not None:
+            return bson.decode(self._raw)
+        if self._partial:
+            document = {}
+            for key, slot in self._SLOTS:
+                try:
+                    document[key] = slot.__get__(self)
+                except AttributeError:
+                    pass
+        else:
+            document = dict(zip(self._KEYS, self._GET_FIELDS(self)))
+        for key, unpack in self._UNPACK_KEYS:
+            if key in document:
+                document[key] = unpack(document[key])
+        if self.extra:
+            document.update(self.extra)
+        return document
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(_id={self.id!r})"
+
+class User(Model):
+    FIELDS = (
+        ('id', '_id'),
+        ('username', 'username'),
+        ('username_lower', 'username_lower'),
+        ('email', 'email'),
+        ('email_lower', 'email_lower'),
+        ('password_hash', 'passwordHash'),
+        ('wallet', 'wallet'),
+        ('registration_date', 'registration_date')
+    )
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
+    
+    def __init__(self,
+                 username: str,
+                 email: str,
+                 password_hash: str,
+                 wallet: float = 0.0,
+                 document_id: Optional[ObjectId] = None):
         """
         User model for digital library
         
@@ -17,30 +267,57 @@ class User:
             email (str): User's email address
             password_hash (str): Hashed password
             wallet (float, optional): User's wallet balance
+            document_id (ObjectId, optional): _id, generated when omitted
         """
-        self.data = {
-            "_id": ObjectId(),
-            "username": username,
-            "email": email,
-            "passwordHash": password_hash,
-            "wallet": wallet,
-            "createdAt": datetime.utcnow()
-        }
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert model to dictionary"""
-        return self.data
+        self.id = document_id or ObjectId()
+        self.username = username
+        # Lowercase copies for indexed prefix searches
+        self.username_lower = username.lower()
+        self.email = email
+        self.email_lower = email.lower()
+        self.password_hash = password_hash
+        self.wallet = wallet
+        self.registration_date = datetime.utcnow()
+        self.extra = None
+        self._partial = False
+        self._raw = None
 
-class Book:
-    def __init__(self, 
-                 title: str, 
-                 author: str, 
-                 isbn: str, 
-                 published_year: int, 
-                 price: float, 
+class Book(Model):
+    FIELDS = (
+        ('id', '_id'),
+        ('title', 'title'),
+        ('title_lower', 'title_lower'),
+        ('author', 'author'),
+        ('isbn', 'isbn'),
+        ('isbn13', 'isbn13'),
+        ('published_year', 'publishedYear'),
+        ('price', 'price'),
+        ('categories', 'categories'),
+        ('description', 'description'),
+        ('imprint', 'imprint'),
+        ('rating_count', 'ratingCount'),
+        ('rating_sum', 'ratingSum'),
+        ('rating_avg', 'ratingAvg'),
+        ('rating_histogram', 'ratingHistogram'),
+        ('version', 'version'),
+        ('created_at', 'createdAt'),
+        ('updated_at', 'updatedAt')
+    )
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
+    PACK = {'categories': _as_tuple, 'rating_histogram': _pack_histogram}
+    UNPACK = {'categories': _as_list, 'rating_histogram': _unpack_histogram}
+    SHARED = frozenset({'author', 'imprint', 'categories', 'rating_histogram'})
+    
+    def __init__(self,
+                 title: str,
+                 author: str,
+                 isbn: str,
+                 published_year: int,
+                 price: float,
                  categories: Optional[List[str]] = None,
-                 description: Optional[str] = None, 
-                 imprint: Optional[str] = None):
+                 description: Optional[str] = None,
+                 imprint: Optional[str] = None,
+                 document_id: Optional[ObjectId] = None):
         """
         Book model representing a book in the digital library
         
@@ -53,29 +330,58 @@ class Book:
             categories (list, optional): Book categories
             description (str, optional): Book description
             imprint (str, optional): Book publisher
+            document_id (ObjectId, optional): _id, generated when omitted
         """
-        self.data = {
-            "_id": ObjectId(),
-            "title": title,
-            "author": author,
-            "isbn": isbn,
-            "publishedYear": published_year,
-            "price": price,
-            "categories": categories or [],
-            "description": description,
-            "imprint": imprint,
-            "createdAt": datetime.utcnow()
-        }
+        now = datetime.utcnow()
+        self.id = document_id or ObjectId()
+        self.title = title
+        # Lowercase copy for indexed prefix searches
+        self.title_lower = title.lower()
+        self.author = author
+        self.isbn = isbn
+        self.isbn13 = normalize_isbn(isbn)
+        self.published_year = published_year
+        self.price = price
+        self.categories = tuple(categories or ())
+        self.description = description or ''
+        self.imprint = imprint or ''
+        self.rating_count = 0
+        self.rating_sum = 0
+        self.rating_avg = 0
+        self.rating_histogram = (0,) * len(RATING_KEYS)
+        self.version = 1
+        self.created_at = now
+        self.updated_at = now
+        self.extra = None
+        self._partial = False
+        self._raw = None
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert model to dictionary"""
-        return self.data
+    def _set(self, document: Dict[str, Any], shared: Optional[Dict[Any, Any]] = None):
+        super()._set(document, shared)
+        # Usually equal to the ISBN and the creation date: hold them once
+        if self.isbn13 is not None and self.isbn13 == self.isbn:
+            self.isbn13 = self.isbn
+        if self.updated_at is not None and self.updated_at == self.created_at:
+            self.updated_at = self.created_at
 
-class Order:
-    def __init__(self, 
-                 user_id: ObjectId, 
-                 book_ids: List[ObjectId], 
-                 total_price: float):
+class Order(Model):
+    FIELDS = (
+        ('id', '_id'),
+        ('user_id', 'user_id'),
+        ('book_ids', 'book_ids'),
+        ('total_price', 'total_price'),
+        ('order_date', 'order_date'),
+        ('version', 'version')
+    )
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
+    PACK = {'book_ids': _as_tuple}
+    UNPACK = {'book_ids': _as_list}
+    
+    def __init__(self,
+                 user_id: ObjectId,
+                 book_ids: List[ObjectId],
+                 total_price: float,
+                 document_id: Optional[ObjectId] = None):
         """
         Order model representing a book purchase
         
@@ -83,66 +389,82 @@ class Order:
             user_id (ObjectId): User who made the order
             book_ids (list): List of book IDs in the order
             total_price (float): Total order price
+            document_id (ObjectId, optional): _id, generated when omitted
         """
-        self.data = {
-            "_id": ObjectId(),
-            "userId": user_id,
-            "orderItems": [{"bookId": book_id} for book_id in book_ids],
-            "totalPrice": total_price,
-            "orderDate": datetime.utcnow(),
-            "status": "pending"  # Add order status
-        }
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert model to dictionary"""
-        return self.data
+        self.id = document_id or ObjectId()
+        self.user_id = user_id
+        self.book_ids = tuple(book_ids)
+        self.total_price = total_price
+        self.order_date = datetime.utcnow()
+        self.version = 1
+        self.extra = None
+        self._partial = False
+        self._raw = None
 
-class Review:
-    def __init__(self, 
-                 user_id: ObjectId, 
-                 book_id: ObjectId, 
-                 rating: float, 
-                 comment: Optional[str] = None):
+class Review(Model):
+    FIELDS = (
+        ('id', '_id'),
+        ('user_id', 'user_id'),
+        ('book_id', 'book_id'),
+        ('rating', 'rating'),
+        ('review_text', 'review_text'),
+        ('review_date', 'review_date'),
+        ('version', 'version')
+    )
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
+    
+    def __init__(self,
+                 user_id: ObjectId,
+                 book_id: ObjectId,
+                 rating: int,
+                 review_text: Optional[str] = None,
+                 document_id: Optional[ObjectId] = None):
         """
         Review model representing a book review
         
         Args:
             user_id (ObjectId): User who wrote the review
             book_id (ObjectId): Book being reviewed
-            rating (float): Review rating
-            comment (str, optional): Review comment
-        """
-        self.data = {
-            "_id": ObjectId(),
-            "userId": user_id,
-            "bookId": book_id,
-            "rating": rating,
-            "comment": comment,
-            "createdAt": datetime.utcnow()
-        }
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert model to dictionary"""
-        return self.data
+            rating (int): Stars, 1 to 5
+            review_text (str, optional): Review text
+            document_id (ObjectId, optional): _id, generated when omitted
+        """
+        self.id = document_id or ObjectId()
+        self.user_id = user_id
+        self.book_id = book_id
+        self.rating = rating
+        self.review_text = review_text or ''
+        self.review_date = datetime.utcnow()
+        self.version = 1
+        self.extra = None
+        self._partial = False
+        self._raw = None
 
-class Category:
-    def __init__(self, 
-                 name: str, 
-                 description: Optional[str] = None):
+class Category(Model):
+    FIELDS = (
+        ('id', '_id'),
+        ('name', 'name'),
+        ('description', 'description'),
+        ('created_at', 'createdAt')
+    )
+    __slots__ = tuple(attribute for attribute, _ in FIELDS)
+    
+    def __init__(self,
+                 name: str,
+                 description: Optional[str] = None,
+                 document_id: Optional[ObjectId] = None):
         """
         Category model for book categorization
         
         Args:
             name (str): Category name
             description (str, optional): Category description
+            document_id (ObjectId, optional): _id, generated when omitted
         """
-        self.data = {
-            "_id": ObjectId(),
-            "name": name,
-            "description": description,
-            "createdAt": datetime.utcnow()
-        }
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert model to dictionary"""
-        return self.data
\ No newline at end of file
+        self.id = document_id or ObjectId()
+        self.name = name
+        self.description = description
+        self.created_at = datetime.utcnow()
+        self.extra = None
+        self._partial = False
+        self._raw = None
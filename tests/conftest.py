@@ -0,0 +1,92 @@
+# digital_library/tests/conftest.py
+import os
+import sys
+import pytest
+
+# Modules are imported from the project root, as main.py and cli.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import DatabaseConnection
+
+class FakeTreeview:
+    """
+    Stand-in for ttk.Treeview recording the calls the tables make
+
+    Only what TableSynchronizer and PagedTable use is implemented, so the
+    table logic can be tested without a display.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.values = {}
+        self.updated = []
+
+    def get_children(self, item=''):
+        return tuple(self.rows)
+
+    def insert(self, parent, index, iid=None, values=()):
+        self.rows.insert(len(self.rows) if index == 'end' else index, iid)
+        self.values[iid] = tuple(values)
+        return iid
+
+    def delete(self, *iids):
+        self.rows = [iid for iid in self.rows if iid not in iids]
+        for iid in iids:
+            self.values.pop(iid, None)
+
+    def move(self, iid, parent, index):
+        self.rows.remove(iid)
+        self.rows.insert(index, iid)
+
+    def item(self, iid, values=None):
+        if values is not None:
+            self.values[iid] = tuple(values)
+            self.updated.append(iid)
+        return {'values': list(self.values[iid])}
+
+    def see(self, iid):
+        pass
+
+@pytest.fixture
+def mock_connection():
+    """DatabaseConnection backed by an in-process mongomock client"""
+    mongomock = pytest.importorskip('mongomock')
+    connection = DatabaseConnection(database='bookstore_test')
+    connection._client = mongomock.MongoClient()
+    connection.ensure_indexes()
+    yield connection
+    connection.close_connection()
+
+@pytest.fixture(scope='session')
+def mongod_uri():
+    """URI of the test server (MONGO_TEST_URI), checked once per session"""
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    uri = os.getenv('MONGO_TEST_URI', 'mongodb://localhost:27017')
+    client = MongoClient(uri, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        return pytest.skip(f"No MongoDB server at {uri}: {e}")
+    finally:
+        client.close()
+    return uri
+
+@pytest.fixture
+def mongod_connection(mongod_uri):
+    """
+    DatabaseConnection to a real server (MONGO_TEST_URI, default localhost)
+
+    Tests using it are marked 'mongod' and skipped when no server answers.
+    """
+    uri = mongod_uri
+    connection = DatabaseConnection(uri=uri, database='bookstore_test')
+    connection.client.drop_database('bookstore_test')
+    connection.ensure_indexes()
+    yield connection
+    connection.client.drop_database('bookstore_test')
+    connection.close_connection()
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "mongod: needs a running MongoDB server (MONGO_TEST_URI)")
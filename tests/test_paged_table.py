@@ -0,0 +1,67 @@
+# digital_library/tests/test_paged_table.py
+from collections import deque
+from functools import partial
+from controllers.controller import LibraryController
+from views.paged_table import PagedTable
+from views.table_sync import TableSynchronizer
+from tests.conftest import FakeTreeview
+
+def headless_table(fetch_page, page_size=100):
+    """PagedTable on a FakeTreeview, loading pages synchronously"""
+    table = PagedTable.__new__(PagedTable)
+    table.fetch_page = fetch_page
+    table.row_values = lambda book: (book.get('title'), book.get('price'))
+    table.page_size = page_size
+    table.max_pages = 3
+    table.executor = None
+    table.key = 'books:list'
+    table.tree = FakeTreeview()
+    table.sync = TableSynchronizer(table.tree)
+    table.pages = deque()
+    table.has_before = False
+    table.has_after = False
+    table.paging = True
+    table.loading = False
+    table.scheduled = False
+    return table
+
+def test_refresh_updates_only_rows_changed_elsewhere(mock_connection):
+    controller = LibraryController(mock_connection)
+    controller.display_codecs_supported = False
+    controller.cache.clear()
+    book_ids = mock_connection.books.insert_many([
+        {'title': f"Book {index}", 'isbn': f"isbn-{index}", 'price': 10.0, 'version': 1}
+        for index in range(5)
+    ]).inserted_ids
+
+    table = headless_table(partial(controller.get_books_page, fields=LibraryController.BOOK_LIST_FIELDS))
+    table.reload()
+    # A poll before the change caches the re-read of the displayed rows
+    table.refresh()
+    assert table.tree.rows == [str(book_id) for book_id in book_ids]
+
+    # Written by another process: the controller's cache is not invalidated
+    mock_connection.books.update_one({'_id': book_ids[2]}, {'$set': {'price': 12.5}, '$inc': {'version': 1}})
+    table.refresh()
+
+    assert table.tree.updated == [str(book_ids[2])]
+    assert table.tree.values[str(book_ids[2])] == ('Book 2', 12.5)
+
+def test_refresh_appends_books_inserted_elsewhere(mock_connection):
+    controller = LibraryController(mock_connection)
+    controller.display_codecs_supported = False
+    controller.cache.clear()
+    mock_connection.books.insert_many([
+        {'title': f"Book {index}", 'isbn': f"isbn-{index}", 'price': 10.0, 'version': 1}
+        for index in range(3)
+    ])
+
+    table = headless_table(partial(controller.get_books_page, fields=LibraryController.BOOK_LIST_FIELDS))
+    table.reload()
+    table.refresh()
+    new_id = mock_connection.books.insert_one({'title': 'New', 'isbn': 'isbn-new', 'price': 5.0, 'version': 1}).inserted_id
+    table.refresh()
+
+    assert table.tree.rows[-1] == str(new_id)
+    assert len(table.tree.rows) == 4
+    assert table.tree.updated == []
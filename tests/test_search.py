@@ -0,0 +1,32 @@
+# digital_library/tests/test_search.py
+from controllers.controller import LibraryController
+
+def mock_controller(connection):
+    """Controller limited to what mongomock supports"""
+    controller = LibraryController(connection)
+    controller.text_search_supported = False
+    controller.display_codecs_supported = False
+    controller.lookup_pipelines_supported = False
+    return controller
+
+def test_search_finds_documents_written_without_search_keys(mock_connection):
+    controller = mock_controller(mock_connection)
+    user_id = mock_connection.users.insert_one({'username': 'Bob', 'email': 'Bob@example.org'}).inserted_id
+    book_id = mock_connection.books.insert_one({'title': 'Dune', 'isbn': '9780441013593'}).inserted_id
+    mock_connection.reviews.insert_one({'user_id': user_id, 'book_id': book_id, 'review_text': 'Sandy'})
+
+    assert [str(user['_id']) for user in controller.search_users('bo')] == [str(user_id)]
+    assert [str(user['_id']) for user in controller.search_users('BOB@')] == [str(user_id)]
+    assert controller.search_users('ob') == []
+    assert len(controller._review_search('du').run()) == 1
+    assert len(controller._review_search('bob').run()) == 1
+
+def test_ensure_search_keys_backfills_missing_keys(mock_connection):
+    controller = mock_controller(mock_connection)
+    user_id = mock_connection.users.insert_one({'username': 'Bob', 'email': 'Bob@example.org'}).inserted_id
+
+    assert mock_connection.ensure_search_keys() == {'books': 0, 'users': 1}
+    user = mock_connection.users.find_one({'_id': user_id})
+    assert (user['username_lower'], user['email_lower']) == ('bob', 'bob@example.org')
+    assert controller.migrate_search_keys()['users'] == 0
+    assert [str(user['_id']) for user in controller.search_users('bo')] == [str(user_id)]
@@ -0,0 +1,85 @@
+# digital_library/tests/test_search_explain.py
+import re
+import pytest
+from controllers import query_builder
+from controllers.controller import LibraryController
+from controllers.query_builder import COLLECTION_SCAN, MAX_EXAMINED_RATIO
+
+# Terms covering each clause of the searches: usernames, emails, titles,
+# review words, no match, and regex metacharacters (_ids are tested below)
+SEARCH_TERMS = ['reader1', 'READER', 'reader7@', 'volume 3', 'sand', 'nothing matches', '(a+']
+
+def seed(connection, users=300, books=100, reviews=1000):
+    """Insert users, books and reviews carrying their search keys"""
+    user_ids = connection.users.insert_many([
+        {'username': f"Reader{index}", 'email': f"reader{index}@example.org"}
+        for index in range(users)
+    ]).inserted_ids
+    book_ids = connection.books.insert_many([
+        {'title': f"Volume {index}", 'isbn': f"isbn-{index}"}
+        for index in range(books)
+    ]).inserted_ids
+    connection.reviews.insert_many([
+        {
+            'user_id': user_ids[index % users],
+            'book_id': book_ids[index % books],
+            'rating': index % 5 + 1,
+            'review_text': 'Sand and spice' if index % 50 == 0 else f"Review number {index}"
+        }
+        for index in range(reviews)
+    ])
+    connection.ensure_search_keys()
+    return user_ids
+
+def searches(controller, term):
+    return {
+        'reviews': controller._review_search(term),
+        'users': controller._user_search(term)
+    }
+
+@pytest.mark.mongod
+@pytest.mark.parametrize('term', SEARCH_TERMS)
+def test_searches_use_indexes(mongod_connection, term):
+    controller = LibraryController(mongod_connection)
+    seed(mongod_connection)
+
+    for name, search in searches(controller, term).items():
+        report = search.explain()
+        for plan in report['plans']:
+            assert COLLECTION_SCAN not in plan['stages'], (name, plan)
+            allowed = MAX_EXAMINED_RATIO * max(plan['returned'], 1)
+            assert plan['keys_examined'] <= allowed, (name, plan)
+            assert plan['docs_examined'] <= allowed, (name, plan)
+        assert report['success'], (name, report['message'])
+
+@pytest.mark.mongod
+def test_search_by_id_reads_one_document(mongod_connection):
+    controller = LibraryController(mongod_connection)
+    user_ids = seed(mongod_connection)
+
+    plans = controller._user_search(str(user_ids[0])).explain()['plans']
+    assert [plan['returned'] for plan in plans] == [1]
+    assert plans[0]['docs_examined'] <= 1 + MAX_EXAMINED_RATIO
+
+@pytest.mark.parametrize('term', SEARCH_TERMS)
+def test_search_regexes_are_anchored(mock_connection, term):
+    controller = LibraryController(mock_connection)
+    controller.text_search_supported = False
+    seed(mock_connection, users=3, books=3, reviews=3)
+
+    for name, search in searches(controller, term).items():
+        filters = [query for _, query in search.resolutions]
+        if name == 'users':
+            filters.append(search.filter())
+        for regex in re.findall(r"'\$regex': '([^']*)'", repr(filters)):
+            assert regex.startswith('^'), (name, regex)
+
+def test_reference_resolution_is_limited(mock_connection, monkeypatch):
+    monkeypatch.setattr(query_builder, 'MAX_RESOLVED_IDS', 5)
+    controller = LibraryController(mock_connection)
+    controller.text_search_supported = False
+    seed(mock_connection, users=8, books=1, reviews=1)
+
+    clauses = controller._review_search('reader').clauses
+    resolved = [clause['user_id']['$in'] for clause in clauses if 'user_id' in clause]
+    assert len(resolved) == 1 and len(resolved[0]) == 5
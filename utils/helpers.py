@@ -2,6 +2,7 @@
 import re
 import hashlib
 import secrets
+from typing import Optional
 
 def validate_email(email: str) -> bool:
     """
@@ -63,4 +64,38 @@ def format_currency(amount: float) -> str:
     Returns:
         str: Formatted currency string
     """
-    return f"€{amount:.2f}"
\ No newline at end of file
+    return f"€{amount:.2f}"
+
+def normalize_isbn(isbn) -> Optional[str]:
+    """
+    Convert an ISBN to its canonical ISBN-13 form
+    
+    Hyphens and spaces are ignored and ISBN-10s are converted to ISBN-13
+    (978 prefix, recomputed check digit), so every spelling of the same
+    ISBN maps to one key. Integers (e.g. read back from a Treeview) are
+    padded with the leading zeros they lost.
+    
+    Args:
+        isbn (str or int): ISBN-10 or ISBN-13
+    
+    Returns:
+        str: 13-digit ISBN, or None if the value is not a valid ISBN
+    """
+    if isinstance(isbn, int):
+        isbn = str(isbn).zfill(10)
+    digits = re.sub(r'[\s-]', '', str(isbn)).upper()
+    
+    if re.fullmatch(r'\d{9}[\dX]', digits):
+        check = sum((10 - i) * (10 if c == 'X' else int(c)) for i, c in enumerate(digits))
+        if check % 11:
+            return None
+        digits = '978' + digits[:9]
+    elif re.fullmatch(r'\d{13}', digits):
+        if sum((3 if i % 2 else 1) * int(c) for i, c in enumerate(digits)) % 10:
+            return None
+        return digits
+    else:
+        return None
+    
+    check = (10 - sum((3 if i % 2 else 1) * int(c) for i, c in enumerate(digits)) % 10) % 10
+    return digits + str(check)
@@ -1,25 +1,38 @@
 # digital_library/views/book_view.py
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from functools import partial
+from tkinter import messagebox
 from controllers.controller import LibraryController
+from controllers.executor import QueryExecutor
+from views.paged_table import PagedTable
+from views.table_sync import schedule_auto_refresh
 
 class BookView(tk.Frame):
-    def __init__(self, parent, db_connection):
+    def __init__(self, parent, db_connection, executor=None):
         """
         Book view for managing and browsing books
         
         Args:
             parent (tk.Notebook): Parent notebook
             db_connection (DatabaseConnection): Database connection
+            executor (QueryExecutor, optional): Background query executor
         """
         super().__init__(parent)
         self.db_connection = db_connection
         self.controller = LibraryController(db_connection)
+        self.executor = executor or QueryExecutor(self)
         
         # Layout
         self.create_search_section()
         self.create_book_table()
         self.create_action_buttons()
+        
+        # Optional polling for changes made elsewhere (AUTO_REFRESH_MS)
+        schedule_auto_refresh(self, self.refresh_books)
+    
+    def show_error(self, error):
+        """Display an error raised by a background query"""
+        messagebox.showerror("Error", str(error))
     
     def create_search_section(self):
         """Create search input and button"""
@@ -36,19 +49,49 @@ class BookView(tk.Frame):
         search_button.pack(side=tk.LEFT)
     
     def create_book_table(self):
-        """Create treeview to display books"""
-        columns = ('Title', 'Author', 'ISBN', 'Year', 'Price', 'Categories')
-        self.book_table = ttk.Treeview(self, columns=columns, show='headings')
-        
-        for col in columns:
-            self.book_table.heading(col, text=col)
-            self.book_table.column(col, width=100)
+        """Create paged treeview to display books"""
+        columns = ('Title', 'Author', 'ISBN', 'Year', 'Price', 'Categories', 'Rating')
+        self.paged_table = PagedTable(
+            self, 
+            columns, 
+            fetch_page=self.book_page_fetcher(), 
+            row_values=self.book_row, 
+            executor=self.executor, 
+            key='books:list'
+        )
+        self.paged_table.pack(expand=True, fill='both', padx=10, pady=10)
+        self.book_table = self.paged_table.tree
         
-        self.book_table.pack(expand=True, fill='both', padx=10, pady=10)
+        # Clicking the Rating heading toggles top-rated-first order
+        self.sort_by_rating = False
+        self.book_table.heading('Rating', command=self.toggle_rating_sort)
         
         # Load initial books
         self.load_books()
     
+    def book_page_fetcher(self, by_rating=False):
+        """
+        Build the page loader of the table
+        
+        Args:
+            by_rating (bool): Sort by average rating, best first
+        
+        Returns:
+            callable: get_books_page with the table's fields and order
+        """
+        if by_rating:
+            return partial(self.controller.get_books_page, fields=LibraryController.BOOK_LIST_FIELDS, 
+                           sort_field='ratingAvg', descending=True)
+        return partial(self.controller.get_books_page, fields=LibraryController.BOOK_LIST_FIELDS)
+    
+    def toggle_rating_sort(self):
+        """Switch between insertion order and top rated first"""
+        self.sort_by_rating = not self.sort_by_rating
+        self.book_table.heading('Rating', text='Rating ▼' if self.sort_by_rating else 'Rating')
+        self.paged_table.fetch_page = self.book_page_fetcher(self.sort_by_rating)
+        self.search_var.set('')
+        self.load_books()
+    
     def create_action_buttons(self):
         """Create buttons for book management"""
         button_frame = tk.Frame(self)
@@ -58,34 +101,50 @@ class BookView(tk.Frame):
             ("Add Book", self.add_book),
             ("Edit Book", self.edit_book),
             ("Delete Book", self.delete_book),
-            ("Refresh", self.load_books)
+            ("Refresh", self.refresh_books)
         ]
         
         for label, command in buttons:
             tk.Button(button_frame, text=label, command=command).pack(side=tk.LEFT, padx=5)
     
-    def load_books(self):
-        """Load books from database"""
-        # Clear existing items
-        for item in self.book_table.get_children():
-            self.book_table.delete(item)
+    def book_row(self, book):
+        """
+        Convert a book document into table values
         
-        # Fetch books
-        books = self.db_connection.books.find({})
+        Args:
+            book (dict): Book document
         
-        for book in books:
-            # Convert categories to strings if they are ObjectId
-            categories = book.get('categories', [])
-            categories_str = ', '.join(str(cat) for cat in categories) if categories else ''
-            
-            self.book_table.insert('', 'end', values=(
-                book.get('title', ''),
-                book.get('author', ''),
-                book.get('isbn', ''),
-                book.get('publishedYear', ''),
-                book.get('price', ''),
-                categories_str
-            ))
+        Returns:
+            tuple: Row values
+        """
+        # Convert categories to strings if they are ObjectId
+        categories = book.get('categories', [])
+        categories_str = ', '.join(str(cat) for cat in categories) if categories else ''
+        
+        # Average stars and number of ratings, empty for unrated books
+        rating_count = book.get('ratingCount') or 0
+        rating_str = f"{book.get('ratingAvg', 0):.1f} ({rating_count})" if rating_count else ''
+        
+        return (
+            book.get('title', ''),
+            book.get('author', ''),
+            book.get('isbn', ''),
+            book.get('publishedYear', ''),
+            book.get('price', ''),
+            categories_str,
+            rating_str
+        )
+    
+    def load_books(self):
+        """Load the first page of books from database"""
+        self.paged_table.reload()
+    
+    def refresh_books(self):
+        """Re-read the displayed books and update only the rows that changed"""
+        if self.paged_table.paging:
+            self.paged_table.refresh()
+        else:
+            self.search_books()
     
     def search_books(self):
         """Search books based on user input"""
@@ -95,35 +154,15 @@ class BookView(tk.Frame):
             self.load_books()
             return
         
-        # Perform search
-        query = {
-            '$or': [
-                {'title': {'$regex': search_term, '$options': 'i'}},
-                {'author': {'$regex': search_term, '$options': 'i'}},
-                {'isbn': {'$regex': search_term, '$options': 'i'}}
-            ]
-        }
-        
-        # Clear existing items
-        for item in self.book_table.get_children():
-            self.book_table.delete(item)
-        
-        # Fetch and display results
-        books = self.controller.search_books(query)
-        
-        for book in books:
-            # Convert categories to strings if they are ObjectId
-            categories = book.get('categories', [])
-            categories_str = ', '.join(str(cat) for cat in categories) if categories else ''
-            
-            self.book_table.insert('', 'end', values=(
-                book.get('title', ''),
-                book.get('author', ''),
-                book.get('isbn', ''),
-                book.get('publishedYear', ''),
-                book.get('price', ''),
-                categories_str
-            ))
+        # Fetch and display results (ranked by the catalog search index);
+        # shares the table key so a pending page load is superseded
+        self.executor.submit(
+            self.paged_table.key, 
+            self.controller.search_books, 
+            search_term, 
+            on_success=self.paged_table.show_rows, 
+            on_error=self.show_error
+        )
     
     def add_book(self):
         """Open dialog to add a new book"""
@@ -157,14 +196,21 @@ class BookView(tk.Frame):
             book_data['price'] = float(book_data['price'])
             book_data['categories'] = book_data['categories'].split(',') if book_data['categories'] else []
             
-            result = self.controller.add_book(book_data)
+            def done(result):
+                if result['success']:
+                    messagebox.showinfo("Success", result['message'])
+                    add_window.destroy()
+                    self.refresh_books()
+                else:
+                    messagebox.showerror("Error", result['message'])
             
-            if result['success']:
-                messagebox.showinfo("Success", result['message'])
-                add_window.destroy()
-                self.load_books()
-            else:
-                messagebox.showerror("Error", result['message'])
+            self.executor.submit(
+                f"books:add:{id(add_window)}", 
+                self.controller.add_book, 
+                book_data, 
+                on_success=done, 
+                on_error=self.show_error
+            )
         
         tk.Button(add_window, text="Submit", command=submit).grid(row=len(fields), column=0, columnspan=2, pady=10)
     
@@ -228,17 +274,27 @@ class BookView(tk.Frame):
                 book_data['price'] = float(book_data['price'])
                 book_data['categories'] = book_data['categories'].split(',') if book_data['categories'] else []
                 
-                # Original ISBN for identifying the book to update
-                original_isbn = book_details[2]
+                # The row iid is the book's _id: identifies the book even
+                # without a (unique) ISBN
+                book_id = selected_item[0]
                 
-                result = self.controller.edit_book(original_isbn, book_data)
+                def done(result):
+                    if result['success']:
+                        messagebox.showinfo("Success", result['message'])
+                        edit_window.destroy()
+                        self.refresh_books()
+                    else:
+                        messagebox.showerror("Error", result['message'])
                 
-                if result['success']:
-                    messagebox.showinfo("Success", result['message'])
-                    edit_window.destroy()
-                    self.load_books()
-                else:
-                    messagebox.showerror("Error", result['message'])
+                self.executor.submit(
+                    f"books:edit:{id(edit_window)}", 
+                    self.controller.edit_book, 
+                    None, 
+                    book_data, 
+                    book_id=book_id, 
+                    on_success=done, 
+                    on_error=self.show_error
+                )
             
             except ValueError as e:
                 messagebox.showerror("Input Error", f"Invalid input: {str(e)}")
@@ -254,25 +310,26 @@ class BookView(tk.Frame):
             return
 
         # Get the book details from the selected row
-        book_details = self.book_table.item(selected_item[0])['values']
-
-        # Print out the exact book details for debugging
-        print("Book details to delete:", book_details)
+        book_id = selected_item[0]
+        book_details = self.book_table.item(book_id)['values']
 
         # Confirm deletion
         confirm = messagebox.askyesno("Confirm Deletion", 
             f"Are you sure you want to delete the book:\n\nTitle: {book_details[0]}\nAuthor: {book_details[1]}\nISBN: {book_details[2]}")
 
         if confirm:
-            try:
-                # Find the book in the database using the ISBN (assuming it's the third column)
-                result = self.controller.delete_book(book_details[2])
-
+            def done(result):
                 if result['success']:
                     messagebox.showinfo("Success", result['message'])
-                    self.load_books()  # Refresh the book table
+                    self.refresh_books()  # Refresh the book table
                 else:
                     messagebox.showerror("Error", result['message'])
 
-            except Exception as e:
-                messagebox.showerror("Error", f"An error occurred: {str(e)}")
\ No newline at end of file
+            # The row iid is the book's _id
+            self.executor.submit(
+                f"books:delete:{book_id}", 
+                self.controller.delete_book, 
+                book_id=book_id, 
+                on_success=done, 
+                on_error=lambda e: messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            )
\ No newline at end of file
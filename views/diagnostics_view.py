@@ -0,0 +1,119 @@
+# digital_library/views/diagnostics_view.py
+import tkinter as tk
+from tkinter import ttk
+from views.table_sync import TableSynchronizer
+
+class DiagnosticsWindow(tk.Toplevel):
+    """
+    Live view of the query instrumentation
+
+    Lists the MongoDB commands per caller with their latency and the
+    documents and bytes returned, and the most recent slow commands. The
+    statistics are read from memory every REFRESH_MS, so the window
+    does not query the database itself; only the rows that changed are
+    updated in the tables.
+    """
+
+    REFRESH_MS = 1000
+
+    STAT_COLUMNS = ('Caller', 'Command', 'Collection', 'Count', 'Avg ms', 'p95 ms',
+                    'Max ms', 'Docs', 'KB', 'Errors')
+    SLOW_COLUMNS = ('Time', 'Duration ms', 'Command', 'Collection', 'Caller', 'Detail')
+
+    def __init__(self, parent, instrumentation):
+        """
+        Args:
+            parent (tk.Misc): Parent window
+            instrumentation (QueryInstrumentation): Recorded statistics
+        """
+        super().__init__(parent)
+        self.instrumentation = instrumentation
+        self.title("Diagnostics")
+        self.geometry("1000x600")
+
+        panes = ttk.PanedWindow(self, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.stats_table = self.create_table(panes, self.STAT_COLUMNS, widths={'Caller': 260, 'Command': 90})
+        self.slow_table = self.create_table(panes, self.SLOW_COLUMNS, widths={'Detail': 360, 'Caller': 220})
+        self.stats_sync = TableSynchronizer(self.stats_table)
+        self.slow_sync = TableSynchronizer(self.slow_table)
+
+        button_frame = tk.Frame(self)
+        button_frame.pack(pady=5)
+        self.summary_var = tk.StringVar()
+        tk.Label(button_frame, textvariable=self.summary_var).pack(side=tk.LEFT, padx=10)
+        tk.Button(button_frame, text="Reset", command=self.reset).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Close", command=self.destroy).pack(side=tk.LEFT, padx=5)
+
+        self.refresh()
+
+    def create_table(self, panes, columns, widths):
+        """Create a Treeview in a pane of the window"""
+        frame = tk.Frame(panes)
+        table = ttk.Treeview(frame, columns=columns, show='headings')
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+        for column in columns:
+            table.heading(column, text=column)
+            table.column(column, width=widths.get(column, 80))
+        table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        panes.add(frame, weight=1)
+        return table
+
+    def refresh(self):
+        """Redraw the window every REFRESH_MS while it is open"""
+        if self.winfo_exists():
+            self.redraw()
+            self.after(self.REFRESH_MS, self.refresh)
+
+    def redraw(self):
+        """Synchronize both tables with the current statistics"""
+        stats = self.instrumentation.snapshot()
+        # Rows are keyed by (caller, command, collection) and compared by value
+        self.stats_sync.sync([
+            (
+                '\x1f'.join(str(part) for part in (entry['caller'], entry['command'], entry['collection'])),
+                (
+                    entry['caller'],
+                    entry['command'],
+                    entry['collection'],
+                    entry['count'],
+                    f"{entry['avg_ms']:.1f}",
+                    f"{entry['p95_ms']:.0f}",
+                    f"{entry['max_ms']:.1f}",
+                    entry['documents'],
+                    f"{entry['bytes'] / 1024:.1f}" if entry['bytes'] is not None else '',
+                    entry['failures']
+                ),
+                None
+            )
+            for entry in stats
+        ])
+
+        # Slow commands never change once logged
+        self.slow_sync.sync([
+            (
+                str(entry['id']),
+                (
+                    f"{entry['time']:%H:%M:%S}",
+                    f"{entry['duration_ms']:.1f}",
+                    entry['command'],
+                    entry['collection'],
+                    entry['caller'],
+                    entry['detail']
+                ),
+                entry['id']
+            )
+            for entry in self.instrumentation.recent_slow_queries()
+        ])
+
+        commands = sum(entry['count'] for entry in stats)
+        total_ms = sum(entry['avg_ms'] * entry['count'] for entry in stats)
+        self.summary_var.set(f"{commands} commands, {total_ms / 1000:.2f}s in the database, "
+                             f"slow from {self.instrumentation.slow_ms:.0f} ms")
+
+    def reset(self):
+        """Clear the recorded statistics"""
+        self.instrumentation.reset()
+        self.redraw()
@@ -1,23 +1,38 @@
 # digital_library/views/main_window.py
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
 from views.book_view import BookView
 from views.user_view import UserView
 from views.order_view import OrderView
 from views.review_view import ReviewView
+from views.diagnostics_view import DiagnosticsWindow
+from controllers.executor import QueryExecutor
 import datetime  # Add this import
 
 class DigitalLibraryApp:
-    def __init__(self, root, db_connection):
+    # Delay before building the remaining tabs in the background
+    PREFETCH_DELAY_MS = 300
+    
+    def __init__(self, root, db_connection, prefetch_tabs=None, profiler=None):
         """
         Main application window for Digital Library
         
         Args:
             root (tk.Tk): Root Tkinter window
             db_connection (DatabaseConnection): Database connection
+            prefetch_tabs (bool, optional): Build the other tabs in the
+                background after the first one is shown; defaults to the
+                PREFETCH_TABS environment variable (on)
+            profiler (UIProfiler, optional): Measure event-loop lag and the
+                time of every tab action
         """
         self.root = root
         self.db_connection = db_connection
+        if prefetch_tabs is None:
+            prefetch_tabs = os.getenv('PREFETCH_TABS', '1') not in ('0', 'false', 'no')
+        self.prefetch_tabs = prefetch_tabs
+        self.profiler = profiler
         
         # Configure root window
         self.root.title("Digital Library Management System")
@@ -31,14 +46,40 @@ class DigitalLibraryApp:
         self.notebook = ttk.Notebook(self.main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
+        # Status bar with busy indicator
+        self.create_status_bar()
+        
+        # Database work runs off the Tk thread (keep MONGO_MAX_POOL_SIZE >= workers)
+        self.executor = QueryExecutor(
+            self.root, 
+            max_workers=int(os.getenv('QUERY_WORKERS', 4)), 
+            busy_callback=self.set_busy, 
+            profiler=profiler
+        )
+        if profiler:
+            profiler.start()
+        
         # Create views
         self.create_views()
         
         # Create menu bar
         self.create_menu()
+        
+        # Stop the background queries before the widgets are destroyed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    def on_close(self):
+        """Shut down the query executor, then close the window"""
+        self.executor.shutdown()
+        self.root.destroy()
     
     def create_views(self):
-        """Create individual views for the notebook"""
+        """
+        Create the notebook tabs
+        
+        Each tab starts as an empty container; its view (and the view's
+        initial query) is only built when the tab is first selected.
+        """
         views = [
             ("Books", BookView),
             ("Users", UserView),
@@ -46,9 +87,89 @@ class DigitalLibraryApp:
             ("Reviews", ReviewView)
         ]
         
+        self.views = {}
+        self.view_classes = {}
+        
         for title, ViewClass in views:
-            view = ViewClass(self.notebook, self.db_connection)
-            self.notebook.add(view, text=title)
+            container = tk.Frame(self.notebook)
+            self.notebook.add(container, text=title)
+            self.view_classes[str(container)] = (ViewClass, container)
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        
+        # Build the initially selected tab once the window is mapped
+        self.root.after_idle(self.show_first_tab)
+    
+    def show_first_tab(self):
+        """Build the selected tab, then schedule prefetching of the others"""
+        self.build_view(self.notebook.select())
+        
+        if self.prefetch_tabs:
+            self.root.after(self.PREFETCH_DELAY_MS, self.prefetch_views)
+    
+    def on_tab_changed(self, event):
+        """Build the selected tab on first selection"""
+        self.build_view(self.notebook.select())
+    
+    def build_view(self, tab_id):
+        """
+        Build the view of a tab if it does not exist yet
+        
+        Args:
+            tab_id (str): Notebook tab identifier (container widget path)
+        
+        Returns:
+            tk.Frame: The view of the tab
+        """
+        tab_id = str(tab_id)
+        if tab_id in self.views or tab_id not in self.view_classes:
+            return self.views.get(tab_id)
+        
+        ViewClass, container = self.view_classes[tab_id]
+        if self.profiler:
+            key = f"build:{ViewClass.__name__}"
+            view, ui_ms = self.profiler.measure(key, 'ui', ViewClass, container, self.db_connection, self.executor)
+            self.profiler.record_action(key, None, ui_ms)
+        else:
+            view = ViewClass(container, self.db_connection, self.executor)
+        view.pack(fill=tk.BOTH, expand=True)
+        self.views[tab_id] = view
+        return view
+    
+    def prefetch_views(self):
+        """Build the remaining tabs one per idle cycle"""
+        for tab_id in self.view_classes:
+            if tab_id not in self.views:
+                self.build_view(tab_id)
+                self.root.after_idle(self.prefetch_views)
+                return
+    
+    def create_status_bar(self):
+        """Create status bar with an indeterminate progress bar"""
+        status_frame = tk.Frame(self.main_frame)
+        status_frame.pack(fill=tk.X, side=tk.BOTTOM)
+        
+        self.status_var = tk.StringVar(value="Ready")
+        tk.Label(status_frame, textvariable=self.status_var, anchor='w').pack(side=tk.LEFT, padx=5)
+        
+        self.progress = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+        self.progress.pack(side=tk.RIGHT, padx=5, pady=2)
+    
+    def set_busy(self, busy):
+        """
+        Show or hide the busy indicator
+        
+        Args:
+            busy (bool): Whether database work is pending
+        """
+        if busy:
+            self.status_var.set("Loading...")
+            self.progress.start(10)
+            self.root.config(cursor='watch')
+        else:
+            self.status_var.set("Ready")
+            self.progress.stop()
+            self.root.config(cursor='')
     
     def create_menu(self):
         """Create application menu bar"""
@@ -60,11 +181,29 @@ class DigitalLibraryApp:
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Exit", command=self.root.quit)
         
+        # Tools menu
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Diagnostics", command=self.show_diagnostics)
+        
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="About", command=self.show_about)
     
+    def show_diagnostics(self):
+        """Open the query diagnostics window (one at a time)"""
+        instrumentation = self.db_connection.instrumentation
+        if instrumentation is None:
+            messagebox.showinfo("Diagnostics", "Query instrumentation is disabled (set MONGO_INSTRUMENTATION=1)")
+            return
+        
+        window = getattr(self, 'diagnostics_window', None)
+        if window is not None and window.winfo_exists():
+            window.lift()
+            return
+        self.diagnostics_window = DiagnosticsWindow(self.root, instrumentation)
+    
     def show_about(self):
         """Display about dialog"""
         messagebox.showinfo(
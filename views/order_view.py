@@ -2,24 +2,36 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from controllers.controller import LibraryController
+from controllers.executor import QueryExecutor
+from views.paged_table import PagedTable
+from views.table_sync import schedule_auto_refresh
 
 class OrderView(tk.Frame):
-    def __init__(self, parent, db_connection):
+    def __init__(self, parent, db_connection, executor=None):
         """
         Order view for managing and tracking orders
         
         Args:
             parent (tk.Notebook): Parent notebook
             db_connection (DatabaseConnection): Database connection
+            executor (QueryExecutor, optional): Background query executor
         """
         super().__init__(parent)
         self.db_connection = db_connection
         self.controller = LibraryController(db_connection)
+        self.executor = executor or QueryExecutor(self)
         
         # Layout
         self.create_search_section()
         self.create_order_table()
         self.create_action_buttons()
+        
+        # Optional polling for changes made elsewhere (AUTO_REFRESH_MS)
+        schedule_auto_refresh(self, self.refresh_orders)
+    
+    def show_error(self, error):
+        """Display an error raised by a background query"""
+        messagebox.showerror("Error", str(error))
     
     def create_search_section(self):
         """Create search input and section for finding orders"""
@@ -36,15 +48,19 @@ class OrderView(tk.Frame):
         search_button.pack(side=tk.LEFT)
     
     def create_order_table(self):
-        """Create treeview to display orders"""
+        """Create paged treeview to display orders"""
         columns = ('Order ID', 'User', 'Total Books', 'Total Price', 'Order Date')
-        self.order_table = ttk.Treeview(self, columns=columns, show='headings')
-        
-        for col in columns:
-            self.order_table.heading(col, text=col)
-            self.order_table.column(col, width=150)
-        
-        self.order_table.pack(expand=True, fill='both', padx=10, pady=10)
+        self.paged_table = PagedTable(
+            self, 
+            columns, 
+            fetch_page=self.controller.get_orders_page, 
+            row_values=self.order_row, 
+            column_width=150, 
+            executor=self.executor, 
+            key='orders:list'
+        )
+        self.paged_table.pack(expand=True, fill='both', padx=10, pady=10)
+        self.order_table = self.paged_table.tree
         
         # Load initial orders
         self.load_orders()
@@ -57,40 +73,40 @@ class OrderView(tk.Frame):
         buttons = [
             ("Create Order", self.create_order),
             ("View Details", self.view_order_details),
-            ("Refresh", self.load_orders)
+            ("Refresh", self.refresh_orders)
         ]
         
         for label, command in buttons:
             tk.Button(button_frame, text=label, command=command).pack(side=tk.LEFT, padx=5)
     
+    def order_row(self, order):
+        """
+        Convert an order summary into table values
+        
+        Args:
+            order (dict): Order summary document
+        
+        Returns:
+            tuple: Row values
+        """
+        return (
+            str(order.get('_id', '')),
+            order.get('username', 'Unknown'),
+            order.get('book_count', 0),
+            f"€{order.get('total_price', 0):.2f}",
+            order.get('order_date', 'N/A')
+        )
+    
     def load_orders(self):
-        """Load orders from database"""
-        # Clear existing items
-        for item in self.order_table.get_children():
-            self.order_table.delete(item)
-        
-        # Fetch orders with user details
-        orders = list(self.db_connection.orders.aggregate([
-            {
-                '$lookup': {
-                    'from': 'users',
-                    'localField': 'user_id',
-                    'foreignField': '_id',
-                    'as': 'user_details'
-                }
-            }
-        ]))
-        
-        for order in orders:
-            user = order['user_details'][0] if order['user_details'] else {'username': 'Unknown'}
-            
-            self.order_table.insert('', 'end', values=(
-                str(order.get('_id', '')),
-                user.get('username', 'Unknown'),
-                len(order.get('book_ids', [])),
-                f"€{order.get('total_price', 0):.2f}",
-                order.get('order_date', 'N/A')
-            ))
+        """Load the first page of orders from database"""
+        self.paged_table.reload()
+    
+    def refresh_orders(self):
+        """Re-read the displayed orders and update only the rows that changed"""
+        if self.paged_table.paging:
+            self.paged_table.refresh()
+        else:
+            self.search_orders()
     
     def search_orders(self):
         """Search orders based on user input"""
@@ -100,40 +116,14 @@ class OrderView(tk.Frame):
             self.load_orders()
             return
         
-        # Clear existing items
-        for item in self.order_table.get_children():
-            self.order_table.delete(item)
-        
-        # Perform search
-        orders = list(self.db_connection.orders.aggregate([
-            {
-                '$lookup': {
-                    'from': 'users',
-                    'localField': 'user_id',
-                    'foreignField': '_id',
-                    'as': 'user_details'
-                }
-            },
-            {
-                '$match': {
-                    '$or': [
-                        {'user_details.username': {'$regex': search_term, '$options': 'i'}},
-                        {'_id': str(search_term)}
-                    ]
-                }
-            }
-        ]))
-        
-        for order in orders:
-            user = order['user_details'][0] if order['user_details'] else {'username': 'Unknown'}
-            
-            self.order_table.insert('', 'end', values=(
-                str(order.get('_id', '')),
-                user.get('username', 'Unknown'),
-                len(order.get('book_ids', [])),
-                f"€{order.get('total_price', 0):.2f}",
-                order.get('order_date', 'N/A')
-            ))
+        # Perform search; shares the table key so a pending page load is superseded
+        self.executor.submit(
+            self.paged_table.key, 
+            self.controller.list_orders, 
+            search_term, 
+            on_success=self.paged_table.show_rows, 
+            on_error=self.show_error
+        )
     
     def create_order(self):
         """Create a new order"""
@@ -143,23 +133,33 @@ class OrderView(tk.Frame):
         
         # User selection
         tk.Label(create_order_window, text="Select User:").pack()
-        users = list(self.db_connection.users.find())
         user_var = tk.StringVar()
-        user_dropdown = ttk.Combobox(
-            create_order_window, 
-            textvariable=user_var, 
-            values=[user['username'] for user in users]
-        )
+        user_dropdown = ttk.Combobox(create_order_window, textvariable=user_var)
         user_dropdown.pack()
         
         # Book selection (multi-select)
         tk.Label(create_order_window, text="Select Books:").pack()
-        books = list(self.db_connection.books.find())
+        books = []
         book_listbox = tk.Listbox(create_order_window, selectmode=tk.MULTIPLE)
-        for book in books:
-            book_listbox.insert(tk.END, f"{book['title']} - {book['author']}")
         book_listbox.pack()
         
+        def fetch_choices():
+            return self.controller.get_user_choices(), self.controller.get_book_choices()
+        
+        def show_choices(choices):
+            users, fetched_books = choices
+            user_dropdown['values'] = [user['username'] for user in users]
+            books.extend(fetched_books)
+            for book in fetched_books:
+                book_listbox.insert(tk.END, f"{book['title']} - {book['author']}")
+        
+        self.executor.submit(
+            f"orders:choices:{id(create_order_window)}", 
+            fetch_choices, 
+            on_success=show_choices, 
+            on_error=self.show_error
+        )
+        
         def submit_order():
             selected_username = user_var.get()
             selected_book_indices = book_listbox.curselection()
@@ -168,21 +168,30 @@ class OrderView(tk.Frame):
                 messagebox.showwarning("Warning", "Please select a user and books")
                 return
             
-            # Find user ID
-            user = self.db_connection.users.find_one({'username': selected_username})
-            
             # Get selected book IDs
             selected_books = [str(books[i]['_id']) for i in selected_book_indices]
             
-            # Create order
-            result = self.controller.create_order(str(user['_id']), selected_books)
+            def place_order():
+                # Find user ID
+                user = self.db_connection.users.find_one({'username': selected_username}, {'_id': 1})
+                
+                # Create order
+                return self.controller.create_order(str(user['_id']), selected_books)
+            
+            def done(result):
+                if result['success']:
+                    messagebox.showinfo("Success", f"Order created. Total price: {result['total_price']}")
+                    create_order_window.destroy()
+                    self.load_orders()
+                else:
+                    messagebox.showerror("Error", result['message'])
             
-            if result['success']:
-                messagebox.showinfo("Success", f"Order created. Total price: {result['total_price']}")
-                create_order_window.destroy()
-                self.load_orders()
-            else:
-                messagebox.showerror("Error", result['message'])
+            self.executor.submit(
+                f"orders:create:{id(create_order_window)}", 
+                place_order, 
+                on_success=done, 
+                on_error=self.show_error
+            )
         
         tk.Button(create_order_window, text="Create Order", command=submit_order).pack(pady=10)
     
@@ -197,30 +206,35 @@ class OrderView(tk.Frame):
         # Get order details
         order_id = self.order_table.item(selected_item)['values'][0]
         
-        details_window = tk.Toplevel(self)
-        details_window.title(f"Order Details - {order_id}")
-        details_window.geometry("600x400")
-        
-        # Fetch order and book details
-        order = self.db_connection.orders.find_one({'_id': order_id})
-        
-        if not order:
-            messagebox.showerror("Error", "Order not found")
-            details_window.destroy()
-            return
-        
-        details_text = tk.Text(details_window)
-        details_text.pack(expand=True, fill='both', padx=10, pady=10)
-        
-        # Add order and book details to text widget
-        details_text.insert(tk.END, f"Order ID: {order_id}\n")
-        details_text.insert(tk.END, f"Total Price: €{order.get('total_price', 0):.2f}\n")
-        details_text.insert(tk.END, f"Order Date: {order.get('order_date', 'N/A')}\n\n")
-        
-        details_text.insert(tk.END, "Books in this Order:\n")
-        for book_id in order.get('book_ids', []):
-            book = self.db_connection.books.find_one({'_id': book_id})
-            if book:
+        def show_details(details):
+            order, books = details['order'], details['books']
+            
+            if not order:
+                messagebox.showerror("Error", "Order not found")
+                return
+            
+            details_window = tk.Toplevel(self)
+            details_window.title(f"Order Details - {order_id}")
+            details_window.geometry("600x400")
+            
+            details_text = tk.Text(details_window)
+            details_text.pack(expand=True, fill='both', padx=10, pady=10)
+            
+            # Add order and book details to text widget
+            details_text.insert(tk.END, f"Order ID: {order_id}\n")
+            details_text.insert(tk.END, f"Total Price: €{order.get('total_price', 0):.2f}\n")
+            details_text.insert(tk.END, f"Order Date: {order.get('order_date', 'N/A')}\n\n")
+            
+            details_text.insert(tk.END, "Books in this Order:\n")
+            for book in books:
                 details_text.insert(tk.END, f"- {book['title']} by {book['author']} (€{book['price']})\n")
-        
-        details_text.config(state=tk.DISABLED)
\ No newline at end of file
+            
+            details_text.config(state=tk.DISABLED)
+        
+        self.executor.submit(
+            'orders:details', 
+            self.controller.get_order_details, 
+            order_id, 
+            on_success=show_details, 
+            on_error=self.show_error
+        )
@@ -0,0 +1,251 @@
+# digital_library/views/paged_table.py
+import tkinter as tk
+from tkinter import ttk
+from collections import deque
+from views.table_sync import TableSynchronizer, document_version
+
+class PagedTable(tk.Frame):
+    def __init__(self, parent, columns, fetch_page, row_values,
+                 page_size=100, max_pages=3, column_width=100,
+                 executor=None, key=None):
+        """
+        Treeview that materializes a sliding window of keyset pages
+
+        Only max_pages pages are kept in the widget. Scrolling near the
+        bottom fetches the page after the last row and drops the first page;
+        scrolling near the top does the opposite, so memory and the number
+        of Tk items stay constant whatever the collection size.
+
+        Args:
+            parent (tk.Widget): Parent widget
+            columns (tuple): Column headings
+            fetch_page (callable): fetch_page(after=None, before=None, page_size=n,
+                ids=None, fresh=False) returning a dict with 'items', 'first',
+                'last', 'has_more'; ids restricts the page to these _ids and
+                fresh=True bypasses any cache (used by refresh)
+            row_values (callable): Converts a document into a tuple of values
+            page_size (int): Rows per page
+            max_pages (int): Maximum number of pages kept in the widget
+            column_width (int): Initial column width
+            executor (QueryExecutor, optional): Runs fetch_page off the Tk
+                thread; pages are fetched synchronously without one
+            key (str, optional): Executor request key of the table
+        """
+        super().__init__(parent)
+        self.fetch_page = fetch_page
+        self.row_values = row_values
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.executor = executor
+        self.key = key or f"table-{id(self)}"
+
+        self.tree = ttk.Treeview(self, columns=columns, show='headings')
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_width)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+        # Tracks row versions so refreshes only touch changed rows
+        self.sync = TableSynchronizer(self.tree)
+
+        self.tree.pack(side=tk.LEFT, expand=True, fill='both')
+        self.scrollbar.pack(side=tk.RIGHT, fill='y')
+
+        # Loaded pages: dicts with 'items', 'first' and 'last' cursors
+        self.pages = deque()
+        self.has_before = False
+        self.has_after = False
+        self.paging = True
+        self.loading = False
+        self.scheduled = False
+
+    def clear(self):
+        """Remove every row from the table"""
+        self.tree.delete(*self.tree.get_children())
+        self.sync.forget()
+        self.pages.clear()
+        self.has_before = False
+        self.has_after = False
+
+    def reload(self):
+        """Reset the table to the first page"""
+        self.clear()
+        self.paging = True
+        # A pending page load is superseded by this one
+        self.loading = False
+        self._load_page(append=True)
+
+    def show_rows(self, documents):
+        """
+        Display a fixed list of documents without paging (e.g. search results)
+
+        Rows already displayed are kept, so showing the same results again
+        costs no Tk call.
+
+        Args:
+            documents (list): Documents to display
+        """
+        self.pages.clear()
+        self.has_before = False
+        self.has_after = False
+        self.paging = False
+        self.loading = False
+        self.sync.sync([self._row(document) for document in documents])
+
+    def refresh(self):
+        """
+        Re-read the rows of the current window and apply the differences
+
+        New rows after the window are picked up when the window is at the
+        end of the collection.
+        """
+        if not self.paging or not self.pages:
+            self.reload()
+            return
+
+        ids = [iid for page in self.pages for iid in page['items']]
+        tail_after = None if self.has_after else self.pages[-1]['last']
+
+        # Read from the database: changes made elsewhere are not in any cache
+        def fetch():
+            window = self.fetch_page(ids=ids, page_size=len(ids), fresh=True)
+            tail = self.fetch_page(after=tail_after, page_size=self.page_size, fresh=True) if tail_after else None
+            return window, tail
+
+        self.loading = True
+        if self.executor is None:
+            try:
+                self._apply_refresh(fetch())
+            finally:
+                self.loading = False
+            return
+
+        self.executor.submit(self.key, fetch, on_success=self._apply_refresh, on_error=self._load_failed)
+
+    def _apply_refresh(self, result):
+        """Synchronize the window with re-read rows"""
+        self.loading = False
+        window, tail = result
+        documents = list(window['items']) + (list(tail['items']) if tail else [])
+
+        if not documents:
+            self.reload()
+            return
+
+        self.sync.sync([self._row(document) for document in documents])
+        self.pages = deque([{
+            'items': [str(document['_id']) for document in documents],
+            'first': window['first'] or tail['first'],
+            'last': tail['last'] if tail and tail['items'] else window['last']
+        }])
+        if tail:
+            self.has_after = tail['has_more']
+
+    def _row(self, document):
+        """Build the (iid, values, version) row of a document"""
+        return str(document['_id']), self.row_values(document), document_version(document)
+
+    def _insert(self, document, index):
+        """Insert a document, using its _id as item identifier"""
+        iid, values, version = self._row(document)
+        if iid not in self.sync.versions:
+            self.tree.insert('', index, iid=iid, values=values)
+            self.sync.versions[iid] = version
+        return iid
+
+    def _load_page(self, append):
+        """Fetch the page after the window (append) or before it (prepend)"""
+        if self.loading:
+            return
+        self.loading = True
+
+        if append:
+            cursor = {'after': self.pages[-1]['last'] if self.pages else None}
+        else:
+            cursor = {'before': self.pages[0]['first']}
+
+        if self.executor is None:
+            try:
+                self._apply_page(append, self.fetch_page(page_size=self.page_size, **cursor))
+            finally:
+                self.loading = False
+            return
+
+        self.executor.submit(
+            self.key,
+            self.fetch_page,
+            page_size=self.page_size,
+            on_success=lambda page: self._apply_page(append, page),
+            on_error=self._load_failed,
+            **cursor
+        )
+
+    def _load_failed(self, error):
+        """Report a failed page load"""
+        self.loading = False
+        print(f"Error loading page: {error}")
+
+    def _apply_page(self, append, page):
+        """Insert a fetched page into the window"""
+        self.loading = False
+
+        if append:
+            self.has_after = page['has_more']
+        else:
+            self.has_before = page['has_more']
+
+        if not page['items']:
+            return
+
+        if append:
+            items = [self._insert(document, 'end') for document in page['items']]
+            self.pages.append({'items': items, 'first': page['first'], 'last': page['last']})
+        else:
+            items = [self._insert(document, i) for i, document in enumerate(page['items'])]
+            self.pages.appendleft({'items': items, 'first': page['first'], 'last': page['last']})
+
+        self._trim(append)
+
+    def _trim(self, appended):
+        """Drop pages on the opposite side of the window"""
+        if len(self.pages) <= self.max_pages:
+            return
+
+        while len(self.pages) > self.max_pages:
+            if appended:
+                dropped = self.pages.popleft()
+                self.has_before = True
+            else:
+                dropped = self.pages.pop()
+                self.has_after = True
+            self.tree.delete(*dropped['items'])
+            self.sync.forget(dropped['items'])
+
+        # Keep the rows the user was looking at in view
+        if len(self.pages) > 1:
+            anchor = self.pages[-2]['items'][-1] if appended else self.pages[1]['items'][0]
+            self.tree.see(anchor)
+
+    def _on_scroll(self, first, last):
+        """Update the scrollbar and fetch pages when reaching an edge"""
+        self.scrollbar.set(first, last)
+
+        if not self.paging or self.loading or self.scheduled:
+            return
+
+        first, last = float(first), float(last)
+        if last >= 0.9 and self.has_after:
+            self._schedule(True)
+        elif first <= 0.1 and self.has_before:
+            self._schedule(False)
+
+    def _schedule(self, append):
+        """Load a page once Tk is idle, at most one pending load at a time"""
+        def run():
+            self.scheduled = False
+            self._load_page(append)
+
+        self.scheduled = True
+        self.after_idle(run)
@@ -2,24 +2,35 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from controllers.controller import LibraryController
+from controllers.executor import QueryExecutor
+from views.table_sync import TableSynchronizer, schedule_auto_refresh
 
 class ReviewView(tk.Frame):
-    def __init__(self, parent, db_connection):
+    def __init__(self, parent, db_connection, executor=None):
         """
         Review view for managing book reviews
         
         Args:
             parent (tk.Notebook): Parent notebook
             db_connection (DatabaseConnection): Database connection
+            executor (QueryExecutor, optional): Background query executor
         """
         super().__init__(parent)
         self.db_connection = db_connection
         self.controller = LibraryController(db_connection)
+        self.executor = executor or QueryExecutor(self)
         
         # Layout
         self.create_search_section()
         self.create_review_table()
         self.create_action_buttons()
+        
+        # Optional polling for changes made elsewhere (AUTO_REFRESH_MS)
+        schedule_auto_refresh(self, self.search_reviews)
+    
+    def show_error(self, error):
+        """Display an error raised by a background query"""
+        messagebox.showerror("Error", str(error))
     
     def create_search_section(self):
         """Create search input and section for finding reviews"""
@@ -45,6 +56,7 @@ class ReviewView(tk.Frame):
             self.review_table.column(col, width=150)
         
         self.review_table.pack(expand=True, fill='both', padx=10, pady=10)
+        self.table_sync = TableSynchronizer(self.review_table)
         
         # Load initial reviews
         self.load_reviews()
@@ -64,43 +76,67 @@ class ReviewView(tk.Frame):
         for label, command in buttons:
             tk.Button(button_frame, text=label, command=command).pack(side=tk.LEFT, padx=5)
     
-    def load_reviews(self):
-        """Load reviews from database"""
-        # Clear existing items
-        for item in self.review_table.get_children():
-            self.review_table.delete(item)
+    def review_row(self, review):
+        """
+        Convert a review with resolved book title and username into a table row
         
-        # Fetch reviews with book and user details
-        reviews = list(self.db_connection.reviews.aggregate([
-            {
-                '$lookup': {
-                    'from': 'books',
-                    'localField': 'book_id',
-                    'foreignField': '_id',
-                    'as': 'book_details'
-                }
-            },
-            {
-                '$lookup': {
-                    'from': 'users',
-                    'localField': 'user_id',
-                    'foreignField': '_id',
-                    'as': 'user_details'
-                }
-            }
-        ]))
-        
-        for review in reviews:
-            book = review['book_details'][0] if review['book_details'] else {'title': 'Unknown Book'}
-            user = review['user_details'][0] if review['user_details'] else {'username': 'Unknown User'}
-            
-            self.review_table.insert('', 'end', values=(
-                book.get('title', 'Unknown'),
-                user.get('username', 'Unknown'),
+        Args:
+            review (dict): Review document
+        
+        Returns:
+            tuple: (iid, values, version) table row
+        """
+        return (
+            str(review['_id']),
+            (
+                review.get('book_title', 'Unknown'),
+                review.get('username', 'Unknown'),
                 review.get('rating', 'N/A'),
                 review.get('review_text', ''),
                 review.get('review_date', 'N/A')
-            ))
+            ),
+            None  # joined title and username are not versioned, compare values
+        )
+    
+    def fetch_review_rows(self, search_term):
+        """
+        Search reviews and build table rows (runs on a worker thread)
+        
+        Args:
+            search_term (str): Book title, username or review text to search for
+        
+        Returns:
+            List of (iid, values, version) table rows
+        """
+        return [self.review_row(review) for review in self.controller.search_reviews(search_term)]
+    
+    def fetch_all_review_rows(self):
+        """
+        Fetch every review with batched book and user resolution (runs on a worker thread)
+        
+        Returns:
+            List of (iid, values, version) table rows
+        """
+        return [self.review_row(review) for review in self.controller.list_reviews()]
+    
+    def show_reviews(self, rows):
+        """
+        Update the table to the given rows, touching only changed rows
+        
+        Args:
+            rows (list): (iid, values, version) table rows
+        """
+        self.table_sync.sync(rows)
+    
+    def load_reviews(self):
+        """Load reviews from database"""
+        # Fetch reviews with book and user details
+        self.executor.submit(
+            'reviews:list', 
+            self.fetch_all_review_rows, 
+            on_success=self.show_reviews, 
+            on_error=self.show_error
+        )
     
     def search_reviews(self):
         """Search reviews based on user input"""
@@ -110,50 +146,14 @@ class ReviewView(tk.Frame):
             self.load_reviews()
             return
         
-        # Clear existing items
-        for item in self.review_table.get_children():
-            self.review_table.delete(item)
-        
         # Perform search
-        reviews = list(self.db_connection.reviews.aggregate([
-            {
-                '$lookup': {
-                    'from': 'books',
-                    'localField': 'book_id',
-                    'foreignField': '_id',
-                    'as': 'book_details'
-                }
-            },
-            {
-                '$lookup': {
-                    'from': 'users',
-                    'localField': 'user_id',
-                    'foreignField': '_id',
-                    'as': 'user_details'
-                }
-            },
-            {
-                '$match': {
-                    '$or': [
-                        {'book_details.title': {'$regex': search_term, '$options': 'i'}},
-                        {'user_details.username': {'$regex': search_term, '$options': 'i'}},
-                        {'review_text': {'$regex': search_term, '$options': 'i'}}
-                    ]
-                }
-            }
-        ]))
-        
-        for review in reviews:
-            book = review['book_details'][0] if review['book_details'] else {'title': 'Unknown Book'}
-            user = review['user_details'][0] if review['user_details'] else {'username': 'Unknown User'}
-            
-            self.review_table.insert('', 'end', values=(
-                book.get('title', 'Unknown'),
-                user.get('username', 'Unknown'),
-                review.get('rating', 'N/A'),
-                review.get('review_text', ''),
-                review.get('review_date', 'N/A')
-            ))
+        self.executor.submit(
+            'reviews:list', 
+            self.fetch_review_rows, 
+            search_term, 
+            on_success=self.show_reviews, 
+            on_error=self.show_error
+        )
     
     def add_review(self):
         """Add a new review"""
@@ -163,26 +163,31 @@ class ReviewView(tk.Frame):
         
         # Book selection
         tk.Label(review_window, text="Select Book:").pack()
-        books = list(self.db_connection.books.find())
         book_var = tk.StringVar()
-        book_dropdown = ttk.Combobox(
-            review_window, 
-            textvariable=book_var, 
-            values=[f"{book['title']} - {book['author']}" for book in books]
-        )
+        book_dropdown = ttk.Combobox(review_window, textvariable=book_var)
         book_dropdown.pack()
         
         # User selection
         tk.Label(review_window, text="Select User:").pack()
-        users = list(self.db_connection.users.find())
         user_var = tk.StringVar()
-        user_dropdown = ttk.Combobox(
-            review_window, 
-            textvariable=user_var, 
-            values=[user['username'] for user in users]
-        )
+        user_dropdown = ttk.Combobox(review_window, textvariable=user_var)
         user_dropdown.pack()
         
+        def fetch_choices():
+            return self.controller.get_book_choices(), self.controller.get_user_choices()
+        
+        def show_choices(choices):
+            books, users = choices
+            book_dropdown['values'] = [f"{book['title']} - {book['author']}" for book in books]
+            user_dropdown['values'] = [user['username'] for user in users]
+        
+        self.executor.submit(
+            f"reviews:choices:{id(review_window)}", 
+            fetch_choices, 
+            on_success=show_choices, 
+            on_error=self.show_error
+        )
+        
         # Rating selection
         tk.Label(review_window, text="Rating:").pack()
         rating_var = tk.IntVar()
@@ -208,32 +213,33 @@ class ReviewView(tk.Frame):
                 messagebox.showwarning("Warning", "Please fill in all fields")
                 return
             
-            # Find book and user IDs
-            book = self.db_connection.books.find_one({
-                'title': selected_book.split(' - ')[0]
-            })
-            user = self.db_connection.users.find_one({'username': selected_username})
-            
-            if not book or not user:
-                messagebox.showerror("Error", "Book or User not found")
-                return
-            
-            # Create review (you'll need to implement this in the controller)
-            review_data = {
-                'book_id': book['_id'],
-                'user_id': user['_id'],
-                'rating': rating,
-                'review_text': text,
-                'review_date': tk.datetime.now()
-            }
+            def save_review():
+                # Find book and user IDs
+                book = self.db_connection.books.find_one({
+                    'title': selected_book.split(' - ')[0]
+                }, {'_id': 1})
+                user = self.db_connection.users.find_one({'username': selected_username}, {'_id': 1})
+                
+                if not book or not user:
+                    return {"success": False, "message": "Book or User not found"}
+                
+                return self.controller.add_review(book['_id'], user['_id'], rating, text)
             
-            try:
-                self.db_connection.reviews.insert_one(review_data)
-                messagebox.showinfo("Success", "Review added successfully")
+            def done(result):
+                if not result['success']:
+                    messagebox.showerror("Error", result['message'])
+                    return
+                
+                messagebox.showinfo("Success", result['message'])
                 review_window.destroy()
                 self.load_reviews()
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.executor.submit(
+                f"reviews:add:{id(review_window)}", 
+                save_review, 
+                on_success=done, 
+                on_error=self.show_error
+            )
         
         tk.Button(review_window, text="Submit Review", command=submit_review).pack(pady=10)
     
@@ -245,8 +251,48 @@ class ReviewView(tk.Frame):
             messagebox.showwarning("Warning", "Please select a review to edit")
             return
         
-        # Placeholder for review editing functionality
-        messagebox.showinfo("Info", "Edit review functionality to be implemented")
+        review_id = selected_item[0]
+        values = self.review_table.item(review_id)['values']
+        
+        edit_window = tk.Toplevel(self)
+        edit_window.title("Edit Review")
+        edit_window.geometry("400x350")
+        
+        tk.Label(edit_window, text=f"{values[0]} - {values[1]}").pack(pady=5)
+        
+        # Rating selection
+        tk.Label(edit_window, text="Rating:").pack()
+        rating_var = tk.StringVar(value=str(values[2]))
+        ttk.Combobox(edit_window, textvariable=rating_var, values=list(range(1, 6))).pack()
+        
+        # Review text input
+        tk.Label(edit_window, text="Review Text:").pack()
+        review_text = tk.Text(edit_window, height=10, width=50)
+        review_text.insert("1.0", values[3])
+        review_text.pack()
+        
+        def save_changes():
+            text = review_text.get("1.0", tk.END).strip()
+            
+            def done(result):
+                if result['success']:
+                    messagebox.showinfo("Success", result['message'])
+                    edit_window.destroy()
+                    self.load_reviews()
+                else:
+                    messagebox.showerror("Error", result['message'])
+            
+            self.executor.submit(
+                f"reviews:edit:{review_id}", 
+                self.controller.edit_review, 
+                review_id, 
+                rating_var.get(), 
+                text, 
+                on_success=done, 
+                on_error=self.show_error
+            )
+        
+        tk.Button(edit_window, text="Save Changes", command=save_changes).pack(pady=10)
     
     def delete_review(self):
         """Delete selected review"""
@@ -256,5 +302,21 @@ class ReviewView(tk.Frame):
             messagebox.showwarning("Warning", "Please select a review to delete")
             return
         
-        # Placeholder for review deletion functionality
-        messagebox.showinfo("Info", "Delete review functionality to be implemented")
\ No newline at end of file
+        review_id = selected_item[0]
+        if not messagebox.askyesno("Confirm Deletion", "Are you sure you want to delete this review?"):
+            return
+        
+        def done(result):
+            if result['success']:
+                messagebox.showinfo("Success", result['message'])
+                self.load_reviews()
+            else:
+                messagebox.showerror("Error", result['message'])
+        
+        self.executor.submit(
+            f"reviews:delete:{review_id}", 
+            self.controller.delete_review, 
+            review_id, 
+            on_success=done, 
+            on_error=self.show_error
+        )
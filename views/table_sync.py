@@ -0,0 +1,117 @@
+# digital_library/views/table_sync.py
+import os
+
+class TableSynchronizer:
+    def __init__(self, tree):
+        """
+        Apply row sets to a Treeview as a diff keyed by document _id
+
+        Rows that did not change (same version) cost no Tk call; only
+        inserted, updated, moved and removed rows touch the widget.
+
+        Args:
+            tree (ttk.Treeview): Table to keep in sync
+        """
+        self.tree = tree
+        self.versions = {}
+
+    def sync(self, rows):
+        """
+        Make the table show exactly the given rows, in order
+
+        Args:
+            rows (list): (iid, values, version) tuples; iid is the document
+                _id as a string, version its version/updatedAt field (the
+                values are compared when it is None)
+
+        Returns:
+            Dict with the number of inserted, updated, moved and removed rows
+        """
+        stats = {"inserted": 0, "updated": 0, "moved": 0, "removed": 0}
+        wanted = {iid for iid, _, _ in rows}
+
+        removed = [iid for iid in self.versions if iid not in wanted]
+        if removed:
+            self.tree.delete(*removed)
+            for iid in removed:
+                del self.versions[iid]
+            stats["removed"] = len(removed)
+
+        current = list(self.tree.get_children()) if self.versions else []
+        positions = {iid: index for index, iid in enumerate(current)}
+
+        for index, (iid, values, version) in enumerate(rows):
+            version = version if version is not None else tuple(values)
+
+            if iid not in self.versions:
+                self.tree.insert('', index, iid=iid, values=values)
+                current.insert(index, iid)
+                positions = None
+                stats["inserted"] += 1
+            else:
+                if positions is None:
+                    positions = {row_iid: position for position, row_iid in enumerate(current)}
+                if positions.get(iid) != index:
+                    self.tree.move(iid, '', index)
+                    current.remove(iid)
+                    current.insert(index, iid)
+                    positions = None
+                    stats["moved"] += 1
+                if self.versions[iid] != version:
+                    self.tree.item(iid, values=values)
+                    stats["updated"] += 1
+
+            self.versions[iid] = version
+
+        return stats
+
+    def forget(self, iids=None):
+        """
+        Stop tracking rows deleted from the tree by other code
+
+        Args:
+            iids (iterable, optional): Rows to forget; all when omitted
+        """
+        if iids is None:
+            self.versions.clear()
+        else:
+            for iid in iids:
+                self.versions.pop(iid, None)
+
+def document_version(document):
+    """
+    Version marker of a document maintained by the controller
+
+    Args:
+        document (dict): MongoDB document
+
+    Returns:
+        The 'version' or 'updatedAt' field, None if the document has neither
+    """
+    version = document.get('version')
+    return version if version is not None else document.get('updatedAt')
+
+def schedule_auto_refresh(widget, refresh, interval_ms=None):
+    """
+    Poll for changes by calling refresh periodically
+
+    Refreshing is cheap because tables are synchronized by diff. The
+    interval defaults to the AUTO_REFRESH_MS environment variable; nothing
+    is scheduled when it is 0 or unset.
+
+    Args:
+        widget (tk.Widget): Widget owning the timer
+        refresh (callable): Refresh callback
+        interval_ms (int, optional): Polling interval in milliseconds
+    """
+    if interval_ms is None:
+        interval_ms = int(os.getenv('AUTO_REFRESH_MS', 0))
+    if interval_ms <= 0:
+        return
+
+    def tick():
+        if widget.winfo_ismapped():
+            refresh()
+        widget.after(interval_ms, tick)
+
+    widget.after(interval_ms, tick)
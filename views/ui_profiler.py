@@ -0,0 +1,204 @@
+# digital_library/views/ui_profiler.py
+import os
+import re
+import json
+import time
+import cProfile
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional, Tuple
+from config.instrumentation import LATENCY_BUCKETS_MS
+
+class TimingStats:
+    """Count, total, maximum and histogram of durations in milliseconds"""
+
+    __slots__ = ('count', 'total_ms', 'max_ms', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, duration_ms: float):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'histogram': dict(zip([f"<{bound}ms" for bound in LATENCY_BUCKETS_MS] + ['more'], self.buckets))
+        }
+
+class UIProfiler:
+    """
+    Measure how long the Tk event loop is blocked, and by what
+
+    Three measurements, all opt-in (see DigitalLibraryApp):
+
+    - Event-loop lag: a tick is scheduled with after() every TICK_MS; the
+      delay between when it should and when it did run is time the loop
+      spent in some callback (any callback, including button handlers).
+    - Per action: for every request of the QueryExecutor, the time of the
+      worker part (queries and row building, off the Tk thread) and of the
+      Tk callback that applies the result (mostly Treeview inserts).
+    - Per action profiles: with an output directory, both parts run under
+      cProfile and are dumped as <action>-<n>-db.prof / -ui.prof (pstats
+      format, readable by snakeviz, flameprof or gprof2dot).
+
+    Actions whose Tk callback exceeds the frame budget are printed.
+    """
+
+    TICK_MS = 50
+
+    def __init__(self, root, output_dir: Optional[str] = None, budget_ms: float = 50.0):
+        """
+        Args:
+            root (tk.Misc): Widget used to schedule the lag ticks
+            output_dir (str, optional): Directory of the cProfile dumps and
+                the summary; nothing is dumped when omitted
+            budget_ms (float): Longest acceptable blocking of the event loop
+        """
+        self.root = root
+        self.output_dir = output_dir
+        self.budget_ms = budget_ms
+        self.lag = TimingStats()
+        self.actions = {}
+        self.over_budget = 0
+        self._dumps = {}
+        self._expected = None
+        self._running = False
+        self._lock = threading.Lock()
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    @classmethod
+    def from_setting(cls, root, setting: Optional[str]) -> Optional['UIProfiler']:
+        """
+        Build a profiler from the --profile option or UI_PROFILE variable
+
+        Args:
+            root (tk.Misc): Root window
+            setting (str, optional): Output directory; '1'/'true' profile
+                into 'profiles'; empty or '0' disables profiling
+
+        Returns:
+            UIProfiler, or None when disabled
+        """
+        if not setting or setting.lower() in ('0', 'false', 'no'):
+            return None
+        if setting.lower() in ('1', 'true', 'yes'):
+            setting = 'profiles'
+        return cls(root, setting)
+
+    def start(self):
+        """Start measuring the event-loop lag"""
+        if not self._running:
+            self._running = True
+            self._expected = time.perf_counter() + self.TICK_MS / 1000
+            self.root.after(self.TICK_MS, self._tick)
+
+    def _tick(self):
+        if not self._running:
+            return
+        now = time.perf_counter()
+        self.lag.record(max(0.0, (now - self._expected) * 1000))
+        self._expected = now + self.TICK_MS / 1000
+        self.root.after(self.TICK_MS, self._tick)
+
+    def measure(self, key: str, part: str, fn: Callable, *args, **kwargs) -> Tuple[Any, float]:
+        """
+        Run part of an action, profiled when an output directory is set
+
+        Args:
+            key (str): Action (executor request key)
+            part (str): 'db' for the worker part, 'ui' for the Tk callback
+            fn (callable): Function to run
+
+        Returns:
+            (result of fn, elapsed milliseconds)
+        """
+        profile = cProfile.Profile() if self.output_dir else None
+        started = time.perf_counter()
+        if profile:
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler: skip this dump
+                profile = None
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            if profile:
+                profile.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if profile:
+                self._dump(profile, key, part)
+        return result, elapsed_ms
+
+    def _dump(self, profile, key: str, part: str):
+        """Write the profile of one part of an action"""
+        name = re.sub(r'[^\w.-]+', '_', key)
+        with self._lock:
+            number = self._dumps[(name, part)] = self._dumps.get((name, part), 0) + 1
+        try:
+            profile.dump_stats(os.path.join(self.output_dir, f"{name}-{number}-{part}.prof"))
+        except OSError as e:
+            print(f"Error writing profile: {e}")
+
+    def record_action(self, key: str, db_ms: Optional[float], ui_ms: float):
+        """
+        Record the time of both parts of a completed action
+
+        Args:
+            key (str): Action (executor request key)
+            db_ms (float, optional): Worker time
+            ui_ms (float): Time of the Tk callback
+        """
+        with self._lock:
+            stats = self.actions.get(key)
+            if stats is None:
+                stats = self.actions[key] = {'db': TimingStats(), 'ui': TimingStats()}
+            if db_ms is not None:
+                stats['db'].record(db_ms)
+            stats['ui'].record(ui_ms)
+        if ui_ms > self.budget_ms:
+            self.over_budget += 1
+            db_text = f", {db_ms:.0f} ms on the worker" if db_ms is not None else ""
+            print(f"UI action {key} blocked the event loop for {ui_ms:.0f} ms{db_text}")
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summary of the measurements
+
+        Returns:
+            Dict with the event-loop 'lag' and the 'db'/'ui' times per action
+        """
+        with self._lock:
+            actions = {key: {part: stats.to_dict() for part, stats in parts.items()}
+                       for key, parts in self.actions.items()}
+        return {
+            'budget_ms': self.budget_ms,
+            'lag': self.lag.to_dict(),
+            'over_budget': self.over_budget,
+            'actions': actions
+        }
+
+    def close(self):
+        """Stop measuring, print the summary and write it to the output directory"""
+        self._running = False
+        report = self.report()
+        lag = report['lag']
+        print(f"Event loop lag: avg {lag['avg_ms']:.1f} ms, max {lag['max_ms']:.1f} ms over {lag['count']} ticks; "
+              f"{report['over_budget']} actions over the {self.budget_ms:.0f} ms budget")
+        for key, parts in sorted(report['actions'].items(), key=lambda item: -item[1]['ui']['max_ms']):
+            print(f"  {key:<32} db avg {parts['db']['avg_ms']:8.1f} ms  "
+                  f"ui avg {parts['ui']['avg_ms']:8.1f} ms  max {parts['ui']['max_ms']:8.1f} ms  "
+                  f"({parts['ui']['count']} calls)")
+        if self.output_dir:
+            with open(os.path.join(self.output_dir, 'summary.json'), 'w', encoding='utf-8') as summary:
+                json.dump(report, summary, indent=2)
@@ -2,24 +2,35 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from controllers.controller import LibraryController
+from controllers.executor import QueryExecutor
+from views.table_sync import TableSynchronizer, schedule_auto_refresh
 
 class UserView(tk.Frame):
-    def __init__(self, parent, db_connection):
+    def __init__(self, parent, db_connection, executor=None):
         """
         User view for managing user accounts
         
         Args:
             parent (tk.Notebook): Parent notebook
             db_connection (DatabaseConnection): Database connection
+            executor (QueryExecutor, optional): Background query executor
         """
         super().__init__(parent)
         self.db_connection = db_connection
         self.controller = LibraryController(db_connection)
+        self.executor = executor or QueryExecutor(self)
         
         # Layout
         self.create_user_section()
         self.create_user_table()
         self.create_action_buttons()
+        
+        # Optional polling for changes made elsewhere (AUTO_REFRESH_MS)
+        schedule_auto_refresh(self, self.search_users)
+    
+    def show_error(self, error):
+        """Display an error raised by a background query"""
+        messagebox.showerror("Error", str(error))
     
     def create_user_section(self):
         """Create search input and section for finding users"""
@@ -45,6 +56,7 @@ class UserView(tk.Frame):
             self.user_table.column(col, width=150)
         
         self.user_table.pack(expand=True, fill='both', padx=10, pady=10)
+        self.table_sync = TableSynchronizer(self.user_table)
         
         # Load initial users
         self.load_users()
@@ -64,25 +76,59 @@ class UserView(tk.Frame):
         for label, command in buttons:
             tk.Button(button_frame, text=label, command=command).pack(side=tk.LEFT, padx=5)
     
-    def load_users(self):
-        """Load users from database"""
-        # Clear existing items
-        for item in self.user_table.get_children():
-            self.user_table.delete(item)
+    def fetch_user_rows(self, search_term=None):
+        """
+        Fetch users and their order counts (runs on a worker thread)
         
-        # Fetch users (implementation depends on your actual controller method)
-        users = self.db_connection.users.find({})
+        Args:
+            search_term (str, optional): User _id, or the beginning of the
+                username or email (case-insensitive); all users when omitted
         
-        for user in users:
-            # Calculate total orders for the user
-            total_orders = self.db_connection.orders.count_documents({'user_id': user['_id']})
-            
-            self.user_table.insert('', 'end', values=(
-                user.get('username', ''),
-                user.get('email', ''),
-                user.get('registration_date', 'N/A'),
-                total_orders
-            ))
+        Returns:
+            List of (iid, values, version) table rows
+        """
+        if search_term:
+            users = self.controller.search_users(search_term)
+        else:
+            users = self.controller.list_users()
+        
+        # Order counts of every listed user in one aggregation
+        order_counts = self.controller.count_orders_by_user(
+            None if not search_term else [user['_id'] for user in users]
+        )
+        
+        return [
+            (
+                str(user['_id']),
+                (
+                    user.get('username', ''),
+                    user.get('email', ''),
+                    user.get('registration_date', 'N/A'),
+                    order_counts.get(user['_id'], 0)
+                ),
+                None  # the order count is not versioned, compare values
+            )
+            for user in users
+        ]
+    
+    def show_users(self, rows):
+        """
+        Update the table to the given rows, touching only changed rows
+        
+        Args:
+            rows (list): (iid, values, version) table rows
+        """
+        self.table_sync.sync(rows)
+    
+    def load_users(self):
+        """Load users from database"""
+        self.executor.submit(
+            'users:list', 
+            self.fetch_user_rows, 
+            None, 
+            on_success=self.show_users, 
+            on_error=self.show_error
+        )
     
     def search_users(self):
         """Search users based on user input"""
@@ -92,29 +138,13 @@ class UserView(tk.Frame):
             self.load_users()
             return
         
-        # Clear existing items
-        for item in self.user_table.get_children():
-            self.user_table.delete(item)
-        
-        # Perform search
-        query = {
-            '$or': [
-                {'username': {'$regex': search_term, '$options': 'i'}},
-                {'email': {'$regex': search_term, '$options': 'i'}}
-            ]
-        }
-        
-        users = list(self.db_connection.users.find(query))
-        
-        for user in users:
-            total_orders = self.db_connection.orders.count_documents({'user_id': user['_id']})
-            
-            self.user_table.insert('', 'end', values=(
-                user.get('username', ''),
-                user.get('email', ''),
-                user.get('registration_date', 'N/A'),
-                total_orders
-            ))
+        self.executor.submit(
+            'users:list', 
+            self.fetch_user_rows, 
+            search_term, 
+            on_success=self.show_users, 
+            on_error=self.show_error
+        )
     
     def register_user(self):
         """Open dialog to register a new user"""
@@ -140,14 +170,23 @@ class UserView(tk.Frame):
             email = email_entry.get().strip()
             password = password_entry.get()
             
-            result = self.controller.register_user(username, email, password)
+            def done(result):
+                if result['success']:
+                    messagebox.showinfo("Success", result['message'])
+                    register_window.destroy()
+                    self.load_users()
+                else:
+                    messagebox.showerror("Error", result['message'])
             
-            if result['success']:
-                messagebox.showinfo("Success", result['message'])
-                register_window.destroy()
-                self.load_users()
-            else:
-                messagebox.showerror("Error", result['message'])
+            self.executor.submit(
+                f"users:register:{id(register_window)}", 
+                self.controller.register_user, 
+                username, 
+                email, 
+                password, 
+                on_success=done, 
+                on_error=self.show_error
+            )
         
         tk.Button(register_window, text="Register", command=submit).pack(pady=10)
     